@@ -1,4 +1,5 @@
 import os
+import random
 import time
 from storage_workflows.crdb.factory.aws_session_factory import AwsSessionFactory
 from storage_workflows.logging.logger import Logger
@@ -10,21 +11,26 @@ logger = Logger()
 class AutoScalingGroupGateway:
 
     PAGINATOR_MAX_RESULT_PER_PAGE = 100
+    DESCRIBE_MAX_ACTIVITY_IDS_PER_CALL = 50
+    ACTIVITY_TERMINAL_STATUS_CODES = ('Successful', 'Failed', 'Cancelled')
+    ACTIVITY_MIN_POLL_INTERVAL_SECONDS = 2
+    ACTIVITY_MAX_POLL_INTERVAL_SECONDS = 30
+    ACTIVITY_TIMEOUT_SECONDS = int(os.getenv('ASG_ACTIVITY_TIMEOUT_SECONDS', '1800'))
 
     @staticmethod
-    def describe_auto_scaling_groups(filters=[], next_token='') -> list:
+    def describe_auto_scaling_groups(filters=[]) -> list:
+        return list(AutoScalingGroupGateway.iter_auto_scaling_groups(filters))
+
+    @staticmethod
+    def iter_auto_scaling_groups(filters=[]):
+        """Yield auto scaling groups page by page, so callers can stop before the last page is fetched."""
         try:
             auto_scaling_group_aws_client = AwsSessionFactory.auto_scaling()
-            if not next_token:
-                response = auto_scaling_group_aws_client.describe_auto_scaling_groups(Filters=filters, MaxRecords=AutoScalingGroupGateway.PAGINATOR_MAX_RESULT_PER_PAGE)
-            else:
-                response = auto_scaling_group_aws_client.describe_auto_scaling_groups(Filters=filters,
-                                                                   MaxRecords=AutoScalingGroupGateway.PAGINATOR_MAX_RESULT_PER_PAGE,
-                                                                   NextToken=next_token)
-            if 'NextToken' in response:
-                response['AutoScalingGroups'].extend(
-                    AutoScalingGroupGateway.describe_auto_scaling_groups(filters, response['NextToken']))
-            return response['AutoScalingGroups']
+            paginator = auto_scaling_group_aws_client.get_paginator('describe_auto_scaling_groups')
+            page_iterator = paginator.paginate(Filters=filters, PaginationConfig={
+                'PageSize': AutoScalingGroupGateway.PAGINATOR_MAX_RESULT_PER_PAGE})
+            for page in page_iterator:
+                yield from page['AutoScalingGroups']
         except ClientError as ce:
             logger.error(f"AWS ClientError while describing auto scaling groups with filters {filters}: {str(ce)}")
             raise ce
@@ -32,6 +38,11 @@ class AutoScalingGroupGateway:
             logger.error(f"General error while describing auto scaling groups with filters {filters}: {str(e)}")
             raise e
 
+    @staticmethod
+    def find_first_auto_scaling_group(filters=[], predicate=None):
+        """Returns the first auto scaling group matching the filters and predicate, or None."""
+        return next(filter(predicate, AutoScalingGroupGateway.iter_auto_scaling_groups(filters)), None)
+
     @staticmethod
     def describe_auto_scaling_groups_by_name(asg_name):
         auto_scaling_group_aws_client = AwsSessionFactory.auto_scaling()
@@ -131,31 +142,46 @@ class AutoScalingGroupGateway:
             raise Exception("Error: Failed to exit instances from standby mode.")
 
     @staticmethod
-    def wait_for_activity_completion(activities, auto_scaling_group_aws_client):
+    def wait_for_activity_completion(activities, auto_scaling_group_aws_client, timeout_seconds=None):
+        """
+        Polls all activities together until each one is Successful, Failed or Cancelled, backing off
+        exponentially with jitter between polls. Failed activities are logged one by one.
+        Returns activity id -> last seen activity.
+        """
+        timeout_seconds = timeout_seconds or AutoScalingGroupGateway.ACTIVITY_TIMEOUT_SECONDS
+        deadline = time.monotonic() + timeout_seconds
+        latest = {activity['ActivityId']: activity for activity in activities}
         for activity in activities:
-            activity_id = activity['ActivityId']
-            description = activity['Description']
-            status_code = activity['StatusCode']
-
-            logger.info(f"Activity ID: {activity_id}")
-            logger.info(f"Description: {description}")
-
-            # Wait and check the status code until it becomes "Successful"
-            while status_code != 'Successful':
-                time.sleep(10)  # Wait for 10 seconds
-
+            logger.info(f"Activity ID: {activity['ActivityId']}")
+            logger.info(f"Description: {activity['Description']}")
+
+        poll_interval = AutoScalingGroupGateway.ACTIVITY_MIN_POLL_INTERVAL_SECONDS
+        pending = [activity_id for activity_id, activity in latest.items()
+                   if activity['StatusCode'] not in AutoScalingGroupGateway.ACTIVITY_TERMINAL_STATUS_CODES]
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Scaling activities {pending} did not complete within {timeout_seconds} seconds.")
+            # full jitter, never sleeping past the deadline
+            time.sleep(min(random.uniform(0, poll_interval), remaining))
+            poll_interval = min(poll_interval * 2, AutoScalingGroupGateway.ACTIVITY_MAX_POLL_INTERVAL_SECONDS)
+
+            for start in range(0, len(pending), AutoScalingGroupGateway.DESCRIBE_MAX_ACTIVITY_IDS_PER_CALL):
                 response = auto_scaling_group_aws_client.describe_scaling_activities(
-                    ActivityIds=[activity_id]
+                    ActivityIds=pending[start:start + AutoScalingGroupGateway.DESCRIBE_MAX_ACTIVITY_IDS_PER_CALL]
                 )
-
-                if response['Activities'][0]['StatusCode'] == 'Failed':
-                    logger.error("Error: Failed Activity")
-                    break
-
-                status_code = response['Activities'][0]['StatusCode']
-
-            logger.info(f"Status Code: {status_code}")
-        return
+                for activity in response['Activities']:
+                    latest[activity['ActivityId']] = activity
+            pending = [activity_id for activity_id in pending
+                       if latest[activity_id]['StatusCode'] not in AutoScalingGroupGateway.ACTIVITY_TERMINAL_STATUS_CODES]
+
+        for activity_id, activity in latest.items():
+            if activity['StatusCode'] == 'Successful':
+                logger.info(f"Activity {activity_id} Status Code: Successful")
+            else:
+                logger.error(f"Error: Activity {activity_id} {activity['StatusCode']}: "
+                             f"{activity.get('StatusMessage', activity['Description'])}")
+        return latest
 
     @staticmethod
     def _get_current_asg_instances(asg_name):
@@ -1,6 +1,8 @@
 import os
 import json
-from requests import get, post, exceptions
+from concurrent.futures import ThreadPoolExecutor
+from requests import exceptions
+from storage_workflows.crdb.api_gateway.crdb_api_session_manager import CrdbApiSessionManager
 from storage_workflows.logging.logger import Logger
 from urllib.parse import quote
 from requests.cookies import RequestsCookieJar
@@ -9,6 +11,15 @@ logger = Logger()
 
 class CrdbApiGateway:
 
+    UNAUTHORIZED_STATUS_CODE = 401
+    REQUEST_TIMEOUT_SECONDS = float(os.getenv('CRDB_API_REQUEST_TIMEOUT_SECONDS', '10'))
+    MAX_CONCURRENT_REQUESTS = int(os.getenv('CRDB_API_MAX_CONCURRENT_REQUESTS', '16'))
+
+    @staticmethod
+    def session_token():
+        """Session token of the current cluster, logging in only when there is no valid one yet."""
+        return CrdbApiSessionManager.get_token(CrdbApiGateway.__make_url(), CrdbApiGateway.login)
+
     @staticmethod
     def login(retries=2):
         rootpwd = os.getenv('ROOT_PASSWORD')
@@ -17,7 +28,7 @@ class CrdbApiGateway:
 
         for _ in range(retries + 1): # retries + original attempt
             try:
-                response = post(url)
+                response = CrdbApiSessionManager.http_session().post(url, timeout=CrdbApiGateway.REQUEST_TIMEOUT_SECONDS)
 
                 if response.status_code == 200 and response.text.strip():
                     return response.json().get("session")
@@ -35,12 +46,17 @@ class CrdbApiGateway:
     def list_nodes(session:str, limit=200, offset=0, retries=2):
         for _ in range(retries + 1):
             try:
-                response = get(f"https://{CrdbApiGateway.__make_url()}/api/v2/nodes/?limit={limit}&offset={offset}",
-                               headers={"X-Cockroach-API-Session": session})
+                response = CrdbApiSessionManager.http_session().get(
+                    f"https://{CrdbApiGateway.__make_url()}/api/v2/nodes/?limit={limit}&offset={offset}",
+                    headers={"X-Cockroach-API-Session": session}, timeout=CrdbApiGateway.REQUEST_TIMEOUT_SECONDS)
 
                 if response.status_code == 200 and response.text.strip():
                     return response.json()
 
+                if response.status_code == CrdbApiGateway.UNAUTHORIZED_STATUS_CODE:
+                    session = CrdbApiGateway.__renew_session_token(session)
+                    continue
+
                 logger.warning(f"Unexpected response from list nodes URL: {response.text}")
 
             except (json.decoder.JSONDecodeError, exceptions.RequestException) as e:
@@ -51,25 +67,78 @@ class CrdbApiGateway:
 
     @staticmethod
     def get_node_details_from_endpoint(session:str, node_id:str, retries=2):
-        jar = RequestsCookieJar()
-        jar.set(name='session', value=session, path='/')
+        return CrdbApiGateway.__get_status(session, f"/_status/nodes/{node_id}", f"details for node {node_id}", retries)
+
+    @staticmethod
+    def get_all_node_details(session:str, retries=2):
+        """Details, including store statuses, of every node of the cluster in a single request."""
+        return CrdbApiGateway.__get_status(session, "/_status/nodes", "details of all nodes", retries)
+
+    @staticmethod
+    def collect_node_details(session:str, node_ids:list, retries=2):
+        return CrdbApiGateway.collect_node_endpoints(
+            session, {node_id: f"/_status/nodes/{node_id}" for node_id in node_ids}, retries)
 
+    @staticmethod
+    def collect_node_endpoints(session:str, node_paths:dict, retries=2, max_workers=None):
+        """
+        Fetches the /_status path of every node id with at most MAX_CONCURRENT_REQUESTS requests in flight.
+        Returns node id -> response for the nodes that answered, and the list of node ids that didn't.
+        """
+        max_workers = max_workers or CrdbApiGateway.MAX_CONCURRENT_REQUESTS
+        if not node_paths:
+            return {}, []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(node_paths))) as executor:
+            futures = {node_id: executor.submit(CrdbApiGateway.__get_status, session, path,
+                                                f"node {node_id}", retries)
+                       for node_id, path in node_paths.items()}
+        responses = {}
+        failed_node_ids = []
+        for node_id, future in futures.items():
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.error(f"Request for node {node_id} failed: {e}")
+                response = None
+            if response:
+                responses[node_id] = response
+            else:
+                failed_node_ids.append(node_id)
+        if failed_node_ids:
+            logger.warning(f"No response from {len(failed_node_ids)} of {len(node_paths)} nodes: {failed_node_ids}")
+        return responses, failed_node_ids
+
+    @staticmethod
+    def __get_status(session:str, path:str, description:str, retries:int):
         for _ in range(retries + 1):
+            jar = RequestsCookieJar()
+            jar.set(name='session', value=session, path='/')
             try:
-                response = get(f"https://{CrdbApiGateway.__make_url()}/_status/nodes/{node_id}",
-                               cookies=jar)
+                response = CrdbApiSessionManager.http_session().get(
+                    f"https://{CrdbApiGateway.__make_url()}{path}", cookies=jar,
+                    timeout=CrdbApiGateway.REQUEST_TIMEOUT_SECONDS)
 
                 if response.status_code == 200 and response.text.strip():
                     return response.json()
 
-                logger.warning(f"Unexpected response from node details URL for node {node_id}: {response.text}")
+                if response.status_code == CrdbApiGateway.UNAUTHORIZED_STATUS_CODE:
+                    session = CrdbApiGateway.__renew_session_token(session)
+                    continue
+
+                logger.warning(f"Unexpected response from {path} for {description}: {response.text}")
 
             except (json.decoder.JSONDecodeError, exceptions.RequestException) as e:
                 logger.error(f"Request failed: {e}")
 
-        logger.error(f"Failed to retrieve details for node {node_id} after {retries + 1} attempts")
+        logger.error(f"Failed to retrieve {description} after {retries + 1} attempts")
         return {}
 
+    @staticmethod
+    def __renew_session_token(expired_session):
+        logger.warning("Admin API session rejected, logging in again.")
+        CrdbApiSessionManager.invalidate(CrdbApiGateway.__make_url(), expired_session)
+        return CrdbApiGateway.session_token()
+
     @staticmethod
     def __make_url():
         cluster_name = os.getenv('CLUSTER_NAME').replace("_", "-")
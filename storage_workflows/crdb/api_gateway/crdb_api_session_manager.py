@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+
+class CrdbApiSessionManager:
+    """
+    Shares one pooled, keep-alive requests.Session for the admin API of every cluster, and the
+    session token of each admin host, so a command logs in once per cluster instead of once per call.
+
+    A token is dropped after SESSION_TTL_SECONDS or as soon as the API answers 401 for it.
+    """
+
+    SESSION_TTL_SECONDS = int(os.getenv('CRDB_API_SESSION_TTL_SECONDS', '3600'))
+    POOL_MAXSIZE = int(os.getenv('CRDB_API_POOL_MAXSIZE', '20'))
+    _lock = threading.Lock()
+    _http_session = None
+    # admin host -> (expires_at, token)
+    _tokens = {}
+
+    @staticmethod
+    def http_session() -> Session:
+        with CrdbApiSessionManager._lock:
+            if CrdbApiSessionManager._http_session is None:
+                http_session = Session()
+                http_session.mount('https://', HTTPAdapter(pool_maxsize=CrdbApiSessionManager.POOL_MAXSIZE))
+                CrdbApiSessionManager._http_session = http_session
+            return CrdbApiSessionManager._http_session
+
+    @staticmethod
+    def get_token(host: str, login) -> str:
+        """Returns the cached token of the host, calling login() for a new one when there is none."""
+        with CrdbApiSessionManager._lock:
+            cached = CrdbApiSessionManager._tokens.get(host)
+            if cached is not None and time.time() < cached[0]:
+                return cached[1]
+            token = login()
+            if token:
+                CrdbApiSessionManager._tokens[host] = (time.time() + CrdbApiSessionManager.SESSION_TTL_SECONDS, token)
+            return token
+
+    @staticmethod
+    def invalidate(host: str = None, token: str = None):
+        """Drop the token of the host, only if it is still token when one is given, or every token."""
+        with CrdbApiSessionManager._lock:
+            if host is None:
+                CrdbApiSessionManager._tokens.clear()
+                return
+            cached = CrdbApiSessionManager._tokens.get(host)
+            if cached is not None and (token is None or cached[1] == token):
+                del CrdbApiSessionManager._tokens[host]
@@ -3,28 +3,48 @@ from storage_workflows.crdb.aws.ebs_volume import EBSVolume
 
 
 class EBSGateway:
+    PAGINATOR_MAX_RESULT_PER_PAGE = 500
+    # EC2 accepts at most 200 values per filter
+    DESCRIBE_MAX_INSTANCE_IDS_PER_CALL = 200
+    DATA_VOLUME_TYPES = ['gp2', 'io1', 'io2', 'st1', 'sc1']
+    ROOT_VOLUME_SIZE = 8
+
     @staticmethod
     def get_ebs_volumes_for_instance(instance_id):
-        ec2 = AwsSessionFactory.ec2()
+        return EBSGateway.get_ebs_volumes_for_instances([instance_id]).get(instance_id, [])
 
-        # Describe volumes attached to the instance.
-        volumes_response = ec2.describe_volumes(
-            Filters=[
+    @staticmethod
+    def get_ebs_volumes_for_instances(instance_ids):
+        """Returns instance id -> data volumes attached to it, with one paginated call per 200 instances."""
+        instance_ids = list(dict.fromkeys(instance_ids))
+        instance_id_set = set(instance_ids)
+        ebs_objects = {}
+        for start in range(0, len(instance_ids), EBSGateway.DESCRIBE_MAX_INSTANCE_IDS_PER_CALL):
+            filters = [
                 {
                     'Name': 'attachment.instance-id',
-                    'Values': [instance_id]
+                    'Values': instance_ids[start:start + EBSGateway.DESCRIBE_MAX_INSTANCE_IDS_PER_CALL]
                 },
                 {
                     'Name': 'volume-type',
-                    'Values': ['gp2', 'io1', 'io2', 'st1', 'sc1']
+                    'Values': EBSGateway.DATA_VOLUME_TYPES
                 }
             ]
-        )
-
-        volumes = [volume for volume in volumes_response['Volumes'] if volume['Size'] != 8]
-
-        ebs_objects = []
-        for volume in volumes:
-            ebs_objects.append(EBSVolume.from_aws_response(volume))
-
+            for volume in EBSGateway.iter_volumes(filters):
+                # skip the root volume
+                if volume['Size'] == EBSGateway.ROOT_VOLUME_SIZE:
+                    continue
+                for attachment in volume.get('Attachments', []):
+                    if attachment['InstanceId'] not in instance_id_set:
+                        continue
+                    ebs_objects.setdefault(attachment['InstanceId'], []).append(EBSVolume.from_aws_response(volume))
         return ebs_objects
+
+    @staticmethod
+    def iter_volumes(filters=[]):
+        ec2 = AwsSessionFactory.ec2()
+        paginator = ec2.get_paginator('describe_volumes')
+        page_iterator = paginator.paginate(Filters=filters, PaginationConfig={
+            'PageSize': EBSGateway.PAGINATOR_MAX_RESULT_PER_PAGE})
+        for page in page_iterator:
+            yield from page['Volumes']
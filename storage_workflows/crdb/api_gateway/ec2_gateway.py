@@ -1,3 +1,4 @@
+from botocore.exceptions import ClientError
 from storage_workflows.crdb.factory.aws_session_factory import AwsSessionFactory
 from storage_workflows.logging.logger import Logger
 
@@ -6,23 +7,80 @@ logger = Logger()
 class Ec2Gateway:
 
     PAGINATOR_MAX_RESULT_PER_PAGE = 100
+    DESCRIBE_MAX_INSTANCE_IDS_PER_CALL = 1000
+    # EC2 accepts at most 200 values per filter
+    FILTER_MAX_VALUES = 200
+    DESCRIBE_STATUS_MAX_INSTANCE_IDS_PER_CALL = 100
+    TERMINATE_MAX_INSTANCE_IDS_PER_CALL = 1000
+    TERMINATED_WAITER_DELAY_SECONDS = 15
+    TERMINATED_WAITER_MAX_ATTEMPTS = 80
 
     @staticmethod
-    def describe_ec2_instances(filters=[], next_token=''):
+    def describe_ec2_instances(filters=[]):
+        return list(Ec2Gateway.iter_ec2_instances(filters))
+
+    @staticmethod
+    def iter_ec2_instances(filters=[]):
+        """Yield every instance of every reservation, fetching the next page only when it is needed."""
         ec2_aws_client = AwsSessionFactory.ec2()
-        if not next_token:
-            response = ec2_aws_client.describe_instances(Filters=filters, 
-                                                         MaxResults=Ec2Gateway.PAGINATOR_MAX_RESULT_PER_PAGE, 
-                                                         DryRun=False)
-        else:
-            response = ec2_aws_client.describe_instances(Filters=filters, 
-                                                         MaxResults=Ec2Gateway.PAGINATOR_MAX_RESULT_PER_PAGE, 
-                                                         DryRun=False,
-                                                         NextToken=next_token)
-        instances = list(map(lambda reservation: reservation['Instances'][0], response['Reservations']))
-        if 'NextToken' in response:
-            instances.extend(Ec2Gateway.describe_ec2_instances(filters, response['NextToken']))
+        paginator = ec2_aws_client.get_paginator('describe_instances')
+        page_iterator = paginator.paginate(Filters=filters, DryRun=False, PaginationConfig={
+            'PageSize': Ec2Gateway.PAGINATOR_MAX_RESULT_PER_PAGE})
+        for page in page_iterator:
+            for reservation in page['Reservations']:
+                yield from reservation['Instances']
+
+    @staticmethod
+    def describe_ec2_instances_by_ids(instance_ids:list) -> dict:
+        """Returns instance id -> instance for the ids that exist, with one DescribeInstances per 1000 ids."""
+        instance_ids = list(dict.fromkeys(instance_ids))
+        ec2_aws_client = AwsSessionFactory.ec2()
+        paginator = ec2_aws_client.get_paginator('describe_instances')
+        instances = {}
+        for start in range(0, len(instance_ids), Ec2Gateway.DESCRIBE_MAX_INSTANCE_IDS_PER_CALL):
+            chunk = instance_ids[start:start + Ec2Gateway.DESCRIBE_MAX_INSTANCE_IDS_PER_CALL]
+            try:
+                # MaxResults can't be combined with InstanceIds, so no PageSize here
+                pages = list(paginator.paginate(InstanceIds=chunk, DryRun=False))
+            except ClientError as error:
+                if error.response['Error']['Code'] != 'InvalidInstanceID.NotFound':
+                    raise
+                # InstanceIds fails the whole call if one id is gone, the filter just leaves it out
+                logger.warning("Some of instances {} no longer exist: {}".format(chunk, error))
+                pages = Ec2Gateway._iter_pages_by_instance_id_filter(paginator, chunk)
+            for page in pages:
+                for reservation in page['Reservations']:
+                    for instance in reservation['Instances']:
+                        instances[instance['InstanceId']] = instance
         return instances
+
+    @staticmethod
+    def _iter_pages_by_instance_id_filter(paginator, instance_ids:list):
+        for start in range(0, len(instance_ids), Ec2Gateway.FILTER_MAX_VALUES):
+            filters = [{'Name': 'instance-id', 'Values': instance_ids[start:start + Ec2Gateway.FILTER_MAX_VALUES]}]
+            yield from paginator.paginate(Filters=filters, DryRun=False,
+                                          PaginationConfig={'PageSize': Ec2Gateway.FILTER_MAX_VALUES})
+
+    @staticmethod
+    def describe_instance_status_by_ids(instance_ids:list) -> dict:
+        """Returns instance id -> instance status, including instances that are not running yet."""
+        ec2_aws_client = AwsSessionFactory.ec2()
+        paginator = ec2_aws_client.get_paginator('describe_instance_status')
+        statuses = {}
+        for start in range(0, len(instance_ids), Ec2Gateway.DESCRIBE_STATUS_MAX_INSTANCE_IDS_PER_CALL):
+            # MaxResults can't be combined with InstanceIds, so no PageSize here
+            page_iterator = paginator.paginate(
+                InstanceIds=instance_ids[start:start + Ec2Gateway.DESCRIBE_STATUS_MAX_INSTANCE_IDS_PER_CALL],
+                IncludeAllInstances=True)
+            for page in page_iterator:
+                for status in page['InstanceStatuses']:
+                    statuses[status['InstanceId']] = status
+        return statuses
+
+    @staticmethod
+    def find_first_ec2_instance(filters=[], predicate=None):
+        """Returns the first instance matching the filters and predicate, or None."""
+        return next(filter(predicate, Ec2Gateway.iter_ec2_instances(filters)), None)
     
     @staticmethod
     def terminate_instances(instances:list[str]):
@@ -30,21 +88,16 @@ class Ec2Gateway:
         return ec2_aws_client.terminate_instances(InstanceIds=instances, DryRun=False)
 
     @staticmethod
-    def find_ec2_instances_with_tag(filters=[]):
+    def wait_for_instances_terminated(instance_ids:list[str]):
+        """Blocks until every instance is terminated, polling them together with the instance_terminated waiter."""
         ec2_aws_client = AwsSessionFactory.ec2()
-        # Create a paginator for the describe_instances method
-        paginator = ec2_aws_client.get_paginator('describe_instances')
-        page_iterator = paginator.paginate(Filters=filters)
-
-        all_instances = []
+        waiter = ec2_aws_client.get_waiter('instance_terminated')
+        for start in range(0, len(instance_ids), Ec2Gateway.DESCRIBE_MAX_INSTANCE_IDS_PER_CALL):
+            waiter.wait(InstanceIds=instance_ids[start:start + Ec2Gateway.DESCRIBE_MAX_INSTANCE_IDS_PER_CALL],
+                        WaiterConfig={'Delay': Ec2Gateway.TERMINATED_WAITER_DELAY_SECONDS,
+                                      'MaxAttempts': Ec2Gateway.TERMINATED_WAITER_MAX_ATTEMPTS})
 
-        for page in page_iterator:
-            for reservation in page['Reservations']:
-                for instance in reservation['Instances']:
-                    all_instances.append(instance)
-
-        # for instance in all_instances:
-        #    logger.info(f"Found EC2 instance with ID: {instance['InstanceId']}")
-
-        return all_instances
+    @staticmethod
+    def find_ec2_instances_with_tag(filters=[]):
+        return list(Ec2Gateway.iter_ec2_instances(filters))
 
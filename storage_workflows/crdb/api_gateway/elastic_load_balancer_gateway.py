@@ -16,23 +16,23 @@ class ElasticLoadBalancerGateway:
         retry=retry_if_exception_type(ClientError),
         reraise=True
     )
-    def describe_load_balancers(names:list, marker=''):
-        elastic_load_balancer_client = AwsSessionFactory.elb()
-        if not marker:
-            response = elastic_load_balancer_client.describe_load_balancers(LoadBalancerNames=names,
-                                                                            PageSize=ElasticLoadBalancerGateway.PAGINATOR_MAX_RESULT_PER_PAGE)
-        else:
-            response = elastic_load_balancer_client.describe_load_balancers(LoadBalancerNames=names,
-                                                                            Marker=marker,
-                                                                            PageSize=ElasticLoadBalancerGateway.PAGINATOR_MAX_RESULT_PER_PAGE)
+    def describe_load_balancers(names:list):
+        # retried as a whole, a generator can't be retried once it has yielded
+        return list(ElasticLoadBalancerGateway.iter_load_balancers(names))
 
-        if 'NextMarker' in response:
-            next_page = ElasticLoadBalancerGateway.describe_load_balancers(LoadBalancerNames=names,
-                                                                           Marker=response['NextMarker'],
-                                                                           PageSize=ElasticLoadBalancerGateway.PAGINATOR_MAX_RESULT_PER_PAGE)
-            return response['LoadBalancerDescriptions'] + next_page
+    @staticmethod
+    def iter_load_balancers(names:list):
+        elastic_load_balancer_client = AwsSessionFactory.elb()
+        paginator = elastic_load_balancer_client.get_paginator('describe_load_balancers')
+        page_iterator = paginator.paginate(LoadBalancerNames=names, PaginationConfig={
+            'PageSize': ElasticLoadBalancerGateway.PAGINATOR_MAX_RESULT_PER_PAGE})
+        for page in page_iterator:
+            yield from page['LoadBalancerDescriptions']
 
-        return response['LoadBalancerDescriptions']
+    @staticmethod
+    def find_first_load_balancer(names:list, predicate=None):
+        """Returns the first load balancer matching the names and predicate, or None."""
+        return next(filter(predicate, ElasticLoadBalancerGateway.iter_load_balancers(names)), None)
 
     @staticmethod
     @retry(
@@ -4,6 +4,9 @@ import botocore.exceptions
 
 class SecretManagerGateway:
     PAGINATOR_MAX_RESULT_PER_PAGE = 100
+    BATCH_GET_MAX_SECRETS_PER_CALL = 20
+    # BatchGetSecretValue errors after which GetSecretValue per secret may still work
+    BATCH_GET_FALLBACK_ERROR_CODES = ('AccessDeniedException', 'UnknownOperationException', 'InvalidAction')
 
     @staticmethod
     def _get_secret_manager_client():
@@ -11,17 +14,29 @@ class SecretManagerGateway:
         return AwsSessionFactory.secret_manager()
 
     @staticmethod
-    def list_secrets(filters=None, next_token=None):
+    def list_secrets(filters=None):
         """
         List secrets based on filters.
 
         Args:
         - filters (list): List of filter conditions.
-        - next_token (str): Token for pagination.
 
         Returns:
         - list: List of secrets.
         """
+        return list(SecretManagerGateway.iter_secrets(filters))
+
+    @staticmethod
+    def iter_secrets(filters=None):
+        """
+        Yield secrets based on filters, one page at a time.
+
+        Args:
+        - filters (list): List of filter conditions.
+
+        Yields:
+        - dict: Secret list entry.
+        """
         if filters is None:
             filters = []
 
@@ -30,17 +45,13 @@ class SecretManagerGateway:
 
         secret_manager_aws_client = SecretManagerGateway._get_secret_manager_client()
 
-        request_params = {
-            'Filters': filters,
-            'MaxResults': SecretManagerGateway.PAGINATOR_MAX_RESULT_PER_PAGE,
-            'IncludePlannedDeletion': False
-        }
-
-        if next_token:
-            request_params['NextToken'] = next_token
+        paginator = secret_manager_aws_client.get_paginator('list_secrets')
+        page_iterator = paginator.paginate(Filters=filters, IncludePlannedDeletion=False, PaginationConfig={
+            'PageSize': SecretManagerGateway.PAGINATOR_MAX_RESULT_PER_PAGE})
 
         try:
-            response = secret_manager_aws_client.list_secrets(**request_params)
+            for page in page_iterator:
+                yield from page.get('SecretList', [])
         except botocore.exceptions.ClientError as e:
             if e.response['Error']['Code'] == 'ValidationException':
                 # Generate a string representation of the filters for the error message
@@ -48,15 +59,10 @@ class SecretManagerGateway:
                 raise ValueError(f"Validation error with filters: {filters_str}") from e
             raise
 
-        secrets = response.get('SecretList', [])
-
-        # Check for more secrets (pagination)
-        if 'NextToken' in response:
-            secrets.extend(
-                SecretManagerGateway.list_secrets(filters, response['NextToken'])
-            )
-
-        return secrets
+    @staticmethod
+    def find_first_secret(filters=None, predicate=None):
+        """Returns the first secret matching the filters and predicate, or None."""
+        return next(filter(predicate, SecretManagerGateway.iter_secrets(filters)), None)
 
     @staticmethod
     def find_secret(secret_arn):
@@ -75,3 +81,46 @@ class SecretManagerGateway:
         except botocore.exceptions.ClientError as e:
             # Handle specific errors or re-raise the exception
             raise
+
+    @staticmethod
+    def batch_find_secrets(secret_arns):
+        """Retrieve the values of several secrets in as few calls as possible.
+
+        Uses BatchGetSecretValue when the installed botocore supports it and falls back to one
+        GetSecretValue call per ARN otherwise, or when the role may not call BatchGetSecretValue.
+
+        Args:
+        - secret_arns (list): ARNs of the secrets.
+
+        Returns:
+        - dict: Secret value data keyed by ARN.
+        """
+        secret_manager_aws_client = SecretManagerGateway._get_secret_manager_client()
+        if not hasattr(secret_manager_aws_client, 'batch_get_secret_value'):
+            return {secret_arn: SecretManagerGateway.find_secret(secret_arn) for secret_arn in secret_arns}
+
+        try:
+            return SecretManagerGateway._batch_get_secret_values(secret_manager_aws_client, secret_arns)
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] not in SecretManagerGateway.BATCH_GET_FALLBACK_ERROR_CODES:
+                raise
+            return {secret_arn: SecretManagerGateway.find_secret(secret_arn) for secret_arn in secret_arns}
+
+    @staticmethod
+    def _batch_get_secret_values(secret_manager_aws_client, secret_arns):
+        secret_values = {}
+        for start in range(0, len(secret_arns), SecretManagerGateway.BATCH_GET_MAX_SECRETS_PER_CALL):
+            request_params = {
+                'SecretIdList': secret_arns[start:start + SecretManagerGateway.BATCH_GET_MAX_SECRETS_PER_CALL]
+            }
+            while True:
+                response = secret_manager_aws_client.batch_get_secret_value(**request_params)
+                if response.get('Errors'):
+                    errors_str = ', '.join([f"{e.get('SecretId')}: {e.get('ErrorCode')}" for e in response['Errors']])
+                    raise ValueError(f"Failed to retrieve secrets: {errors_str}")
+                for secret_value in response.get('SecretValues', []):
+                    secret_values[secret_value['ARN']] = secret_value
+                if 'NextToken' not in response:
+                    break
+                request_params['NextToken'] = response['NextToken']
+        return secret_values
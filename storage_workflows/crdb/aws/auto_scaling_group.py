@@ -1,6 +1,7 @@
 from __future__ import annotations
 from storage_workflows.crdb.api_gateway.auto_scaling_group_gateway import AutoScalingGroupGateway
 from storage_workflows.crdb.aws.auto_scaling_group_instance import AutoScalingGroupInstance
+from storage_workflows.crdb.aws.instance_readiness_tracker import InstanceReadinessTracker
 from storage_workflows.logging.logger import Logger
 import os
 import time
@@ -19,7 +20,10 @@ class AutoScalingGroup:
     @staticmethod
     def find_auto_scaling_group_by_cluster_name(cluster_name) -> AutoScalingGroup:
         filter = AutoScalingGroup.build_filter_by_cluster_name(cluster_name)
-        return AutoScalingGroup.find_all_auto_scaling_groups([filter])[0]
+        api_response = AutoScalingGroupGateway.find_first_auto_scaling_group([filter])
+        if api_response is None:
+            raise IndexError("No auto scaling group found for cluster {}.".format(cluster_name))
+        return AutoScalingGroup(api_response)
     
     @staticmethod
     def build_filter_by_cluster_name(cluster_name: str):
@@ -84,47 +88,49 @@ class AutoScalingGroup:
         return self._api_response.get('LaunchTemplate', {}).get('Id')
 
     def reload(self, cluster_name:str):
-        self._api_response = AutoScalingGroupGateway.describe_auto_scaling_groups([AutoScalingGroup.build_filter_by_cluster_name(cluster_name)])[0]
+        api_response = AutoScalingGroupGateway.find_first_auto_scaling_group([AutoScalingGroup.build_filter_by_cluster_name(cluster_name)])
+        if api_response is None:
+            raise IndexError("No auto scaling group found for cluster {}.".format(cluster_name))
+        self._api_response = api_response
 
     def instances_not_in_service_exist(self):
         return any(map(lambda instance: not instance.in_service(), self.instances))
 
-    def add_ec2_instances(self, desired_capacity, autoscale=False, deployment_env=None):
+    def add_ec2_instances(self, desired_capacity, autoscale=False, deployment_env=None, on_instance_ready=None):
+        """
+        Raises the desired capacity and returns the ids of the new instances once all of them are ready.
+        on_instance_ready is called with each new instance id as soon as that instance is ready. Returns
+        an empty list without changing the ASG when desired_capacity doesn't launch any instance.
+        """
         asg_instances = self.instances
         if desired_capacity == self.capacity and not autoscale:
             logger.warning("Expected Desired capacity same as existing desired capacity.")
             return
 
-        initial_actual_capacity = len(asg_instances)  # sum of all instances irrespective of their state
-        old_instance_ids = set()
-        # Retrieve the existing instance IDs
-        for instance in asg_instances:
-            old_instance_ids.add(instance.instance_id)
+        self._api_response = AutoScalingGroupGateway.describe_auto_scaling_groups_by_name(self.name)[0]
+        asg_instances = self.instances
+        old_instance_ids = set(instance.instance_id for instance in asg_instances)
+        # the ASG launches up to desired_capacity counting only the instances that aren't in standby
+        expected_count = desired_capacity - sum(1 for instance in asg_instances if instance.counts_toward_capacity())
+        if expected_count <= 0:
+            logger.warning("{}: {} instance(s) already count toward desired capacity {}, no instances to add.".format(
+                self.name, desired_capacity - expected_count, desired_capacity))
+            return []
 
         # Use a dry run to ensure there's enough capacity for the desired instance type
         if deployment_env != 'staging':
-            if not self.dry_run_check_instance_availability(desired_capacity - self.capacity):
+            if not self.dry_run_check_instance_availability(expected_count):
                 raise Exception(f"Dry run failed to validate the availability {self.instance_type}")
 
         # Update ASG capacity
         AutoScalingGroupGateway.update_auto_scaling_group_capacity(self.name, desired_capacity)
-        # Wait for the new instances to be added to the Auto Scaling group
-        while True:
-            asg_instances = AutoScalingGroupGateway.describe_auto_scaling_groups_by_name(self.name)[0]["Instances"]
-            actual_capacity = len(asg_instances)
-            new_instance_ids = set()  # Store new instance IDs
-            # Retrieve the instance IDs of the newly added instances
-            for instance in asg_instances:
-                if instance["InstanceId"] not in old_instance_ids and instance["LifecycleState"] == "InService":
-                    new_instance_ids.add(instance["InstanceId"])
-            # Check if all new instances are found
-            if len(new_instance_ids) == actual_capacity - initial_actual_capacity and actual_capacity != initial_actual_capacity:
-                logger.info("All new instances are ready.")
-                break
-            # Wait before checking again
-            time.sleep(10)
+        # Wait for the new instances, handing each one over as soon as it is ready
+        tracker = InstanceReadinessTracker(self.name, old_instance_ids, expected_count)
+        for instance_id in tracker.iter_ready_instance_ids():
+            if on_instance_ready is not None:
+                on_instance_ready(instance_id)
 
-        return list(new_instance_ids)
+        return tracker.ready_instance_ids
 
     def check_equal_az_distribution_in_asg(self):
         az_count = {}
@@ -8,6 +8,10 @@ class AutoScalingGroupInstance:
     def in_service(self):
         return self._api_response['LifecycleState'] == "InService"
 
+    def counts_toward_capacity(self):
+        # standby, terminating and detaching instances are not part of the desired capacity
+        return self._api_response['LifecycleState'].startswith(("Pending", "InService"))
+
     def is_healthy(self):
         return self._api_response['HealthStatus'] == "Healthy"
 
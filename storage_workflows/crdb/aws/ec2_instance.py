@@ -1,5 +1,4 @@
 from __future__ import annotations
-import time
 import os
 from functools import cached_property
 from storage_workflows.crdb.api_gateway.ec2_gateway import Ec2Gateway
@@ -17,8 +16,37 @@ class Ec2Instance:
             'Name': 'instance-id',
             'Values': [instance_id]
         }]
-        return Ec2Instance(Ec2Gateway.describe_ec2_instances(filters)[0])
+        api_response = Ec2Gateway.find_first_ec2_instance(filters)
+        if api_response is None:
+            raise IndexError("Instance {} not found.".format(instance_id))
+        return Ec2Instance(api_response)
     
+    @staticmethod
+    def find_ec2_instances(instance_ids:list, allow_missing:bool=False) -> dict[str, Ec2Instance]:
+        """
+        Returns instance id -> Ec2Instance, looked up in bulk. Raises IndexError naming the ids that don't
+        exist, unless allow_missing is set, in which case they are left out.
+        """
+        ec2_instances = {instance_id: Ec2Instance(api_response)
+                         for instance_id, api_response in Ec2Gateway.describe_ec2_instances_by_ids(instance_ids).items()}
+        missing_instance_ids = [instance_id for instance_id in dict.fromkeys(instance_ids)
+                                if instance_id not in ec2_instances]
+        if missing_instance_ids and not allow_missing:
+            raise IndexError("Instances {} not found.".format(missing_instance_ids))
+        return ec2_instances
+
+    @staticmethod
+    def terminate_instances(instances:list[Ec2Instance]):
+        """Terminates the instances together and waits until all of them are terminated."""
+        instance_ids = list(dict.fromkeys(instance.instance_id for instance in instances))
+        if not instance_ids:
+            return
+        logger.info("Terminating instances {}...".format(instance_ids))
+        for start in range(0, len(instance_ids), Ec2Gateway.TERMINATE_MAX_INSTANCE_IDS_PER_CALL):
+            Ec2Gateway.terminate_instances(instance_ids[start:start + Ec2Gateway.TERMINATE_MAX_INSTANCE_IDS_PER_CALL])
+        Ec2Gateway.wait_for_instances_terminated(instance_ids)
+        logger.info("Instances {} terminated.".format(instance_ids))
+
     @staticmethod
     def find_ec2_instances_by_cluster_tag(cluster_name:str) -> list[Ec2Instance]:
         filters = [{
@@ -27,8 +55,7 @@ class Ec2Instance:
                 cluster_name + "_" + os.getenv('DEPLOYMENT_ENV'),
             ]
         }]
-        # return list(map(lambda response: Ec2Instance(response), Ec2Gateway.describe_ec2_instances(filters)))
-        return list(map(lambda response: Ec2Instance(response), Ec2Gateway.find_ec2_instances_with_tag(filters)))
+        return list(map(lambda response: Ec2Instance(response), Ec2Gateway.iter_ec2_instances(filters)))
 
     def __init__(self, api_response):
         self._api_response = api_response
@@ -59,17 +86,14 @@ class Ec2Instance:
             'Name': 'instance-id',
             'Values': [self.instance_id]
         }]
-        self._api_response = Ec2Gateway.describe_ec2_instances(filters)[0]
+        api_response = Ec2Gateway.find_first_ec2_instance(filters)
+        if api_response is None:
+            raise IndexError("Instance {} not found.".format(self.instance_id))
+        self._api_response = api_response
     
     def terminate_instance(self):
-        logger.info("Terminating instance {}...".format(self.instance_id))
-        Ec2Gateway.terminate_instances([self.instance_id])
-        while self.state != 'terminated':
-            logger.info("Current state is {}".format(self.state))
-            logger.info("sleeping 30s...")
-            time.sleep(30)
-            self.reload()
-        logger.info("Instance {} terminated.".format(self.instance_id))
+        Ec2Instance.terminate_instances([self])
+        self.reload()
 
     
 
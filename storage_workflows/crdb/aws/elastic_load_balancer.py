@@ -42,8 +42,12 @@ class ElasticLoadBalancer:
         return self.api_response['LoadBalancerName']
 
     def reload(self):
-        self.api_response = list(filter(lambda load_balancer: load_balancer['LoadBalancerName'] == self.load_balancer_name, 
-                                        ElasticLoadBalancerGateway.describe_load_balancers([self.load_balancer_name])))[0]
+        api_response = ElasticLoadBalancerGateway.find_first_load_balancer(
+            [self.load_balancer_name],
+            lambda load_balancer: load_balancer['LoadBalancerName'] == self.load_balancer_name)
+        if api_response is None:
+            raise IndexError("Load balancer {} not found.".format(self.load_balancer_name))
+        self.api_response = api_response
         
     def register_instances(self, instances:list):
         try:
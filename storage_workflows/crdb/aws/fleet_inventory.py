@@ -0,0 +1,107 @@
+from __future__ import annotations
+import os
+import time
+from storage_workflows.crdb.api_gateway.auto_scaling_group_gateway import AutoScalingGroupGateway
+from storage_workflows.crdb.api_gateway.ebs_gateway import EBSGateway
+from storage_workflows.crdb.api_gateway.ec2_gateway import Ec2Gateway
+from storage_workflows.crdb.api_gateway.elastic_load_balancer_gateway import ElasticLoadBalancerGateway
+from storage_workflows.crdb.aws.auto_scaling_group import AutoScalingGroup
+from storage_workflows.crdb.aws.ec2_instance import Ec2Instance
+from storage_workflows.crdb.aws.elastic_load_balancer import ElasticLoadBalancer
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class FleetInventory:
+    """
+    Snapshot of the crdb tagged ASGs, EC2 instances, data volumes and ETL load balancers of a region,
+    indexed by cluster name. Built with a handful of paginated calls instead of several per cluster.
+    It is only trusted for TTL_SECONDS, and clusters whose resources were changed should be forgotten
+    so they are described again.
+
+    Usage:
+        inventory = FleetInventory.build(deployment_env)
+        if inventory.covers(cluster_name):
+            asg = inventory.auto_scaling_group(cluster_name)
+    """
+
+    CLUSTER_NAME_TAG = 'crdb_cluster_name'
+    TTL_SECONDS = int(os.getenv('FLEET_INVENTORY_TTL_SECONDS', '300'))
+
+    @staticmethod
+    def build(deployment_env: str = None) -> FleetInventory:
+        deployment_env = deployment_env or os.getenv('DEPLOYMENT_ENV')
+        crdb_tag_filter = {'Name': 'tag-key', 'Values': [FleetInventory.CLUSTER_NAME_TAG]}
+        inventory = FleetInventory(deployment_env)
+        for api_response in AutoScalingGroupGateway.iter_auto_scaling_groups([crdb_tag_filter]):
+            cluster_name = inventory._cluster_name_of(api_response)
+            inventory._auto_scaling_groups[cluster_name] = AutoScalingGroup(api_response)
+        for api_response in Ec2Gateway.iter_ec2_instances([crdb_tag_filter]):
+            cluster_name = inventory._cluster_name_of(api_response)
+            inventory._ec2_instances.setdefault(cluster_name, []).append(Ec2Instance(api_response))
+        live_instance_ids = [instance.instance_id for instances in inventory._ec2_instances.values()
+                             for instance in instances if instance.state not in ('terminated', 'shutting-down')]
+        inventory._ebs_volumes = EBSGateway.get_ebs_volumes_for_instances(live_instance_ids)
+        load_balancers = {load_balancer['LoadBalancerName']: load_balancer
+                          for load_balancer in ElasticLoadBalancerGateway.iter_load_balancers([])}
+        for cluster_name in inventory._auto_scaling_groups:
+            load_balancer = load_balancers.get(FleetInventory.etl_load_balancer_name(cluster_name))
+            if load_balancer is not None:
+                inventory._etl_load_balancers[cluster_name] = ElasticLoadBalancer(load_balancer)
+        logger.info("Fleet inventory: {} clusters, {} instances, {} ETL load balancers.".format(
+            len(inventory._auto_scaling_groups), sum(map(len, inventory._ec2_instances.values())),
+            len(inventory._etl_load_balancers)))
+        return inventory
+
+    @staticmethod
+    def etl_load_balancer_name(cluster_name: str) -> str:
+        return (cluster_name.replace("_", "-") + "-crdb-etl")[:32]
+
+    def __init__(self, deployment_env: str):
+        self._deployment_env = deployment_env
+        self._auto_scaling_groups = {}
+        self._ec2_instances = {}
+        # instance id -> list[EBSVolume]
+        self._ebs_volumes = {}
+        self._etl_load_balancers = {}
+        self._expires_at = time.time() + FleetInventory.TTL_SECONDS
+
+    @property
+    def cluster_names(self) -> list:
+        return sorted(self._auto_scaling_groups)
+
+    @property
+    def is_expired(self) -> bool:
+        return time.time() >= self._expires_at
+
+    def has_cluster(self, cluster_name: str) -> bool:
+        return cluster_name in self._auto_scaling_groups
+
+    def covers(self, cluster_name: str) -> bool:
+        return not self.is_expired and self.has_cluster(cluster_name)
+
+    def forget(self, cluster_name: str):
+        """Drops the resources of a cluster, so they are described again after a step changed them."""
+        self._auto_scaling_groups.pop(cluster_name, None)
+        for instance in self._ec2_instances.pop(cluster_name, []):
+            self._ebs_volumes.pop(instance.instance_id, None)
+        self._etl_load_balancers.pop(cluster_name, None)
+
+    def auto_scaling_group(self, cluster_name: str) -> AutoScalingGroup | None:
+        return self._auto_scaling_groups.get(cluster_name)
+
+    def ec2_instances(self, cluster_name: str) -> list[Ec2Instance]:
+        return list(self._ec2_instances.get(cluster_name, []))
+
+    def ebs_volumes(self, instance_id: str) -> list:
+        return list(self._ebs_volumes.get(instance_id, []))
+
+    def etl_load_balancer(self, cluster_name: str) -> ElasticLoadBalancer | None:
+        return self._etl_load_balancers.get(cluster_name)
+
+    def _cluster_name_of(self, api_response) -> str:
+        tags = {tag['Key']: tag['Value'] for tag in api_response.get('Tags', [])}
+        tag_value = tags.get(FleetInventory.CLUSTER_NAME_TAG, '')
+        suffix = "_" + self._deployment_env
+        return tag_value[:-len(suffix)] if tag_value.endswith(suffix) else tag_value
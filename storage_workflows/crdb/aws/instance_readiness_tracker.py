@@ -0,0 +1,87 @@
+import os
+import random
+import time
+from storage_workflows.crdb.api_gateway.auto_scaling_group_gateway import AutoScalingGroupGateway
+from storage_workflows.crdb.api_gateway.ec2_gateway import Ec2Gateway
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class InstanceReadinessTracker:
+    """
+    Watches the instances an ASG launches after a capacity increase and yields each one as soon as it is
+    InService in the ASG and passes both EC2 status checks.
+
+    Usage:
+        tracker = InstanceReadinessTracker(asg_name, existing_instance_ids, expected_count=3)
+        for instance_id in tracker.iter_ready_instance_ids():
+            ...
+    """
+
+    MIN_POLL_INTERVAL_SECONDS = 10
+    MAX_POLL_INTERVAL_SECONDS = 60
+    TIMEOUT_SECONDS = int(os.getenv('ASG_INSTANCE_READINESS_TIMEOUT_SECONDS', '1800'))
+
+    def __init__(self, asg_name: str, existing_instance_ids, expected_count: int, timeout_seconds: int = None):
+        self._asg_name = asg_name
+        self._existing_instance_ids = set(existing_instance_ids)
+        self._expected_count = expected_count
+        self._timeout_seconds = timeout_seconds or InstanceReadinessTracker.TIMEOUT_SECONDS
+        # instance id -> why it isn't ready yet
+        self._pending = {}
+        self._ready_instance_ids = []
+
+    @property
+    def ready_instance_ids(self) -> list:
+        return list(self._ready_instance_ids)
+
+    def iter_ready_instance_ids(self):
+        deadline = time.monotonic() + self._timeout_seconds
+        poll_interval = InstanceReadinessTracker.MIN_POLL_INTERVAL_SECONDS
+        while len(self._ready_instance_ids) < self._expected_count:
+            newly_ready = self._poll()
+            yield from newly_ready
+            if len(self._ready_instance_ids) >= self._expected_count:
+                break
+            logger.info("{}: {}/{} new instances ready, waiting for {}.".format(
+                self._asg_name, len(self._ready_instance_ids), self._expected_count, self._pending or "launch"))
+            if newly_ready:
+                poll_interval = InstanceReadinessTracker.MIN_POLL_INTERVAL_SECONDS
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("{}: only {}/{} new instances ready after {} seconds, still waiting for {}.".format(
+                    self._asg_name, len(self._ready_instance_ids), self._expected_count, self._timeout_seconds,
+                    self._pending or "launch"))
+            time.sleep(min(random.uniform(poll_interval / 2, poll_interval), remaining))
+            poll_interval = min(poll_interval * 2, InstanceReadinessTracker.MAX_POLL_INTERVAL_SECONDS)
+        logger.info("All new instances are ready.")
+
+    def _poll(self) -> list:
+        asg_instances = AutoScalingGroupGateway.describe_auto_scaling_groups_by_name(self._asg_name)[0]["Instances"]
+        self._pending = {}
+        in_service_ids = []
+        for instance in asg_instances:
+            instance_id = instance["InstanceId"]
+            if instance_id in self._existing_instance_ids or instance_id in self._ready_instance_ids:
+                continue
+            if instance["LifecycleState"] == "InService":
+                in_service_ids.append(instance_id)
+            else:
+                self._pending[instance_id] = instance["LifecycleState"]
+        if not in_service_ids:
+            return []
+
+        statuses = Ec2Gateway.describe_instance_status_by_ids(in_service_ids)
+        newly_ready = []
+        for instance_id in in_service_ids:
+            status = statuses.get(instance_id, {})
+            instance_status = status.get('InstanceStatus', {}).get('Status', 'unknown')
+            system_status = status.get('SystemStatus', {}).get('Status', 'unknown')
+            if instance_status == 'ok' and system_status == 'ok':
+                logger.info("{}: instance {} is ready.".format(self._asg_name, instance_id))
+                self._ready_instance_ids.append(instance_id)
+                newly_ready.append(instance_id)
+            else:
+                self._pending[instance_id] = "status checks {}/{}".format(instance_status, system_status)
+        return newly_ready
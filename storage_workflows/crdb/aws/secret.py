@@ -5,8 +5,8 @@ class Secret:
 
     @staticmethod
     def find_all_secrets(filters: list) -> list:
-        return list(map(lambda secret: Secret(secret), 
-                        SecretManagerGateway.list_secrets(filters)))
+        return list(map(lambda secret: Secret(secret),
+                        SecretManagerGateway.iter_secrets(filters)))
 
     def __init__(self, api_response):
         self._api_response = api_response
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+from storage_workflows.crdb.api_gateway.secret_manager_gateway import SecretManagerGateway
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class SecretIndex:
+    """
+    In-memory index of the non-deprecated crdb secrets of a deployment environment, keyed by their
+    (crdb_cluster_name, cred-type, client) tags and loaded with a single paginated ListSecrets.
+
+    Lookups only use the index after prefetch() was called, so single cluster commands keep listing the
+    secrets of their own cluster. The index is reloaded once it is older than TTL_SECONDS.
+    """
+
+    TTL_SECONDS = int(os.getenv('SECRET_INDEX_TTL_SECONDS', '300'))
+    _lock = threading.Lock()
+    _deployment_env = None
+    _expires_at = 0
+    # (crdb_cluster_name, cred-type, client) -> secret list entry
+    _secrets = {}
+    # (crdb_cluster_name, cred-type) -> first secret list entry, whatever its client
+    _secrets_by_cred_type = {}
+
+    @staticmethod
+    def prefetch(deployment_env: str = None):
+        deployment_env = deployment_env or os.getenv('DEPLOYMENT_ENV')
+        secret_filters = [
+            {'Key': 'tag-key', 'Values': ['crdb_cluster_name']},
+            {'Key': 'tag-value', 'Values': [deployment_env]},
+            {'Key': 'description', 'Values': ['!DEPRECATED']}
+        ]
+        secrets = {}
+        secrets_by_cred_type = {}
+        for secret in SecretManagerGateway.iter_secrets(secret_filters):
+            tags = {tag['Key']: tag['Value'] for tag in secret.get('Tags', [])}
+            cluster_name_tag = tags.get('crdb_cluster_name')
+            cred_type = tags.get('cred-type')
+            secrets.setdefault((cluster_name_tag, cred_type, tags.get('client', '')), secret)
+            secrets_by_cred_type.setdefault((cluster_name_tag, cred_type), secret)
+        with SecretIndex._lock:
+            SecretIndex._deployment_env = deployment_env
+            SecretIndex._expires_at = time.time() + SecretIndex.TTL_SECONDS
+            SecretIndex._secrets = secrets
+            SecretIndex._secrets_by_cred_type = secrets_by_cred_type
+        logger.info("Indexed {} crdb secrets for {}.".format(len(secrets), deployment_env))
+
+    @staticmethod
+    def is_prefetched() -> bool:
+        return SecretIndex._deployment_env is not None
+
+    @staticmethod
+    def find(cluster_name_tag: str, cred_type: str, client: str = ""):
+        """
+        Returns the secret list entry with these tags, any client matching when client is empty.
+        Returns None when nothing matches or prefetch() wasn't called.
+        """
+        if not SecretIndex.is_prefetched():
+            return None
+        if time.time() >= SecretIndex._expires_at:
+            SecretIndex.prefetch(SecretIndex._deployment_env)
+        with SecretIndex._lock:
+            if client:
+                return SecretIndex._secrets.get((cluster_name_tag, cred_type, client))
+            return SecretIndex._secrets_by_cred_type.get((cluster_name_tag, cred_type))
+
+    @staticmethod
+    def clear():
+        with SecretIndex._lock:
+            SecretIndex._deployment_env = None
+            SecretIndex._expires_at = 0
+            SecretIndex._secrets = {}
+            SecretIndex._secrets_by_cred_type = {}
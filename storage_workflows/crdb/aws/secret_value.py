@@ -1,4 +1,5 @@
 from storage_workflows.crdb.api_gateway.secret_manager_gateway import SecretManagerGateway
+import hashlib
 import os
 import stat
 
@@ -14,12 +15,30 @@ class SecretValue:
     @property
     def secret_string(self):
         return self._api_response['SecretString']
+
+    @property
+    def version_id(self):
+        return self._api_response.get('VersionId')
+
+    @property
+    def content_hash(self):
+        return hashlib.sha256(self.secret_string.encode()).hexdigest()
     
     def write_to_file(self, dir_path, file_name):
+        """
+        Write the secret to dir_path/file_name. The file is left untouched when it already holds
+        the same content, so repeated connections do not rewrite cert files.
+        Returns True if the file was written.
+        """
         if not os.path.exists(dir_path):
             os.makedirs(dir_path)
         file_path = os.path.join(dir_path, file_name)
+        if os.path.exists(file_path):
+            with open(file_path, "rb") as file:
+                if hashlib.sha256(file.read()).hexdigest() == self.content_hash:
+                    return False
         file = open(file_path, "w")
         file.write(self.secret_string)
         file.close()
-        os.chmod(file_path, stat.S_IREAD|stat.S_IWRITE)
\ No newline at end of file
+        os.chmod(file_path, stat.S_IREAD|stat.S_IWRITE)
+        return True
@@ -0,0 +1,95 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class StsCredentialCache:
+    """
+    Caches AssumeRole responses in a file per role ARN under CACHE_DIR_PATH, so the steps of a workflow
+    sharing a volume, and the checks of one step, reuse the role instead of assuming it again.
+
+    Credentials are refreshed REFRESH_AHEAD_SECONDS before their Expiration. A lock file serializes
+    refreshes, so concurrent steps don't all call STS when the cached credentials run out.
+    """
+
+    CACHE_DIR_PATH = os.getenv('AWS_STS_CREDENTIAL_CACHE_DIR', '/tmp/sts_credentials')
+    REFRESH_AHEAD_SECONDS = int(os.getenv('AWS_STS_CREDENTIAL_REFRESH_AHEAD_SECONDS', '600'))
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(role_arn: str, assume_role) -> dict:
+        """
+        Returns the cached AssumeRole response of the role, calling assume_role() for a fresh one when
+        there is none or it is about to expire.
+        """
+        with StsCredentialCache._lock:
+            response = StsCredentialCache._read(role_arn)
+            if StsCredentialCache._is_fresh(response):
+                return response
+            os.makedirs(StsCredentialCache.CACHE_DIR_PATH, mode=0o700, exist_ok=True)
+            with open(StsCredentialCache._path(role_arn) + '.lock', 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # another process may have refreshed it while we waited for the lock
+                    response = StsCredentialCache._read(role_arn)
+                    if StsCredentialCache._is_fresh(response):
+                        return response
+                    logger.info("Assuming role {}.".format(role_arn))
+                    response = assume_role()
+                    StsCredentialCache._write(role_arn, response)
+                    return response
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def invalidate(role_arn: str):
+        with StsCredentialCache._lock:
+            try:
+                os.remove(StsCredentialCache._path(role_arn))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _path(role_arn: str) -> str:
+        file_name = hashlib.sha256(role_arn.encode()).hexdigest() + '.json'
+        return os.path.join(StsCredentialCache.CACHE_DIR_PATH, file_name)
+
+    @staticmethod
+    def _is_fresh(response) -> bool:
+        if response is None:
+            return False
+        expiration = response['Credentials']['Expiration']
+        return time.time() < expiration.timestamp() - StsCredentialCache.REFRESH_AHEAD_SECONDS
+
+    @staticmethod
+    def _read(role_arn: str):
+        try:
+            with open(StsCredentialCache._path(role_arn)) as file:
+                response = json.load(file)
+            response['Credentials']['Expiration'] = datetime.fromisoformat(response['Credentials']['Expiration'])
+            return response
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as error:
+            logger.warning("Ignoring unreadable STS credential cache for {}: {}".format(role_arn, error))
+            return None
+
+    @staticmethod
+    def _write(role_arn: str, response: dict):
+        cached = dict(Credentials=dict(response['Credentials'],
+                                       Expiration=response['Credentials']['Expiration'].isoformat()),
+                      AssumedRoleUser=response.get('AssumedRoleUser', {}))
+        path = StsCredentialCache._path(role_arn)
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        # the file holds live credentials, keep it private to the pod user
+        file_descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(file_descriptor, 'w') as file:
+            json.dump(cached, file)
+        os.replace(temp_path, path)
@@ -1,11 +1,12 @@
 from storage_workflows.crdb.api_gateway.sts_gateway import StsGateway
+from storage_workflows.crdb.aws.sts_credential_cache import StsCredentialCache
 
 
 class StsRole:
 
     @staticmethod
     def assume_role():
-        return StsRole(StsGateway.assume_role())
+        return StsRole(StsCredentialCache.get(StsGateway.role_arn(), StsGateway.assume_role))
     
     def __init__(self, api_response: dict):
         self._api_response = api_response
@@ -20,4 +21,12 @@ class StsRole:
     
     @property
     def session_token(self):
-        return self._api_response['Credentials']['SessionToken']
\ No newline at end of file
+        return self._api_response['Credentials']['SessionToken']
+
+    @property
+    def expiration(self):
+        return self._api_response['Credentials']['Expiration']
+
+    @property
+    def arn(self):
+        return self._api_response['AssumedRoleUser']['Arn']
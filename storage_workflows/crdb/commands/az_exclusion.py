@@ -91,12 +91,12 @@ def exclude_an_az_single_cluster(deployment_env, region, cluster_name, az):
         az = ''
     if az and az != 'us-west-2a' and az != 'us-west-2b' and az != 'us-west-2c':
         raise Exception("Invalid AZ {}.".format(az))
-    azs = 'Array[]' if not az else "Array['{}']".format(az)
-    UPDATE_AZ_EXCLUSION_CONFIG = "UPDATE auto_discovery.nodes_exclusion_config SET azs = {} WHERE is_valid is true;".format(azs)
+    azs = [az] if az else []
+    UPDATE_AZ_EXCLUSION_CONFIG = "UPDATE auto_discovery.nodes_exclusion_config SET azs = %s::STRING[] WHERE is_valid is true;"
     setup_env(deployment_env, region, cluster_name)
     logger.info("Starting az exclusion for cluster {}.".format(cluster_name))
     connection = CrdbConnection.get_crdb_connection(cluster_name)
     connection.connect()
-    connection.execute_sql(UPDATE_AZ_EXCLUSION_CONFIG, auto_commit=True)
+    connection.execute_sql(UPDATE_AZ_EXCLUSION_CONFIG, params=(azs,), auto_commit=True)
     connection.close()
     logger.info("AZ {} excluded for cluster {}.".format(az, cluster_name))
\ No newline at end of file
@@ -83,8 +83,8 @@ def insert_row(conn_pool: ThreadedConnectionPool):
     try: 
         cursor = conn.cursor()
         name = ''.join(random.SystemRandom().choice(string.ascii_letters + string.digits) for _ in range(10))
-        sql = "INSERT INTO test(name) VALUES ('{}');".format(name)
-        cursor.execute(sql)
+        sql = "INSERT INTO test(name) VALUES (%s);"
+        cursor.execute(sql, (name,))
         conn.commit()
     except:
         pass
@@ -99,8 +99,8 @@ def delete_row(conn_pool: ThreadedConnectionPool):
         cursor.execute(select_sql)
         response = cursor.fetchall()
         id = response[0][0]
-        delete_sql = "DELETE FROM test WHERE id = '{}';".format(id)
-        cursor.execute(delete_sql)
+        delete_sql = "DELETE FROM test WHERE id = %s;"
+        cursor.execute(delete_sql, (id,))
         conn.commit()
     except:
         pass
@@ -5,31 +5,40 @@ from collections import defaultdict
 import psycopg2
 from storage_workflows.crdb.aws.auto_scaling_group import AutoScalingGroup
 from storage_workflows.logging.logger import Logger
-from storage_workflows.crdb.models.cluster import Cluster
+from storage_workflows.crdb.models.jobs.changefeed_job import ChangefeedJob
 from storage_workflows.crdb.slack.content_templates import ContentTemplate
 from storage_workflows.setup_env import setup_env
 from storage_workflows.slack.slack_notification import SlackNotification, send_to_slack, generate_csv_file
-from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
+from storage_workflows.crdb.connect.crdb_connection_manager import CrdbConnectionManager
+from storage_workflows.crdb.connect.statement_timeout_exception import StatementTimeoutException
 from storage_workflows.crdb.aws.elastic_load_balancer import ElasticLoadBalancer
 from storage_workflows.crdb.aws.ec2_instance import Ec2Instance
+from storage_workflows.crdb.aws.fleet_inventory import FleetInventory
 from storage_workflows.metadata_db.storage_metadata.storage_metadata import StorageMetadata
 from storage_workflows.crdb.api_gateway.iam_gateway import IamGateway
 from storage_workflows.crdb.api_gateway.ebs_gateway import EBSGateway
 from storage_workflows.crdb.api_gateway.elastic_load_balancer_gateway import ElasticLoadBalancerGateway
 from storage_workflows.crdb.api_gateway.secret_manager_gateway import SecretManagerGateway
 from storage_workflows.crdb.aws.secret import Secret
+from storage_workflows.crdb.aws.secret_index import SecretIndex
 
 app = typer.Typer()
 logger = Logger()
+# a hung cluster shouldn't stall the rest of a fleet-wide run
+HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS = float(os.getenv('CRDB_HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS', '30'))
+# built by get_cluster_names so the per-cluster checks of run_health_check_all don't each describe the same
+# AWS resources. Commands run on their own, or after the inventory expired, describe them directly.
+_fleet_inventory = None
 
 
 @app.command()
 def get_cluster_names(deployment_env, region):
+    global _fleet_inventory
     setup_env(deployment_env, region)
-    asgs = AutoScalingGroup.find_all_auto_scaling_groups([AutoScalingGroup.build_filter_by_crdb_tag()])
-    names = list(map(lambda asg: asg.name.split("_{}-".format(deployment_env))[0], asgs))
+    _fleet_inventory = FleetInventory.build(deployment_env)
+    SecretIndex.prefetch(deployment_env)
+    names = _fleet_inventory.cluster_names
     # names=["parcel_service"]
-    names.sort()
     logger.info("Found {} clusters.".format(len(names)))
     logger.info(names)
     output_file = open("/tmp/cluster_names.json", "w")
@@ -37,6 +46,39 @@ def get_cluster_names(deployment_env, region):
     output_file.close()
 
 
+def _inventory_covers(cluster_name):
+    return _fleet_inventory is not None and _fleet_inventory.covers(cluster_name)
+
+
+def _forget_inventory(cluster_name):
+    if _fleet_inventory is not None:
+        _fleet_inventory.forget(cluster_name)
+
+
+def _find_auto_scaling_group(cluster_name):
+    if _inventory_covers(cluster_name):
+        return _fleet_inventory.auto_scaling_group(cluster_name)
+    return AutoScalingGroup.find_auto_scaling_group_by_cluster_name(cluster_name)
+
+
+def _find_ec2_instances(cluster_name):
+    if _inventory_covers(cluster_name):
+        return _fleet_inventory.ec2_instances(cluster_name)
+    return Ec2Instance.find_ec2_instances_by_cluster_tag(cluster_name)
+
+
+def _find_ebs_volumes(cluster_name, instance_id):
+    if _inventory_covers(cluster_name):
+        return _fleet_inventory.ebs_volumes(instance_id)
+    return EBSGateway.get_ebs_volumes_for_instance(instance_id)
+
+
+def _find_etl_load_balancer(cluster_name):
+    if _inventory_covers(cluster_name):
+        return _fleet_inventory.etl_load_balancer(cluster_name)
+    return ElasticLoadBalancer.find_elastic_load_balancer_by_cluster_name(cluster_name)
+
+
 # the deployment_env is either staging or prod
 # the region is us-west-2 in most cases
 # the cluster name is the one with underscore like ao_test
@@ -48,7 +90,7 @@ def asg_health_check(deployment_env, region, cluster_name):
     workflow_id = os.getenv('WORKFLOW-ID')
     check_type = "asg_health_check"
     logger.info(f"{cluster_name}: starting {check_type}")
-    asg = AutoScalingGroup.find_auto_scaling_group_by_cluster_name(cluster_name)
+    asg = _find_auto_scaling_group(cluster_name)
 
     # Debugging info
     instance_info = [(instance.instance_id, instance.health_status) for instance in asg.instances]
@@ -95,11 +137,11 @@ def volume_mismatch_health_check(deployment_env, region, cluster_name):
 
     logger.info(f"{cluster_name}: starting {check_type}")
 
-    asg = AutoScalingGroup.find_auto_scaling_group_by_cluster_name(cluster_name)
+    asg = _find_auto_scaling_group(cluster_name)
 
     all_volumes = []
     for instance in asg.instances:
-        all_volumes.extend((instance.instance_id, vol) for vol in EBSGateway.get_ebs_volumes_for_instance(instance.instance_id))
+        all_volumes.extend((instance.instance_id, vol) for vol in _find_ebs_volumes(cluster_name, instance.instance_id))
 
     reference_instance_id, reference_volume = all_volumes[0]
     consistent = True
@@ -145,9 +187,9 @@ def changefeed_health_check(deployment_env, region, cluster_name):
     logger.info(f"{cluster_name}: starting {check_type}")
     check_output=[]
     check_result="pass"
-    cluster = Cluster()
     try:
-        list_of_changefeed_jobs = list(cluster.changefeed_jobs)
+        list_of_changefeed_jobs = ChangefeedJob.find_all_changefeed_jobs(
+            cluster_name, statement_timeout=HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS)
         if len(list_of_changefeed_jobs) == 0:
             logger.info(f"{cluster_name}: No changefeed jobs found.")
             return
@@ -163,7 +205,7 @@ def changefeed_health_check(deployment_env, region, cluster_name):
                 logger.info(f"PASS: {cluster_name}: job_id {changefeed_job_id} is {changefeed_status}")
                 continue
 
-            changefeed_metadata = job.changefeed_metadata
+            changefeed_metadata = job.get_changefeed_metadata(HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS)
             latency = changefeed_metadata.latency
             running_status = changefeed_metadata.running_status
             error = changefeed_metadata.error
@@ -200,6 +242,10 @@ def changefeed_health_check(deployment_env, region, cluster_name):
                 logger.info(f"ELSE: {cluster_name}: job_id {changefeed_job_id} is {changefeed_status} with latency {latency}. INITIAL_SCAN_ONLY: {is_initial_scan_only}.")
                 check_output.append(f"ELSE: {changefeed_job_id}: {changefeed_status} latency: {latency}. INITIAL_SCAN_ONLY: {is_initial_scan_only}. RUNNING_STATUS: {running_status}. ERROR: {error}. FINISHED_AGO_SECONDS: {finished_ago_seconds}")
                 pass
+    except StatementTimeoutException as error:
+        logger.error(f"{cluster_name}: encountered error - {error}")
+        check_output = "statement_timeout"
+        check_result = "error"
     except (psycopg2.DatabaseError, ValueError) as error:
         check_output = "db_connection_error"
         check_result = "error"
@@ -224,7 +270,7 @@ def orphan_health_check(deployment_env, region, cluster_name):
     check_type = "orphan_health_check"
     logger.info(f"{cluster_name}: starting {check_type}")
     # Get the count of AWS instances
-    instances_with_cluster_tag = Ec2Instance.find_ec2_instances_by_cluster_tag(cluster_name)
+    instances_with_cluster_tag = _find_ec2_instances(cluster_name)
     aws_cluster_instances = list(
         filter(lambda instance: instance.state != "terminated" and instance.state != "shutting-down",
                instances_with_cluster_tag))
@@ -232,11 +278,10 @@ def orphan_health_check(deployment_env, region, cluster_name):
     try:
         # Get the IP count of CRDB nodes
         find_crdb_node_ip_sql = "select address from crdb_internal.kv_node_status;"
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        crdb_node_ips = connection.execute_sql(find_crdb_node_ip_sql, need_connection_close=False, need_commit=False,
-                                               auto_commit=True)
-        connection.close()
+        with CrdbConnectionManager.connection(cluster_name, follower_read=True) as connection:
+            crdb_node_ips = connection.execute_sql(find_crdb_node_ip_sql, need_connection_close=False,
+                                                   need_commit=False, auto_commit=True,
+                                                   statement_timeout=HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS)
         crdb_cluster_instance_count = len(crdb_node_ips)
         logger.info(f"{cluster_name} crdb_node_ips: {crdb_node_ips}")
         # Compare the IP count of AWS instances and CRDB nodes
@@ -257,6 +302,10 @@ def orphan_health_check(deployment_env, region, cluster_name):
             # TODO: provide useful output
             check_output = "orphan_health_check_passed"
             check_result = "pass"
+    except StatementTimeoutException as error:
+        logger.error(f"{cluster_name}: encountered error - {error}")
+        check_output = "statement_timeout"
+        check_result = "error"
     except (psycopg2.DatabaseError, ValueError) as error:
         check_output = "db_connection_error"
         check_result = "error"
@@ -281,9 +330,10 @@ def ptr_health_check(deployment_env, region, cluster_name):
                     "ts/1000000000)::int::timestamp) as \"pts age\", *,crdb_internal.cluster_name() from "
                     "system.protected_ts_records where ((ts/1000000000)::int::timestamp) < now() - interval '25h';")
     try:
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        response = connection.execute_sql(FIND_PTR_SQL, need_connection_close=False, need_commit=False, auto_commit=True)
+        with CrdbConnectionManager.connection(cluster_name, follower_read=True) as connection:
+            response = connection.execute_sql(FIND_PTR_SQL, need_connection_close=False, need_commit=False,
+                                              auto_commit=True,
+                                              statement_timeout=HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS)
         contains_ptr = any(response)
         if contains_ptr:
             logger.warning(f"{cluster_name}: Protected timestamp records found")
@@ -293,7 +343,10 @@ def ptr_health_check(deployment_env, region, cluster_name):
             logger.info(f"{cluster_name}: Protected timestamp record not found")
             check_output = "ptr_health_check_passed"
             check_result = "pass"
-        connection.close()
+    except StatementTimeoutException as error:
+        logger.error(f"{cluster_name}: encountered error - {error}")
+        check_output = "statement_timeout"
+        check_result = "error"
     except (psycopg2.DatabaseError, ValueError) as error:
         logger.error(f"{cluster_name}: encountered error - {error}")
         check_output = "db_connection_error"
@@ -332,7 +385,7 @@ def etl_health_check(deployment_env, region, cluster_name):
         logger.info(f"{cluster_name}: Staging clusters doesn't have ETL load balancers.")
         return
 
-    elb_load_balancer = ElasticLoadBalancer.find_elastic_load_balancer_by_cluster_name(cluster_name)
+    elb_load_balancer = _find_etl_load_balancer(cluster_name)
 
     if elb_load_balancer is not None:
         elb_instances = elb_load_balancer.instances
@@ -346,15 +399,19 @@ def etl_health_check(deployment_env, region, cluster_name):
 
         if out_of_service_instances:
             elb_load_balancer.register_instances(out_of_service_instances)
+            # the registrations changed, so everything read below is described again
+            _forget_inventory(cluster_name)
             # Post registration, checking their status again
+            out_of_service_instance_ids = set(ElasticLoadBalancerGateway.get_out_of_service_instances(
+                elb_load_balancer.load_balancer_name))
             refreshed_out_of_service_instances = [instance for instance in out_of_service_instances if
-                                                  instance.get('InstanceState', {}).get('State') != 'InService']
+                                                  instance['InstanceId'] in out_of_service_instance_ids]
             if refreshed_out_of_service_instances:
                 logger.warning(f"{cluster_name}: Some old instances remain out of service even after re-registration.")
             else:
                 logger.info(f"{cluster_name}: All old instances are now InService after re-registration.")
 
-        new_instances = AutoScalingGroup.find_auto_scaling_group_by_cluster_name(cluster_name).instances
+        new_instances = _find_auto_scaling_group(cluster_name).instances
         filtered_instances = filter(lambda instance: instance.is_healthy, new_instances)
         new_instances = list(map(lambda instance: {'InstanceId': instance.instance_id}, filtered_instances))
         logger.info(f"{cluster_name}: New instances: {new_instances}")
@@ -371,6 +428,7 @@ def etl_health_check(deployment_env, region, cluster_name):
                 if old_lb_instances:
                     elb_load_balancer.deregister_instances(old_lb_instances)
                 elb_load_balancer.register_instances(new_instances)
+                _forget_inventory(cluster_name)
                 elb_load_balancer_name = elb_load_balancer.load_balancer_name
                 unhealthy_instances = ElasticLoadBalancerGateway.get_out_of_service_instances(elb_load_balancer_name)
                 if not unhealthy_instances:
@@ -419,14 +477,14 @@ def version_mismatch_check(deployment_env, region, cluster_name):
     crdb_sql_version = ("SELECT node_id, server_version, tag FROM crdb_internal.kv_node_status;")
     crdb_cluster_version = ("show cluster setting version;")
     try:
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        response = connection.execute_sql(crdb_sql_version, need_connection_close=False, need_commit=False
-                                          , auto_commit=True)
-        connection.connect()
-        cluster_ver_response = connection.execute_sql(crdb_cluster_version,
-                                          need_connection_close=False, need_commit=False, auto_commit=True)
-        connection.close()
+        with CrdbConnectionManager.connection(cluster_name, follower_read=True) as connection:
+            response = connection.execute_sql(crdb_sql_version, need_connection_close=False, need_commit=False,
+                                              auto_commit=True,
+                                              statement_timeout=HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS)
+            cluster_ver_response = connection.execute_sql(crdb_cluster_version,
+                                                          need_connection_close=False, need_commit=False,
+                                                          auto_commit=True,
+                                                          statement_timeout=HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS)
         # save sql response
         check_output = response
         # init dict
@@ -474,6 +532,14 @@ def version_mismatch_check(deployment_env, region, cluster_name):
                                                  aws_account_name=aws_account_alias, workflow_id=workflow_id,
                                                  check_type=check_type, check_result=check_result,
                                                  check_output=check_output)
+    except StatementTimeoutException as error:
+        logger.error(f"{cluster_name}: encountered error - {error}")
+        check_result = "error"
+        check_output = "statement_timeout"
+        storage_metadata.insert_health_check(cluster_name=cluster_name, deployment_env=deployment_env, region=region,
+                                             aws_account_name=aws_account_alias, workflow_id=workflow_id,
+                                             check_type=check_type, check_result=check_result,
+                                             check_output=check_output)
     except (psycopg2.DatabaseError, ValueError) as error:
         # logger.error(f"{cluster_name}: encountered error - {error}")
         check_result = "error"
@@ -501,7 +567,7 @@ def az_health_check(deployment_env, region, cluster_name):
     # Get the count of AWS instances
     counts = {}
     for az in availability_zones:
-        instances_with_cluster_tag = Ec2Instance.find_ec2_instances_by_cluster_tag(cluster_name)
+        instances_with_cluster_tag = _find_ec2_instances(cluster_name)
         aws_cluster_instances = list(
             filter(lambda instance: instance.state != "terminated" and instance.state != "shutting-down",
                    instances_with_cluster_tag))
@@ -538,10 +604,10 @@ def zone_config_health_check(deployment_env, region, cluster_name):
     # check that default replication factor is five
     FIND_ZONE_CONFIG_SQL = "select raw_config_sql from [show zone configuration from range default]"
     try:
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        response = connection.execute_sql(FIND_ZONE_CONFIG_SQL,
-                                          need_connection_close=False, need_commit=False, auto_commit=True)
+        with CrdbConnectionManager.connection(cluster_name, follower_read=True) as connection:
+            response = connection.execute_sql(FIND_ZONE_CONFIG_SQL,
+                                              need_connection_close=False, need_commit=False, auto_commit=True,
+                                              statement_timeout=HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS)
         statement = response[0][0]
         if 'num_replicas = 5' in statement:
             logger.info(f"{cluster_name}: The default replication factor is correctly set to 5.")
@@ -551,7 +617,10 @@ def zone_config_health_check(deployment_env, region, cluster_name):
             logger.info(f"{cluster_name}: The default replication factor is not set to 5.")
             check_output = response
             check_result = "fail"
-        connection.close()
+    except StatementTimeoutException as error:
+        logger.error(f"{cluster_name}: encountered error - {error}")
+        check_output = "statement_timeout"
+        check_result = "error"
     except (psycopg2.DatabaseError, ValueError) as error:
         logger.error(f"{cluster_name}: encountered error - {error}")
         check_output = "db_connection_error"
@@ -579,10 +648,10 @@ def backup_health_check(deployment_env, region, cluster_name):
     get_backup_schedule_count_sql = ("select count(*) from [show schedules] where label = 'backup_schedule' and  "
                                      "schedule_status = 'ACTIVE'")
     try:
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        backup_count = connection.execute_sql(get_backup_schedule_count_sql,
-                                          need_connection_close=False, need_commit=False, auto_commit=True)
+        with CrdbConnectionManager.connection(cluster_name, follower_read=True) as connection:
+            backup_count = connection.execute_sql(get_backup_schedule_count_sql,
+                                                  need_connection_close=False, need_commit=False, auto_commit=True,
+                                                  statement_timeout=HEALTH_CHECK_STATEMENT_TIMEOUT_SECONDS)
         count = backup_count[0][0]
         if count is None:
             logger.info(f"{cluster_name}: Failed to fetch the backup schedule count.")
@@ -596,7 +665,10 @@ def backup_health_check(deployment_env, region, cluster_name):
             logger.info(f"{cluster_name}: Warning: Expected 2 backup jobs but found {count}.")
             check_output = count
             check_result = "fail"
-        connection.close()
+    except StatementTimeoutException as error:
+        logger.error(f"{cluster_name}: encountered error - {error}")
+        check_output = "statement_timeout"
+        check_result = "error"
     except (psycopg2.DatabaseError, ValueError) as error:
         logger.error(f"{cluster_name}: encountered error - {error}")
         check_output = "db_connection_error"
@@ -16,6 +16,7 @@ from storage_workflows.crdb.connect.ssh import SSH
 from storage_workflows.crdb.metadata_db.metadata_db_operations import MetadataDBOperations
 from storage_workflows.crdb.models.cluster import Cluster
 from storage_workflows.crdb.models.node import Node
+from storage_workflows.crdb.models.node_set import NodeSet
 from storage_workflows.crdb.models.jobs.changefeed_job import ChangefeedJob
 from storage_workflows.crdb.slack.content_templates import ContentTemplate
 from storage_workflows.global_change_log.global_change_log_gateway import GlobalChangeLogGateway
@@ -192,7 +193,8 @@ def copy_crontab(deployment_env, region, cluster_name):
     instance_ids = metadata_db_operations.get_old_instance_ids(cluster_name, deployment_env)
     # STORAGE-7583: do nothing if scaling up
     if instance_ids:
-        old_instance_ips = set(map(lambda instance_id: Ec2Instance.find_ec2_instance(instance_id).private_ip_address, instance_ids))
+        old_instance_ips = set(map(lambda ec2_instance: ec2_instance.private_ip_address,
+                                   Ec2Instance.find_ec2_instances(instance_ids, allow_missing=True).values()))
         logger.info(f"{cluster_name} - copy_crontab - old_instance_ips - {old_instance_ips}")
         nodes = Node.get_nodes()
         new_nodes = list(filter(lambda node: node.ip_address not in old_instance_ips, nodes))
@@ -279,11 +281,17 @@ def read_and_increase_asg_capacity(deployment_env, region, cluster_name, hydrati
             #current_capacity determines number of nodes in standby + number of nodes in-service
             #according to asg desired_capacity is the count of number of nodes in-service state only
             #hence we only set intial_capacity+3 as desired capacity in each loop
-            new_instance_ids = asg.add_ec2_instances(initial_capacity+3, autoscale=True, deployment_env=deployment_env)
-            logger.info(f"{cluster_name} adding instances to asg: {new_instance_ids}")
+            # each new instance goes into standby as soon as it is ready
+            def enter_standby(instance_id):
+                logger.info(f"{cluster_name} set instance {instance_id} to standby")
+                AutoScalingGroupGateway.enter_instances_into_standby(asg.name, [instance_id])
+            new_instance_ids = asg.add_ec2_instances(initial_capacity+3, autoscale=True, deployment_env=deployment_env,
+                                                     on_instance_ready=enter_standby)
+            if not new_instance_ids:
+                # nothing was launched, so current_capacity wouldn't change on the next iteration either
+                raise Exception(f"{cluster_name} No instances added while scaling to {desired_capacity}.")
+            logger.info(f"{cluster_name} added instances to asg: {new_instance_ids}")
             all_new_instance_ids.append(new_instance_ids)
-            logger.info(f"{cluster_name} set instances to standby")
-            AutoScalingGroupGateway.enter_instances_into_standby(asg.name, new_instance_ids)
             logger.info(f"{cluster_name} waiting for hydration to complete. hydration_timeout_mins: {hydration_timeout_mins}")
             cluster.wait_for_hydration(hydration_timeout_mins)
             asg.reload(cluster_name)
@@ -343,9 +351,9 @@ def terminate_instances(deployment_env, region, cluster_name):
     logger.info(f"{cluster_name} terminating instances")
     # STORAGE-7583: do nothing if scaling up
     if old_instance_ids:
-        for id in old_instance_ids:
-            ec2_instance = Ec2Instance.find_ec2_instance(id)
-            ec2_instance.terminate_instance()
+        # instances that are already gone have nothing left to terminate
+        Ec2Instance.terminate_instances(
+            list(Ec2Instance.find_ec2_instances(old_instance_ids, allow_missing=True).values()))
         logger.info(f"{cluster_name} terminated ec2 instances")
     else:
         logger.info(f"{cluster_name} no instances found. skipping ec2 instance termination.")
@@ -360,7 +368,8 @@ def stop_crdb_on_old_nodes(deployment_env, region, cluster_name):
     old_instance_ids = metadata_db_operations.get_old_instance_ids(cluster_name, deployment_env)
     # STORAGE-7583: do nothing if scaling up
     if old_instance_ids:
-        instances_ips = list(map(lambda instance_id: Ec2Instance.find_ec2_instance(instance_id).private_ip_address, old_instance_ids))
+        ec2_instances = Ec2Instance.find_ec2_instances(old_instance_ids)
+        instances_ips = list(map(lambda instance_id: ec2_instances[instance_id].private_ip_address, old_instance_ids))
         for ip in instances_ips:
             Node.stop_crdb(ip)
         logger.info(f"{cluster_name} stopped all crdb instances")
@@ -377,7 +386,9 @@ def drain_old_nodes(deployment_env, region, cluster_name):
     old_instance_ids = metadata_db_operations.get_old_instance_ids(cluster_name, deployment_env)
     # STORAGE-7583: do nothing if scaling up
     if old_instance_ids:
-        old_nodes = list(map(lambda instance_id: Ec2Instance.find_ec2_instance(instance_id).crdb_node, old_instance_ids))
+        ec2_instances = Ec2Instance.find_ec2_instances(old_instance_ids)
+        old_nodes = NodeSet.fetch().for_ip_addresses(
+            [ec2_instances[instance_id].private_ip_address for instance_id in old_instance_ids])
         for node in old_nodes:
             logger.info(f"{cluster_name} Draining node {node.id} ...")
             node.drain()
@@ -406,7 +417,9 @@ def get_old_instances(cluster_name, deployment_env):
     old_instance_ids = metadata_db_operations.get_old_instance_ids(cluster_name, deployment_env)
     if not old_instance_ids:
         return False
-    old_nodes = [Ec2Instance.find_ec2_instance(instance_id).crdb_node for instance_id in old_instance_ids]
+    ec2_instances = Ec2Instance.find_ec2_instances(old_instance_ids)
+    old_nodes = NodeSet.fetch().for_ip_addresses(
+        [ec2_instances[instance_id].private_ip_address for instance_id in old_instance_ids])
     decommission_nodes_if_healthy(cluster_name, old_nodes)
     return True
 
@@ -514,12 +527,13 @@ def move_changefeed_coordinator_node(deployment_env, region, cluster_name):
 
     metadata_db_operations = MetadataDBOperations()
     old_instance_ids = metadata_db_operations.get_old_instance_ids(cluster_name, deployment_env)
-    old_nodes = [Ec2Instance.find_ec2_instance(instance_id).crdb_node for instance_id in old_instance_ids]
+    ec2_instances = Ec2Instance.find_ec2_instances(old_instance_ids)
+    node_set = NodeSet.fetch()
+    old_nodes = node_set.for_ip_addresses(
+        [ec2_instances[instance_id].private_ip_address for instance_id in old_instance_ids])
     old_node_ids = set(node.id for node in old_nodes)
-    nodes = Node.get_nodes()
-    new_nodes = [node for node in nodes if
-                 node.ip_address not in [Ec2Instance.find_ec2_instance(instance_id).private_ip_address for instance_id
-                                         in old_instance_ids]]
+    old_instance_ips = set(ec2_instance.private_ip_address for ec2_instance in ec2_instances.values())
+    new_nodes = [node for node in node_set if node.ip_address not in old_instance_ips]
 
     node_index = 0
     num_new_nodes = len(new_nodes)
@@ -3,6 +3,7 @@ import os
 import typer
 from storage_workflows.crdb.api_gateway.s3_gateway import S3Gateway
 from storage_workflows.crdb.api_gateway.secret_manager_gateway import SecretManagerGateway
+from storage_workflows.crdb.aws.secret_index import SecretIndex
 from storage_workflows.metadata_db.storage_metadata.storage_metadata import StorageMetadata
 from storage_workflows.logging.logger import Logger
 from storage_workflows.crdb.models.users.app_user import AppUser
@@ -21,6 +22,8 @@ logger = Logger()
 @app.command()
 def create_users_from_s3_objects(deployment_env, region, bucket_name, aws_account, is_service_account:bool=True):
     setup_env(deployment_env, region, "")
+    # users of every cluster are created in this run, list the secrets of the environment once
+    SecretIndex.prefetch(deployment_env)
     objects, next_page_token = S3Gateway.read_objects_with_pagination(bucket_name)
     #Process the objects in the current page
     for obj in objects:
@@ -84,11 +87,16 @@ def create_user_if_not_exist(cluster_name, deployment_env, region, aws_account,
 
 def get_user_arn(user_name, deployment_env, cluster_name):
     cluster_name_with_suffix = cluster_name + "-crdb"
+    secret = SecretIndex.find(cluster_name_with_suffix, 'client-public-cert', user_name)
+    if secret is not None:
+        return secret['ARN']
     secret_filters = {'tag-key': ['crdb_cluster_name', 'cred-type', 'environment', 'client'],
                       'tag-value': [cluster_name_with_suffix, 'client-public-cert', deployment_env, user_name],
                       'description': ['!DEPRECATED']}
-    secret_list = SecretManagerGateway.list_secrets(transform_filters(secret_filters))
-    return secret_list[0]['ARN']
+    secret = SecretManagerGateway.find_first_secret(transform_filters(secret_filters))
+    if secret is None:
+        raise IndexError("No client certificate secret found for user {0} in cluster {1}".format(user_name, cluster_name))
+    return secret['ARN']
 
 
 def transform_filters(filters):
@@ -0,0 +1,177 @@
+import asyncio
+import time
+import psycopg2
+from psycopg2 import extensions
+from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
+from storage_workflows.crdb.connect.statement_timeout_exception import StatementTimeoutException
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class AsyncCrdbConnection:
+    """
+    asyncio counterpart of CrdbConnection built on psycopg2's asynchronous mode, so many clusters can be
+    queried concurrently from one event loop without adding a new driver dependency.
+
+    psycopg2 async connections are always in autocommit mode and don't support named cursors, so
+    need_commit/auto_commit are accepted for API compatibility only and there is no stream_sql.
+
+    Usage:
+        results = AsyncCrdbConnection.run_on_clusters(cluster_names, "SELECT count(*) FROM crdb_internal.jobs;")
+    """
+
+    CONNECT_TIMEOUT_SECONDS = 2
+    DEFAULT_CONCURRENCY = 20
+
+    @staticmethod
+    async def get_crdb_connection(cluster_name: str, db_name: str = "defaultdb"):
+        # resolving secrets and writing certs is blocking boto3 and file work, keep it off the event loop
+        crdb_connection = await asyncio.to_thread(CrdbConnection.get_crdb_connection, cluster_name, db_name)
+        return AsyncCrdbConnection(crdb_connection)
+
+    @staticmethod
+    async def gather(coroutines, concurrency: int = DEFAULT_CONCURRENCY, return_exceptions: bool = True) -> list:
+        """Await the coroutines with at most concurrency of them running at once, keeping their order."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        return await asyncio.gather(*[run(coroutine) for coroutine in coroutines],
+                                    return_exceptions=return_exceptions)
+
+    @staticmethod
+    async def execute_on_clusters(cluster_names: list, sql, params=None, db_name: str = "defaultdb",
+                                  concurrency: int = DEFAULT_CONCURRENCY, need_fetchall: bool = True,
+                                  need_fetchone: bool = False) -> dict:
+        """
+        Run the same statement on every cluster concurrently.
+        Returns cluster_name -> result, or the exception raised for that cluster.
+        """
+        async def execute_on_cluster(cluster_name):
+            connection = await AsyncCrdbConnection.get_crdb_connection(cluster_name, db_name)
+            await connection.connect()
+            try:
+                return await connection.execute_sql(sql, params=params, need_fetchall=need_fetchall,
+                                                    need_fetchone=need_fetchone)
+            finally:
+                connection.close()
+
+        results = await AsyncCrdbConnection.gather([execute_on_cluster(cluster_name) for cluster_name in cluster_names],
+                                                   concurrency)
+        for cluster_name, result in zip(cluster_names, results):
+            if isinstance(result, Exception):
+                logger.error(f"{cluster_name}: query failed - {result}")
+        return dict(zip(cluster_names, results))
+
+    @staticmethod
+    def run_on_clusters(cluster_names: list, sql, params=None, db_name: str = "defaultdb",
+                        concurrency: int = DEFAULT_CONCURRENCY, need_fetchall: bool = True,
+                        need_fetchone: bool = False) -> dict:
+        """Blocking entry point for typer commands."""
+        return asyncio.run(AsyncCrdbConnection.execute_on_clusters(cluster_names, sql, params, db_name, concurrency,
+                                                                   need_fetchall, need_fetchone))
+
+    def __init__(self, crdb_connection: CrdbConnection):
+        self._crdb_connection = crdb_connection
+        self._connection = None
+
+    @property
+    def connection(self):
+        return self._connection
+
+    @property
+    def cluster_name(self):
+        return self._crdb_connection.cluster_name
+
+    @property
+    def db_name(self):
+        return self._crdb_connection.db_name
+
+    async def connect(self):
+        """Unlike CrdbConnection.connect, errors are raised so gather() can report them per cluster."""
+        try:
+            self._connection = psycopg2.connect(**self._crdb_connection.connect_params(), async_=True)
+            await asyncio.wait_for(self._wait(), AsyncCrdbConnection.CONNECT_TIMEOUT_SECONDS)
+        except (psycopg2.DatabaseError, asyncio.TimeoutError) as error:
+            logger.error(f"{self.cluster_name}: Error: {error}")
+            self.close()
+            raise
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+
+    async def execute_sql(self, sql, need_commit: bool = False, need_fetchall: bool = True,
+                          need_fetchone: bool = False, need_connection_close: bool = False,
+                          auto_commit: bool = True, params=None, statement_timeout: float = None):
+        if self._connection is None:
+            raise ValueError("Connection is not established.")
+        if statement_timeout is None:
+            statement_timeout = CrdbConnection.default_statement_timeout()
+        started_at = time.monotonic()
+        rows = None
+        error = None
+        try:
+            cursor = self._connection.cursor()
+            cursor.execute(sql, params)
+            try:
+                await asyncio.wait_for(self._wait(), statement_timeout)
+            except asyncio.TimeoutError as timeout_error:
+                self._connection.cancel()
+                # the session is mid-query, so it can't be reused
+                self.close()
+                raise StatementTimeoutException(
+                    f"Statement on {self.cluster_name} was cancelled after exceeding the "
+                    f"{statement_timeout}s statement timeout.") from timeout_error
+            if need_fetchone:
+                result = cursor.fetchone()
+                rows = 0 if result is None else 1
+                return result
+            if need_fetchall:
+                result = cursor.fetchall()
+                rows = len(result)
+                return result
+        except asyncio.CancelledError:
+            # the statement may still be running, the session can't be reused
+            self.close()
+            raise
+        except Exception as exception:
+            error = exception
+            logger.error(exception)
+            raise
+        finally:
+            CrdbConnection.run_statement_hooks(self._connection, self.cluster_name, sql,
+                                               time.monotonic() - started_at, rows, error)
+            if need_connection_close:
+                self.close()
+
+    async def _wait(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            state = self._connection.poll()
+            if state == extensions.POLL_OK:
+                return
+            file_descriptor = self._connection.fileno()
+            ready = loop.create_future()
+
+            def set_ready():
+                if not ready.done():
+                    ready.set_result(None)
+
+            if state == extensions.POLL_READ:
+                loop.add_reader(file_descriptor, set_ready)
+                try:
+                    await ready
+                finally:
+                    loop.remove_reader(file_descriptor)
+            elif state == extensions.POLL_WRITE:
+                loop.add_writer(file_descriptor, set_ready)
+                try:
+                    await ready
+                finally:
+                    loop.remove_writer(file_descriptor)
+            else:
+                raise psycopg2.OperationalError(f"Unexpected poll state: {state}")
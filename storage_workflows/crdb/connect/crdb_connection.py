@@ -1,10 +1,17 @@
 import os
+import re
+import threading
+import time
+import uuid
 import psycopg2
 import psycopg2.pool as pool
+from psycopg2.sql import Composable
 from storage_workflows.crdb.connect.cred_type import CredType
-from storage_workflows.crdb.aws.secret import Secret
+from storage_workflows.crdb.connect.crdb_credential_cache import CrdbCredentialCache
+from storage_workflows.crdb.connect.crdb_node_router import CrdbNodeRouter
+from storage_workflows.crdb.connect.sql_metrics import SqlMetrics
+from storage_workflows.crdb.connect.statement_timeout_exception import StatementTimeoutException
 from storage_workflows.crdb.aws.secret_value import SecretValue
-from storage_workflows.crdb.api_gateway.secret_manager_gateway import SecretManagerGateway
 from storage_workflows.logging.logger import Logger
 from psycopg2 import OperationalError, InterfaceError, ProgrammingError
 
@@ -12,62 +19,64 @@ logger = Logger()
 
 
 class CrdbConnection:
+    STREAM_BATCH_SIZE = 500
+    # read-only transactions of a follower read session run AS OF SYSTEM TIME follower_read_timestamp(),
+    # so they are served by the nearest replica instead of the leaseholder
+    FOLLOWER_READ_SESSION_SQL = ("SET default_transaction_use_follower_reads = on; "
+                                 "SET default_transaction_read_only = on;")
+    # callables of (cluster_name, sql_text, duration_seconds, rows, error) run after every statement
+    _statement_hooks = []
 
     @staticmethod
-    def get_crdb_connection_secret(cred_type: CredType, cluster_name: str, client: str = "") -> SecretValue:
-        # handle cluster_name with hyphens instead of underscores
-        cluster_names_to_modify = ['url_shortener', 'revenue_platform']
-
-        if cluster_name in cluster_names_to_modify or cluster_name.startswith('revenue_workflow_'):
-            cluster_name_with_suffix = cluster_name.strip().replace("_", "-") + "-crdb"
-        else:
-            cluster_name_with_suffix = cluster_name + "-crdb"
-        secret_filters = {
-            'tag-key': ['crdb_cluster_name', 'cred-type', 'environment'],
-            'tag-value': [cred_type.value, os.getenv('DEPLOYMENT_ENV'), cluster_name_with_suffix],
-            'description': ['!DEPRECATED']
-        }
-
-        if client:
-            secret_filters['tag-key'].append('client')
-            secret_filters['tag-value'].append(client)
+    def register_statement_hook(hook):
+        CrdbConnection._statement_hooks.append(hook)
 
-        secret_list = Secret.find_all_secrets(transform_filters(secret_filters))
-
-        # If secret_list is still empty after the retry, raise an error
-        if not secret_list:
-            raise ValueError(
-                f"No secrets found for cluster_name: {cluster_name} with cred_type: "
-                f"{cred_type.value}.")
+    @staticmethod
+    def default_statement_timeout():
+        """Statement timeout in seconds for calls that don't pass one, set per command via the environment."""
+        statement_timeout = os.getenv('CRDB_STATEMENT_TIMEOUT_SECONDS')
+        return float(statement_timeout) if statement_timeout else None
 
-        find_secret_value = SecretValue(SecretManagerGateway.find_secret(secret_list[0].arn))
-        return find_secret_value
+    @staticmethod
+    def get_crdb_connection_secret(cred_type: CredType, cluster_name: str, client: str = "") -> SecretValue:
+        return CrdbCredentialCache.get_secret_value(cred_type, cluster_name, client)
 
     @staticmethod
-    def get_crdb_connection(cluster_name: str, db_name: str = "defaultdb"):
+    def get_crdb_connection(cluster_name: str, db_name: str = "defaultdb", follower_read: bool = False):
         crdb_client = os.getenv('CRDB_CLIENT')
-        ca_cert = CrdbConnection.get_crdb_connection_secret(CredType.CA_CERT_CRED_TYPE, cluster_name)
-        public_cert = CrdbConnection.get_crdb_connection_secret(CredType.PUBLIC_CERT_CRED_TYPE, cluster_name,
-                                                                crdb_client)
-        private_cert = CrdbConnection.get_crdb_connection_secret(CredType.PRIVATE_KEY_CRED_TYPE, cluster_name,
-                                                                 crdb_client)
+        credentials = CrdbCredentialCache.get_credentials(cluster_name, crdb_client)
         dir_path = os.getenv('CRDB_CERTS_DIR_PATH_PREFIX') + "/" + cluster_name + "/"
-        ca_cert.write_to_file(dir_path, os.getenv('CRDB_CA_CERT_FILE_NAME'))
-        public_cert.write_to_file(dir_path, os.getenv('CRDB_PUBLIC_CERT_FILE_NAME'))
-        private_cert.write_to_file(dir_path, os.getenv('CRDB_PRIVATE_KEY_FILE_NAME'))
-        return CrdbConnection(cluster_name, db_name)
+        credentials[CredType.CA_CERT_CRED_TYPE].write_to_file(dir_path, os.getenv('CRDB_CA_CERT_FILE_NAME'))
+        credentials[CredType.PUBLIC_CERT_CRED_TYPE].write_to_file(dir_path, os.getenv('CRDB_PUBLIC_CERT_FILE_NAME'))
+        credentials[CredType.PRIVATE_KEY_CRED_TYPE].write_to_file(dir_path, os.getenv('CRDB_PRIVATE_KEY_FILE_NAME'))
+        return CrdbConnection(cluster_name, db_name, follower_read)
 
-    def __init__(self, cluster_name: str, db_name: str):
+    def __init__(self, cluster_name: str, db_name: str, follower_read: bool = False):
         self._connection = None
         self._cluster_name = cluster_name
         self._credential_dir_path = os.getenv('CRDB_CERTS_DIR_PATH_PREFIX') + "/" + cluster_name + "/"
         self._db_name = db_name
         self._client = os.getenv('CRDB_CLIENT')
+        self._follower_read = follower_read
+        # sql text -> name of the statement prepared on the current session
+        self._prepared_statements = {}
 
     @property
     def connection(self):
         return self._connection
 
+    @property
+    def cluster_name(self):
+        return self._cluster_name
+
+    @property
+    def db_name(self):
+        return self._db_name
+
+    @property
+    def follower_read(self):
+        return self._follower_read
+
     def get_connection_pool(self, min_conn, max_conn):
         host_suffix = os.getenv('CRDB_PROD_HOST_SUFFIX') if os.getenv('DEPLOYMENT_ENV') == 'prod' else os.getenv(
             'CRDB_STAGING_HOST_SUFFIX')
@@ -92,62 +101,321 @@ class CrdbConnection:
             raise
 
     def connect(self):
-        host_suffix = os.getenv('CRDB_PROD_HOST_SUFFIX') if os.getenv('DEPLOYMENT_ENV') == 'prod' else os.getenv(
-            'CRDB_STAGING_HOST_SUFFIX')
         try:
-            self._connection = psycopg2.connect(
-                dbname=self._db_name,
-                port=os.getenv('CRDB_PORT'),
-                user=self._client,
-                host=self._cluster_name.replace('_', '-') + host_suffix,
-                sslmode=os.getenv('CRDB_CONNECTION_SSL_MODE'),
-                sslrootcert=self._credential_dir_path + os.getenv('CRDB_CA_CERT_FILE_NAME'),
-                sslcert=self._credential_dir_path + os.getenv('CRDB_PUBLIC_CERT_FILE_NAME'),
-                sslkey=self._credential_dir_path + os.getenv('CRDB_PRIVATE_KEY_FILE_NAME'),
-                application_name='operator-service-argo-workflow', # do we have an envar with the actual workflow name?
-                connect_timeout=2  # Set the connection timeout to 2 seconds
-            )
+            self._prepared_statements = {}
+            self._connection = None
+            if CrdbNodeRouter.is_enabled():
+                self._connection = self._connect_to_node()
+            if self._connection is None:
+                self._connection = psycopg2.connect(**self.connect_params())
             # check for connection error
             if self._connection is None:
                 raise ValueError("Connection is not established.")
+            if self._follower_read:
+                self._connection.autocommit = True
+                with self._connection.cursor() as cursor:
+                    cursor.execute(CrdbConnection.FOLLOWER_READ_SESSION_SQL)
 
         except (psycopg2.DatabaseError, ValueError) as error:
             logger.error(f"Error: {error}")
 
+    def connect_params(self) -> dict:
+        host_suffix = os.getenv('CRDB_PROD_HOST_SUFFIX') if os.getenv('DEPLOYMENT_ENV') == 'prod' else os.getenv(
+            'CRDB_STAGING_HOST_SUFFIX')
+        return dict(
+            dbname=self._db_name,
+            port=os.getenv('CRDB_PORT'),
+            user=self._client,
+            host=self._cluster_name.replace('_', '-') + host_suffix,
+            sslmode=os.getenv('CRDB_CONNECTION_SSL_MODE'),
+            sslrootcert=self._credential_dir_path + os.getenv('CRDB_CA_CERT_FILE_NAME'),
+            sslcert=self._credential_dir_path + os.getenv('CRDB_PUBLIC_CERT_FILE_NAME'),
+            sslkey=self._credential_dir_path + os.getenv('CRDB_PRIVATE_KEY_FILE_NAME'),
+            application_name='operator-service-argo-workflow', # do we have an envar with the actual workflow name?
+            connect_timeout=2  # Set the connection timeout to 2 seconds
+        )
+
+    def _connect_to_node(self):
+        """
+        Connect straight to the fastest healthy node, failing over to the next one. host stays the cluster
+        DNS name so TLS still verifies against it while hostaddr picks the node. Returns None when no node
+        accepts the connection, so the caller falls back to the load balancer.
+        """
+        for node_address in CrdbNodeRouter.get_node_addresses(self._cluster_name, self._discover_nodes):
+            ip_address, port = node_address
+            try:
+                return psycopg2.connect(**dict(self.connect_params(), hostaddr=ip_address, port=port))
+            except psycopg2.OperationalError as error:
+                logger.warning(f"Failed to connect to node {ip_address}:{port} of {self._cluster_name}: {error}")
+                CrdbNodeRouter.mark_node_failed(self._cluster_name, node_address)
+        logger.warning(f"No node of {self._cluster_name} accepted a direct connection, using the load balancer.")
+        return None
+
+    def _discover_nodes(self):
+        connection = psycopg2.connect(**self.connect_params())
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(CrdbNodeRouter.FIND_NODES_SQL)
+                return cursor.fetchall()
+        finally:
+            connection.close()
+
     def close(self):
         if self._connection:
             self._connection.close()
 
-    def execute_sql(self, sql: str, need_commit: bool = False, need_fetchall: bool = True, need_fetchone: bool = False,
-                    need_connection_close: bool = False, auto_commit: bool = False):
+    def execute_sql(self, sql, need_commit: bool = False, need_fetchall: bool = True, need_fetchone: bool = False,
+                    need_connection_close: bool = False, auto_commit: bool = False, params=None, prepare: bool = False,
+                    statement_timeout: float = None):
+        """
+        Execute sql with optional bind params (%s placeholders, passed to the driver instead of being
+        formatted into the statement). With prepare=True the statement is PREPAREd once per session and
+        later calls only EXECUTE it, which lets CRDB reuse the plan for statements run in polling loops.
+        Don't prepare statements using AS OF SYSTEM TIME, their timestamp isn't meant to be part of a plan.
+
+        When statement_timeout (seconds, defaults to default_statement_timeout()) passes, the query is
+        cancelled from the client and StatementTimeoutException is raised.
+        """
+        started_at = time.monotonic()
+        timer, timed_out = None, None
         try:
             if self._connection is None:
                 raise ValueError("Connection is not established.")
             self._connection.autocommit = auto_commit
             cursor = self._connection.cursor()
-            cursor.execute(sql)
+            timer, timed_out = self._start_statement_timer(statement_timeout)
+            if prepare:
+                self._execute_prepared(cursor, sql, params)
+            else:
+                cursor.execute(sql, params)
             if need_commit:
                 self._connection.commit()
         except Exception as error:
+            if timed_out is not None and timed_out.is_set():
+                timeout_error = StatementTimeoutException(
+                    f"Statement on {self._cluster_name} was cancelled after exceeding the "
+                    f"{timer.interval}s statement timeout.")
+                logger.error(timeout_error)
+                self._run_statement_hooks(sql, time.monotonic() - started_at, error=timeout_error)
+                raise timeout_error from error
             logger.error(error)
+            self._run_statement_hooks(sql, time.monotonic() - started_at, error=error)
             raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+        rows = None
+        fetch_error = None
         try:
             if need_fetchone:
                 result = cursor.fetchone()
+                rows = 0 if result is None else 1
                 return result
             if need_fetchall:
                 result = cursor.fetchall()
+                rows = len(result)
                 return result
         except OperationalError as oe:
+            fetch_error = oe
             logger.error(f"Operational error: {oe}")
         except ProgrammingError as pe:
+            fetch_error = pe
             logger.error(f"retryable error: {pe}")
         except InterfaceError as ie:
+            fetch_error = ie
             logger.error(f"retryable error: {ie}")
         finally:
+            self._run_statement_hooks(sql, time.monotonic() - started_at, rows, fetch_error)
             if self._connection and need_connection_close:
                 self._connection.close()
 
+    def execute_batch(self, statements: list) -> list:
+        """
+        Send statements (str or psycopg2.sql objects) in one round trip, where CRDB runs them as a single
+        implicit transaction. If the batch fails it is rolled back and the statements are re-run one by
+        one up to the first one that fails, so the returned StatementResults say which statement failed
+        and why. Statements after it are not run and have no result.
+        """
+        if self._connection is None:
+            raise ValueError("Connection is not established.")
+        sql_texts = [statement.as_string(self._connection) if isinstance(statement, Composable) else statement
+                     for statement in statements]
+        self._connection.autocommit = True
+        batch_sql = "\n".join(sql_texts)
+        started_at = time.monotonic()
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute(batch_sql)
+            self._run_statement_hooks(batch_sql, time.monotonic() - started_at)
+            return [CrdbConnection.StatementResult(sql_text) for sql_text in sql_texts]
+        except psycopg2.Error as error:
+            self._run_statement_hooks(batch_sql, time.monotonic() - started_at, error=error)
+            logger.warning(f"Batch of {len(sql_texts)} statement(s) failed, re-running one by one up to the "
+                           f"failing one: {error}")
+
+        results = []
+        for sql_text in sql_texts:
+            started_at = time.monotonic()
+            try:
+                with self._connection.cursor() as cursor:
+                    cursor.execute(sql_text)
+                self._run_statement_hooks(sql_text, time.monotonic() - started_at)
+                results.append(CrdbConnection.StatementResult(sql_text))
+            except psycopg2.Error as error:
+                self._run_statement_hooks(sql_text, time.monotonic() - started_at, error=error)
+                results.append(CrdbConnection.StatementResult(sql_text, error))
+                break
+        return results
+
+    def reset_database(self):
+        """Undo USE statements, putting the session back on the database it was opened with."""
+        if self._connection is None or self._connection.closed:
+            return
+        try:
+            self._connection.autocommit = True
+            with self._connection.cursor() as cursor:
+                cursor.execute("RESET database;")
+        except psycopg2.Error as error:
+            # closed connections are discarded instead of going back to the pool
+            logger.warning(f"Failed to reset the database of the session, closing it: {error}")
+            self.close()
+
+    def stream_sql(self, sql, params=None, batch_size: int = STREAM_BATCH_SIZE, follower_read: bool = False,
+                   statement_timeout: float = None):
+        """
+        Generator over the rows of a query, read from a named server-side cursor in batches of batch_size
+        so the full result is never held in memory. The cursor lives in a read-only transaction that is
+        rolled back once iteration finishes or the caller stops early.
+
+        CRDB rejects AS OF SYSTEM TIME on a statement inside an explicit transaction, so pass
+        follower_read=True instead to run the whole transaction at follower_read_timestamp().
+
+        statement_timeout works as in execute_sql and applies to each round trip (the query and every
+        batch fetch), so time the caller spends between batches doesn't count against it.
+        """
+        if self._connection is None:
+            raise ValueError("Connection is not established.")
+        self._connection.autocommit = False
+        # only time spent in the database counts, not time the caller spends between batches
+        duration_seconds = 0.0
+        row_count = 0
+        stream_error = None
+        timer, timed_out = None, None
+        try:
+            if follower_read:
+                with self._connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION AS OF SYSTEM TIME follower_read_timestamp();")
+            with self._connection.cursor(name="crdb_wf_cursor_{}".format(uuid.uuid4().hex)) as cursor:
+                started_at = time.monotonic()
+                timer, timed_out = self._start_statement_timer(statement_timeout)
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if timer is not None:
+                        timer.cancel()
+                    duration_seconds += time.monotonic() - started_at
+                    if not rows:
+                        break
+                    row_count += len(rows)
+                    yield from rows
+                    started_at = time.monotonic()
+                    timer, timed_out = self._start_statement_timer(statement_timeout)
+        except Exception as error:
+            if timed_out is not None and timed_out.is_set():
+                stream_error = StatementTimeoutException(
+                    f"Streamed statement on {self._cluster_name} was cancelled after exceeding the "
+                    f"{timer.interval}s statement timeout.")
+                logger.error(stream_error)
+                raise stream_error from error
+            stream_error = error
+            logger.error(error)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self._run_statement_hooks(sql, duration_seconds, row_count, stream_error)
+            if not self._connection.closed:
+                self._connection.rollback()
+
+    def _start_statement_timer(self, statement_timeout: float = None):
+        """Start a timer that sends a pg cancel request for the running query once statement_timeout passes."""
+        if statement_timeout is None:
+            statement_timeout = CrdbConnection.default_statement_timeout()
+        if not statement_timeout:
+            return None, None
+        timed_out = threading.Event()
+        connection = self._connection
+
+        def cancel():
+            timed_out.set()
+            connection.cancel()
+
+        timer = threading.Timer(statement_timeout, cancel)
+        timer.daemon = True
+        timer.start()
+        return timer, timed_out
+
+    def _execute_prepared(self, cursor, sql, params=None):
+        if isinstance(sql, Composable):
+            sql = sql.as_string(self._connection)
+        statement_name = self._prepared_statements.get(sql)
+        if statement_name is None:
+            statement_name = "crdb_wf_stmt_{}".format(len(self._prepared_statements) + 1)
+            cursor.execute("PREPARE {} AS {}".format(statement_name, to_positional_placeholders(sql)))
+            self._prepared_statements[sql] = statement_name
+        if params:
+            cursor.execute("EXECUTE {} ({});".format(statement_name, ", ".join(["%s"] * len(params))), params)
+        else:
+            cursor.execute("EXECUTE {};".format(statement_name))
+
+    def _run_statement_hooks(self, sql, duration_seconds: float, rows: int = None, error: Exception = None):
+        CrdbConnection.run_statement_hooks(self._connection, self._cluster_name, sql, duration_seconds, rows, error)
+
+    @staticmethod
+    def run_statement_hooks(connection, cluster_name: str, sql, duration_seconds: float, rows: int = None,
+                            error: Exception = None):
+        if not CrdbConnection._statement_hooks:
+            return
+        try:
+            sql_text = sql.as_string(connection) if isinstance(sql, Composable) else sql
+            for hook in CrdbConnection._statement_hooks:
+                hook(cluster_name, sql_text, duration_seconds, rows, error)
+        except Exception as hook_error:
+            # instrumentation must never fail the statement itself
+            logger.warning(f"Statement hook failed: {hook_error}")
+
+    class StatementResult:
+        def __init__(self, statement: str, error: Exception = None):
+            self._statement = statement
+            self._error = error
+
+        @property
+        def statement(self):
+            return self._statement
+
+        @property
+        def error(self):
+            return self._error
+
+        @property
+        def succeeded(self):
+            return self._error is None
+
+
+def to_positional_placeholders(sql: str) -> str:
+    """Rewrite driver style %s placeholders into the $1, $2, ... form used by PREPARE."""
+    position = 0
+
+    def replace(match):
+        nonlocal position
+        if match.group(0) == '%%':
+            return '%'
+        position += 1
+        return '${}'.format(position)
+
+    return re.sub(r'%%|%s', replace, sql)
+
 
 def transform_filters(filters):
     transformed_filters = []
@@ -160,3 +428,7 @@ def transform_filters(filters):
                 ]
             })
     return transformed_filters
+
+
+if SqlMetrics.is_enabled():
+    CrdbConnection.register_statement_hook(SqlMetrics.record)
@@ -0,0 +1,163 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+import psycopg2
+from psycopg2 import extensions
+from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class CrdbConnectionManager:
+    """
+    Process-wide pool of CRDB connections keyed by (cluster_name, db_name, follower_read).
+
+    Connections are handed out with a health check, returned to the pool after use and closed once they
+    have been idle for longer than IDLE_TIMEOUT_SECONDS. At most MAX_CONNECTIONS_PER_KEY connections are
+    open for the same key; callers block until one is released when the limit is reached.
+    """
+
+    MAX_CONNECTIONS_PER_KEY = int(os.getenv('CRDB_POOL_MAX_CONNECTIONS_PER_KEY', '4'))
+    IDLE_TIMEOUT_SECONDS = int(os.getenv('CRDB_POOL_IDLE_TIMEOUT_SECONDS', '300'))
+    PING_AFTER_IDLE_SECONDS = 30
+    ACQUIRE_TIMEOUT_SECONDS = 60
+    _condition = threading.Condition()
+    _idle_connections = {}
+    _open_connection_counts = {}
+
+    @staticmethod
+    @contextmanager
+    def connection(cluster_name: str, db_name: str = "defaultdb", follower_read: bool = False):
+        """
+        Borrow a connected CrdbConnection for the duration of a with block.
+        With follower_read=True the session is read-only and reads from the nearest replica, for
+        monitoring queries that can tolerate a few seconds of staleness.
+
+        Usage:
+            with CrdbConnectionManager.connection(cluster_name) as connection:
+                connection.execute_sql(sql, auto_commit=True)
+        """
+        crdb_connection = CrdbConnectionManager.acquire(cluster_name, db_name, follower_read)
+        try:
+            yield crdb_connection
+        finally:
+            CrdbConnectionManager.release(crdb_connection)
+
+    @staticmethod
+    def acquire(cluster_name: str, db_name: str = "defaultdb", follower_read: bool = False) -> CrdbConnection:
+        key = (cluster_name, db_name, follower_read)
+        while True:
+            crdb_connection, last_used = CrdbConnectionManager._checkout(key)
+            if crdb_connection is None:
+                return CrdbConnectionManager._open(key)
+            if CrdbConnectionManager._is_healthy(crdb_connection, last_used):
+                return crdb_connection
+            logger.warning(f"Discarding unhealthy pooled connection for {key}.")
+            CrdbConnectionManager._discard(key, crdb_connection)
+
+    @staticmethod
+    def release(crdb_connection: CrdbConnection):
+        key = (crdb_connection.cluster_name, crdb_connection.db_name, crdb_connection.follower_read)
+        connection = crdb_connection.connection
+        if connection is None or connection.closed:
+            CrdbConnectionManager._discard(key, crdb_connection)
+            return
+        try:
+            if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except psycopg2.Error as error:
+            logger.warning(f"Failed to reset pooled connection for {key}: {error}")
+            CrdbConnectionManager._discard(key, crdb_connection)
+            return
+        with CrdbConnectionManager._condition:
+            CrdbConnectionManager._idle_connections.setdefault(key, []).append((crdb_connection, time.time()))
+            CrdbConnectionManager._condition.notify()
+
+    @staticmethod
+    def close_all():
+        with CrdbConnectionManager._condition:
+            for key, idle_connections in CrdbConnectionManager._idle_connections.items():
+                for crdb_connection, _ in idle_connections:
+                    crdb_connection.close()
+                CrdbConnectionManager._open_connection_counts[key] -= len(idle_connections)
+            CrdbConnectionManager._idle_connections.clear()
+            CrdbConnectionManager._condition.notify_all()
+
+    @staticmethod
+    def _checkout(key):
+        """
+        Take an idle connection for the key, or reserve a slot for a new one.
+        Returns (None, None) when the caller should open a new connection.
+        """
+        deadline = time.time() + CrdbConnectionManager.ACQUIRE_TIMEOUT_SECONDS
+        with CrdbConnectionManager._condition:
+            while True:
+                CrdbConnectionManager._evict_idle_connections()
+                idle_connections = CrdbConnectionManager._idle_connections.get(key)
+                if idle_connections:
+                    return idle_connections.pop()
+                if CrdbConnectionManager._open_connection_counts.get(key, 0) < CrdbConnectionManager.MAX_CONNECTIONS_PER_KEY:
+                    CrdbConnectionManager._open_connection_counts[key] = CrdbConnectionManager._open_connection_counts.get(key, 0) + 1
+                    return None, None
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for a pooled connection for {key}.")
+                CrdbConnectionManager._condition.wait(remaining)
+
+    @staticmethod
+    def _open(key) -> CrdbConnection:
+        cluster_name, db_name, follower_read = key
+        try:
+            crdb_connection = CrdbConnection.get_crdb_connection(cluster_name, db_name, follower_read)
+            crdb_connection.connect()
+            if crdb_connection.connection is None:
+                raise ValueError("Connection is not established.")
+            return crdb_connection
+        except BaseException:
+            CrdbConnectionManager._discard(key, None)
+            raise
+
+    @staticmethod
+    def _discard(key, crdb_connection):
+        if crdb_connection is not None:
+            crdb_connection.close()
+        with CrdbConnectionManager._condition:
+            CrdbConnectionManager._open_connection_counts[key] -= 1
+            CrdbConnectionManager._condition.notify()
+
+    @staticmethod
+    def _is_healthy(crdb_connection: CrdbConnection, last_used: float) -> bool:
+        connection = crdb_connection.connection
+        if connection is None or connection.closed:
+            return False
+        if connection.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.time() - last_used < CrdbConnectionManager.PING_AFTER_IDLE_SECONDS:
+            return True
+        try:
+            connection.autocommit = True
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1;")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _evict_idle_connections():
+        # caller must hold _condition
+        now = time.time()
+        for key, idle_connections in CrdbConnectionManager._idle_connections.items():
+            expired = [(crdb_connection, last_used) for crdb_connection, last_used in idle_connections
+                       if now - last_used > CrdbConnectionManager.IDLE_TIMEOUT_SECONDS]
+            for crdb_connection, last_used in expired:
+                idle_connections.remove((crdb_connection, last_used))
+                crdb_connection.close()
+                CrdbConnectionManager._open_connection_counts[key] -= 1
+
+
+atexit.register(CrdbConnectionManager.close_all)
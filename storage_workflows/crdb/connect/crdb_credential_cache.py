@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from storage_workflows.crdb.api_gateway.secret_manager_gateway import SecretManagerGateway
+from storage_workflows.crdb.aws.secret_index import SecretIndex
+from storage_workflows.crdb.aws.secret_value import SecretValue
+from storage_workflows.crdb.connect.cred_type import CredType
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class CrdbCredentialCache:
+    """
+    Caches the CA cert, client cert and client key secrets of a cluster.
+
+    All the secrets of a cluster are listed with a single ListSecrets call and the values are fetched
+    together with BatchGetSecretValue. Values are keyed by (arn, version id), so after TTL_SECONDS only
+    the listing is repeated and values are fetched again only when a secret was rotated.
+    """
+
+    TTL_SECONDS = int(os.getenv('CRDB_CREDENTIAL_CACHE_TTL_SECONDS', '300'))
+    CURRENT_VERSION_STAGE = 'AWSCURRENT'
+    _lock = threading.Lock()
+    # (cluster_name, client) -> (expires_at, {CredType: (arn, version_id)})
+    _cluster_secret_versions = {}
+    # (arn, version_id) -> SecretValue, version_id is None for secrets listed without an AWSCURRENT version
+    _secret_values = {}
+
+    @staticmethod
+    def get_secret_value(cred_type: CredType, cluster_name: str, client: str = "") -> SecretValue:
+        return CrdbCredentialCache.get_credentials(cluster_name, client)[cred_type]
+
+    @staticmethod
+    def get_credentials(cluster_name: str, client: str = "") -> dict:
+        """
+        Returns a dict of CredType -> SecretValue for the cluster. The client certs are only
+        resolved when a client is given.
+        """
+        key = (cluster_name, client)
+        with CrdbCredentialCache._lock:
+            cached = CrdbCredentialCache._cluster_secret_versions.get(key)
+            if cached is None or time.time() >= cached[0]:
+                cached = (time.time() + CrdbCredentialCache.TTL_SECONDS,
+                          CrdbCredentialCache._resolve_secret_versions(cluster_name, client))
+                CrdbCredentialCache._cluster_secret_versions[key] = cached
+                CrdbCredentialCache._fetch_missing_secret_values(cached[1].values())
+            return {cred_type: CrdbCredentialCache._secret_values[secret_version]
+                    for cred_type, secret_version in cached[1].items()}
+
+    @staticmethod
+    def invalidate(cluster_name: str = None):
+        with CrdbCredentialCache._lock:
+            for key in list(CrdbCredentialCache._cluster_secret_versions.keys()):
+                if cluster_name is None or key[0] == cluster_name:
+                    _, secret_versions = CrdbCredentialCache._cluster_secret_versions.pop(key)
+                    # values keyed on the arn alone can't be told apart from a rotated one, fetch them again
+                    for arn, version_id in secret_versions.values():
+                        if version_id is None:
+                            CrdbCredentialCache._secret_values.pop((arn, None), None)
+
+    @staticmethod
+    def cluster_name_with_suffix(cluster_name: str) -> str:
+        # handle cluster_name with hyphens instead of underscores
+        cluster_names_to_modify = ['url_shortener', 'revenue_platform']
+
+        if cluster_name in cluster_names_to_modify or cluster_name.startswith('revenue_workflow_'):
+            return cluster_name.strip().replace("_", "-") + "-crdb"
+        return cluster_name + "-crdb"
+
+    @staticmethod
+    def _resolve_secret_versions(cluster_name: str, client: str) -> dict:
+        wanted_cred_types = {CredType.CA_CERT_CRED_TYPE: ""}
+        if client:
+            wanted_cred_types[CredType.PUBLIC_CERT_CRED_TYPE] = client
+            wanted_cred_types[CredType.PRIVATE_KEY_CRED_TYPE] = client
+
+        cluster_name_tag = CrdbCredentialCache.cluster_name_with_suffix(cluster_name)
+        indexed_secrets = {cred_type: SecretIndex.find(cluster_name_tag, cred_type.value, cred_client)
+                           for cred_type, cred_client in wanted_cred_types.items()}
+        if all(indexed_secrets.values()):
+            return {cred_type: (secret['ARN'], CrdbCredentialCache._current_version_id(secret))
+                    for cred_type, secret in indexed_secrets.items()}
+
+        secret_filters = [
+            {'Key': 'tag-key', 'Values': ['crdb_cluster_name']},
+            {'Key': 'tag-value', 'Values': [cluster_name_tag]},
+            {'Key': 'tag-value', 'Values': [os.getenv('DEPLOYMENT_ENV')]},
+            {'Key': 'description', 'Values': ['!DEPRECATED']}
+        ]
+        secret_list = SecretManagerGateway.list_secrets(secret_filters)
+        secret_versions = {}
+        for cred_type, cred_client in wanted_cred_types.items():
+            secret = next(filter(lambda secret: CrdbCredentialCache._secret_matches(secret, cred_type, cred_client),
+                                 secret_list), None)
+            # If no matching secret is found, raise an error
+            if secret is None:
+                raise ValueError(
+                    f"No secrets found for cluster_name: {cluster_name} with cred_type: "
+                    f"{cred_type.value}.")
+            secret_versions[cred_type] = (secret['ARN'], CrdbCredentialCache._current_version_id(secret))
+        return secret_versions
+
+    @staticmethod
+    def _secret_matches(secret: dict, cred_type: CredType, client: str) -> bool:
+        tags = {tag['Key']: tag['Value'] for tag in secret.get('Tags', [])}
+        if tags.get('cred-type') != cred_type.value:
+            return False
+        return not client or tags.get('client') == client
+
+    @staticmethod
+    def _current_version_id(secret: dict):
+        for version_id, stages in secret.get('SecretVersionsToStages', {}).items():
+            if CrdbCredentialCache.CURRENT_VERSION_STAGE in stages:
+                return version_id
+        return None
+
+    @staticmethod
+    def _fetch_missing_secret_values(secret_versions):
+        # caller must hold _lock
+        missing = [secret_version for secret_version in secret_versions
+                   if secret_version not in CrdbCredentialCache._secret_values]
+        if not missing:
+            return
+        missing_arns = list(dict.fromkeys(arn for arn, _ in missing))
+        logger.info(f"Fetching {len(missing_arns)} secret value(s) from Secrets Manager.")
+        api_responses = SecretManagerGateway.batch_find_secrets(missing_arns)
+        for arn, version_id in missing:
+            # drop values of rotated versions of the same secret
+            for cached_version in [cached for cached in CrdbCredentialCache._secret_values if cached[0] == arn]:
+                del CrdbCredentialCache._secret_values[cached_version]
+            CrdbCredentialCache._secret_values[(arn, version_id)] = SecretValue(api_responses[arn])
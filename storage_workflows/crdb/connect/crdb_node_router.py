@@ -0,0 +1,89 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import psycopg2
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class CrdbNodeRouter:
+    """
+    Picks the nodes CrdbConnection connects to directly when CRDB_CONNECTION_ROUTING=direct.
+
+    Nodes come from the auto_discovery.nodes view maintained by az_exclusion, skipping excluded nodes,
+    and are ordered by measured TCP connect latency. The list is cached per cluster for
+    NODE_CACHE_TTL_SECONDS and nodes that fail to accept a connection are dropped from it.
+    """
+
+    DIRECT_ROUTING = 'direct'
+    NODE_CACHE_TTL_SECONDS = int(os.getenv('CRDB_NODE_CACHE_TTL_SECONDS', '60'))
+    PROBE_TIMEOUT_SECONDS = 0.5
+    PROBE_MAX_WORKERS = 16
+    FIND_NODES_SQL = "SELECT ip_address, port FROM auto_discovery.nodes WHERE NOT excluded;"
+    _lock = threading.Lock()
+    # cluster_name -> (expires_at, [(ip_address, port)])
+    _node_addresses = {}
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return os.getenv('CRDB_CONNECTION_ROUTING', 'load_balancer') == CrdbNodeRouter.DIRECT_ROUTING
+
+    @staticmethod
+    def get_node_addresses(cluster_name: str, discover) -> list:
+        """
+        Returns (ip_address, port) of reachable nodes, fastest first.
+        discover is called on a cache miss and must return the rows of FIND_NODES_SQL.
+        """
+        with CrdbNodeRouter._lock:
+            cached = CrdbNodeRouter._node_addresses.get(cluster_name)
+            if cached and time.time() < cached[0]:
+                return list(cached[1])
+        try:
+            rows = discover()
+        except psycopg2.Error as error:
+            logger.warning(f"Failed to discover nodes of {cluster_name}: {error}")
+            rows = []
+        node_addresses = CrdbNodeRouter.sort_by_latency([(ip_address, int(port)) for ip_address, port in rows])
+        logger.info(f"Discovered {len(node_addresses)} reachable node(s) for {cluster_name}.")
+        with CrdbNodeRouter._lock:
+            CrdbNodeRouter._node_addresses[cluster_name] = (time.time() + CrdbNodeRouter.NODE_CACHE_TTL_SECONDS,
+                                                            node_addresses)
+        return list(node_addresses)
+
+    @staticmethod
+    def mark_node_failed(cluster_name: str, node_address: tuple):
+        with CrdbNodeRouter._lock:
+            cached = CrdbNodeRouter._node_addresses.get(cluster_name)
+            if cached and node_address in cached[1]:
+                cached[1].remove(node_address)
+
+    @staticmethod
+    def invalidate(cluster_name: str = None):
+        with CrdbNodeRouter._lock:
+            if cluster_name is None:
+                CrdbNodeRouter._node_addresses.clear()
+            else:
+                CrdbNodeRouter._node_addresses.pop(cluster_name, None)
+
+    @staticmethod
+    def sort_by_latency(node_addresses: list) -> list:
+        if not node_addresses:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(node_addresses), CrdbNodeRouter.PROBE_MAX_WORKERS)) as executor:
+            latencies = list(executor.map(CrdbNodeRouter.probe, node_addresses))
+        reachable = [(latency, node_address) for latency, node_address in zip(latencies, node_addresses)
+                     if latency is not None]
+        return [node_address for _, node_address in sorted(reachable)]
+
+    @staticmethod
+    def probe(node_address: tuple):
+        """Returns the TCP connect latency to the node in seconds, or None if it is unreachable."""
+        start = time.monotonic()
+        try:
+            with socket.create_connection(node_address, timeout=CrdbNodeRouter.PROBE_TIMEOUT_SECONDS):
+                return time.monotonic() - start
+        except OSError:
+            return None
@@ -0,0 +1,145 @@
+import atexit
+import json
+import os
+import re
+import threading
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class SqlMetrics:
+    """
+    In-memory latency histograms per (cluster, SQL fingerprint), fed by the CrdbConnection statement hook.
+
+    Enabled by setting CRDB_SQL_METRICS_FORMAT to json or prometheus. The metrics are dumped when the
+    process exits, to CRDB_SQL_METRICS_PATH if set and to the log otherwise.
+    """
+
+    JSON_FORMAT = 'json'
+    PROMETHEUS_FORMAT = 'prometheus'
+    BUCKETS_SECONDS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf')]
+    _STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+    _NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+    _PLACEHOLDER = re.compile(r"%s|\$\d+")
+    _WHITESPACE = re.compile(r"\s+")
+    _lock = threading.Lock()
+    # (cluster_name, fingerprint) -> SqlMetrics.Histogram
+    _histograms = {}
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return SqlMetrics.metrics_format() in (SqlMetrics.JSON_FORMAT, SqlMetrics.PROMETHEUS_FORMAT)
+
+    @staticmethod
+    def metrics_format():
+        return os.getenv('CRDB_SQL_METRICS_FORMAT')
+
+    @staticmethod
+    def fingerprint(sql_text: str) -> str:
+        """Normalize a statement so runs that only differ in literals or parameters share a histogram."""
+        fingerprint = SqlMetrics._STRING_LITERAL.sub("_", sql_text)
+        fingerprint = SqlMetrics._PLACEHOLDER.sub("_", fingerprint)
+        fingerprint = SqlMetrics._NUMBER_LITERAL.sub("_", fingerprint)
+        return SqlMetrics._WHITESPACE.sub(" ", fingerprint).strip()
+
+    @staticmethod
+    def record(cluster_name: str, sql_text: str, duration_seconds: float, rows: int = None, error: Exception = None):
+        key = (cluster_name, SqlMetrics.fingerprint(sql_text))
+        with SqlMetrics._lock:
+            histogram = SqlMetrics._histograms.get(key)
+            if histogram is None:
+                histogram = SqlMetrics.Histogram()
+                SqlMetrics._histograms[key] = histogram
+            histogram.observe(duration_seconds, rows, error)
+
+    @staticmethod
+    def reset():
+        with SqlMetrics._lock:
+            SqlMetrics._histograms.clear()
+
+    @staticmethod
+    def to_json() -> str:
+        with SqlMetrics._lock:
+            metrics = [dict(cluster=cluster_name, fingerprint=fingerprint, **histogram.to_dict())
+                       for (cluster_name, fingerprint), histogram in SqlMetrics._histograms.items()]
+        return json.dumps(metrics, indent=2)
+
+    @staticmethod
+    def to_prometheus() -> str:
+        duration_lines = ["# HELP crdb_wf_sql_statement_duration_seconds Duration of SQL statements by fingerprint.",
+                          "# TYPE crdb_wf_sql_statement_duration_seconds histogram"]
+        rows_lines = ["# HELP crdb_wf_sql_statement_rows_total Rows returned by SQL statements by fingerprint.",
+                      "# TYPE crdb_wf_sql_statement_rows_total counter"]
+        errors_lines = ["# HELP crdb_wf_sql_statement_errors_total Failed SQL statements by fingerprint and error.",
+                        "# TYPE crdb_wf_sql_statement_errors_total counter"]
+        with SqlMetrics._lock:
+            for (cluster_name, fingerprint), histogram in SqlMetrics._histograms.items():
+                labels = 'cluster="{}",fingerprint="{}"'.format(escape_label_value(cluster_name),
+                                                                escape_label_value(fingerprint))
+                cumulative_count = 0
+                for upper_bound, bucket_count in zip(SqlMetrics.BUCKETS_SECONDS, histogram.bucket_counts):
+                    cumulative_count += bucket_count
+                    le = "+Inf" if upper_bound == float('inf') else str(upper_bound)
+                    duration_lines.append('crdb_wf_sql_statement_duration_seconds_bucket{{{},le="{}"}} {}'.format(
+                        labels, le, cumulative_count))
+                duration_lines.append("crdb_wf_sql_statement_duration_seconds_sum{{{}}} {}".format(
+                    labels, histogram.sum_seconds))
+                duration_lines.append("crdb_wf_sql_statement_duration_seconds_count{{{}}} {}".format(
+                    labels, histogram.count))
+                rows_lines.append("crdb_wf_sql_statement_rows_total{{{}}} {}".format(labels, histogram.rows))
+                for error_class, error_count in histogram.errors.items():
+                    errors_lines.append('crdb_wf_sql_statement_errors_total{{{},error="{}"}} {}'.format(
+                        labels, escape_label_value(error_class), error_count))
+        return "\n".join(duration_lines + rows_lines + errors_lines) + "\n"
+
+    @staticmethod
+    def dump():
+        if not SqlMetrics.is_enabled() or not SqlMetrics._histograms:
+            return
+        output = SqlMetrics.to_prometheus() if SqlMetrics.metrics_format() == SqlMetrics.PROMETHEUS_FORMAT \
+            else SqlMetrics.to_json()
+        metrics_path = os.getenv('CRDB_SQL_METRICS_PATH')
+        if metrics_path:
+            with open(metrics_path, "w") as file:
+                file.write(output)
+            logger.info(f"SQL metrics written to {metrics_path}.")
+        else:
+            logger.info(f"SQL metrics:\n{output}")
+
+    class Histogram:
+        def __init__(self):
+            self.bucket_counts = [0] * len(SqlMetrics.BUCKETS_SECONDS)
+            self.count = 0
+            self.sum_seconds = 0.0
+            self.rows = 0
+            self.errors = {}
+
+        def observe(self, duration_seconds: float, rows: int = None, error: Exception = None):
+            for index, upper_bound in enumerate(SqlMetrics.BUCKETS_SECONDS):
+                if duration_seconds <= upper_bound:
+                    self.bucket_counts[index] += 1
+                    break
+            self.count += 1
+            self.sum_seconds += duration_seconds
+            if rows is not None and rows > 0:
+                self.rows += rows
+            if error is not None:
+                error_class = type(error).__name__
+                self.errors[error_class] = self.errors.get(error_class, 0) + 1
+
+        def to_dict(self) -> dict:
+            return dict(count=self.count,
+                        sum_seconds=self.sum_seconds,
+                        rows=self.rows,
+                        errors=self.errors,
+                        buckets={("+Inf" if upper_bound == float('inf') else str(upper_bound)): bucket_count
+                                 for upper_bound, bucket_count in zip(SqlMetrics.BUCKETS_SECONDS,
+                                                                      self.bucket_counts)})
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+atexit.register(SqlMetrics.dump)
@@ -0,0 +1,5 @@
+from psycopg2.extensions import QueryCanceledError
+
+
+class StatementTimeoutException(QueryCanceledError):
+    pass
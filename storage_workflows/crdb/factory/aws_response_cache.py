@@ -0,0 +1,139 @@
+import copy
+import json
+import os
+import threading
+import time
+from botocore.awsrequest import AWSResponse
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class AwsResponseCache:
+    """
+    Per-process read-through cache for describe calls, hooked into the botocore event system of every client
+    AwsSessionFactory creates, so the gateways don't need to know about it.
+
+    Responses are keyed by (service, operation, params) and kept for a short per-operation TTL. A successful
+    call to one of MUTATING_OPERATIONS drops every entry that mentions one of the resources it touched, e.g.
+    update_auto_scaling_group drops the cached describe_auto_scaling_groups of that group, and
+    terminate_instances drops cached instances and the groups they belong to. Other calls leave the cache alone.
+
+    Disabled with AWS_RESPONSE_CACHE_ENABLED=false.
+    """
+
+    DEFAULT_TTL_SECONDS = float(os.getenv('AWS_RESPONSE_CACHE_TTL_SECONDS', '5'))
+    # operation -> ttl in seconds, only these are cached
+    CACHEABLE_OPERATIONS = {
+        'DescribeAutoScalingGroups': DEFAULT_TTL_SECONDS,
+        'DescribeInstances': DEFAULT_TTL_SECONDS,
+        'DescribeLoadBalancers': DEFAULT_TTL_SECONDS,
+        'DescribeVolumes': DEFAULT_TTL_SECONDS,
+        'DescribeLaunchTemplateVersions': DEFAULT_TTL_SECONDS,
+        # launch configurations can't be changed once created
+        'DescribeLaunchConfigurations': 300,
+    }
+    # launch template versions are immutable, but only numeric ones; $Latest and $Default move
+    NUMERIC_LAUNCH_TEMPLATE_VERSIONS_TTL_SECONDS = 300
+    # successful calls of these invalidate the entries of the resources they name
+    MUTATING_OPERATIONS = frozenset([
+        # autoscaling
+        'UpdateAutoScalingGroup', 'SetDesiredCapacity', 'TerminateInstanceInAutoScalingGroup', 'AttachInstances',
+        'DetachInstances', 'EnterStandby', 'ExitStandby', 'SetInstanceHealth', 'CreateOrUpdateTags', 'DeleteTags',
+        # ec2
+        'RunInstances', 'TerminateInstances', 'StartInstances', 'StopInstances', 'RebootInstances', 'AttachVolume',
+        'DetachVolume', 'ModifyInstanceAttribute', 'CreateTags',
+        # elb
+        'RegisterInstancesWithLoadBalancer', 'DeregisterInstancesFromLoadBalancer', 'AddTags', 'RemoveTags',
+    ])
+    # keys whose values identify the resource a request or response is about
+    RESOURCE_KEYS = ('AutoScalingGroupName', 'AutoScalingGroupNames', 'InstanceId', 'InstanceIds',
+                     'LoadBalancerName', 'LoadBalancerNames', 'LaunchTemplateId', 'VolumeId', 'VolumeIds')
+    _CONTEXT_KEY = 'aws_response_cache'
+    _lock = threading.Lock()
+    # (service_name, operation_name, params) -> (expires_at, resources, parsed_response)
+    _entries = {}
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return os.getenv('AWS_RESPONSE_CACHE_ENABLED', 'true').lower() != 'false'
+
+    @staticmethod
+    def register(client):
+        client.meta.events.register('before-parameter-build', AwsResponseCache._on_before_parameter_build)
+        client.meta.events.register('before-call', AwsResponseCache._on_before_call)
+        client.meta.events.register('after-call', AwsResponseCache._on_after_call)
+
+    @staticmethod
+    def clear():
+        with AwsResponseCache._lock:
+            AwsResponseCache._entries.clear()
+
+    @staticmethod
+    def invalidate(resources: set = None):
+        """Drop entries mentioning any of the resources, or every entry when resources is empty."""
+        with AwsResponseCache._lock:
+            if not resources:
+                AwsResponseCache._entries.clear()
+                return
+            for key, (_, entry_resources, _) in list(AwsResponseCache._entries.items()):
+                if not entry_resources or entry_resources & resources:
+                    del AwsResponseCache._entries[key]
+
+    @staticmethod
+    def _on_before_parameter_build(params, model, context, **kwargs):
+        context[AwsResponseCache._CONTEXT_KEY] = dict(
+            key=(model.service_model.service_name, model.name, json.dumps(params, sort_keys=True, default=str)),
+            resources=AwsResponseCache._find_resources(params),
+            ttl_seconds=AwsResponseCache._ttl_seconds(model.name, params))
+
+    @staticmethod
+    def _ttl_seconds(operation_name, params):
+        if operation_name == 'DescribeLaunchTemplateVersions':
+            versions = params.get('Versions') or []
+            if versions and all(str(version).isdigit() for version in versions):
+                return AwsResponseCache.NUMERIC_LAUNCH_TEMPLATE_VERSIONS_TTL_SECONDS
+        return AwsResponseCache.CACHEABLE_OPERATIONS.get(operation_name)
+
+    @staticmethod
+    def _on_before_call(model, context, **kwargs):
+        request = context.get(AwsResponseCache._CONTEXT_KEY)
+        if request is None or request['ttl_seconds'] is None:
+            return None
+        with AwsResponseCache._lock:
+            entry = AwsResponseCache._entries.get(request['key'])
+            if entry is None or time.time() >= entry[0]:
+                return None
+            request['hit'] = True
+            return AWSResponse(None, 200, {}, None), copy.deepcopy(entry[2])
+
+    @staticmethod
+    def _on_after_call(http_response, parsed, model, context, **kwargs):
+        request = context.get(AwsResponseCache._CONTEXT_KEY)
+        if request is None or request.get('hit') or http_response.status_code >= 300:
+            return
+        ttl_seconds = request['ttl_seconds']
+        if ttl_seconds is not None:
+            resources = request['resources'] | AwsResponseCache._find_resources(parsed)
+            with AwsResponseCache._lock:
+                AwsResponseCache._entries[request['key']] = (time.time() + ttl_seconds, resources,
+                                                             copy.deepcopy(parsed))
+        elif model.name in AwsResponseCache.MUTATING_OPERATIONS:
+            logger.debug(f"{model.name} succeeded, invalidating cached responses for {request['resources']}.")
+            AwsResponseCache.invalidate(request['resources'])
+
+    @staticmethod
+    def _find_resources(value) -> set:
+        resources = set()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key in AwsResponseCache.RESOURCE_KEYS:
+                    if isinstance(item, str):
+                        resources.add(item)
+                    elif isinstance(item, list):
+                        resources.update(resource for resource in item if isinstance(resource, str))
+                resources |= AwsResponseCache._find_resources(item)
+        elif isinstance(value, list):
+            for item in value:
+                resources |= AwsResponseCache._find_resources(item)
+        return resources
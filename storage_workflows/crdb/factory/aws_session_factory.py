@@ -2,40 +2,99 @@ import boto3
 import os
 import time
 import threading
-from functools import cache
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from storage_workflows.crdb.factory.aws_response_cache import AwsResponseCache
 from storage_workflows.logging.logger import Logger
 
 logger = Logger()
 
 class AwsSessionFactory:
-    _cache = {}
-    _cache_expiry = {}
-    CACHE_DURATION = 3500  # Less than an hour to be safe
+    """
+    Hands out botocore clients built from one boto3 Session per set of credentials.
+
+    The assumed role credentials are held by the session instead of os.environ, and clients are created
+    once per (service, region) under a lock and then shared, botocore clients being safe to use from
+    several threads. sts keeps using the process' own credentials so the role can be assumed again.
+    """
     TOKEN_REFRESH_THRESHOLD = 300  # Refresh token if it's about to expire in the next 5 minutes
-    _lock = threading.Lock()
+    MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+    MAX_ATTEMPTS = int(os.getenv('AWS_MAX_ATTEMPTS', '10'))
+    RETRY_MODE = os.getenv('AWS_RETRY_MODE', 'adaptive')
+    _lock = threading.RLock()
+    # (service_name, region) -> client, for the current session
+    _clients = {}
+    _base_session = None
+    _session = None
+    _session_identity = None
+    _access_key_id = None
+    _credentials_expiration = None
+    # called to assume the role again when its credentials are about to expire
+    _credentials_refresher = None
+
+    @staticmethod
+    def client_config() -> Config:
+        return Config(max_pool_connections=AwsSessionFactory.MAX_POOL_CONNECTIONS,
+                      tcp_keepalive=True,
+                      retries={'mode': AwsSessionFactory.RETRY_MODE,
+                               'max_attempts': AwsSessionFactory.MAX_ATTEMPTS})
 
     @staticmethod
-    def create_client(service_name):
+    def set_credentials(access_key_id, secret_access_key, session_token, expiration=None, identity=None,
+                        refresher=None):
+        """
+        Use these credentials for every client created from now on.
+        refresher is called without arguments when they are about to expire and must call set_credentials again.
+        """
         with AwsSessionFactory._lock:
-            if AwsSessionFactory.is_token_about_to_expire():
-                AwsSessionFactory.refresh_token()
+            if AwsSessionFactory._session is not None and access_key_id == AwsSessionFactory._access_key_id:
+                # same cached role credentials, keep the clients built on them
+                return
+            AwsSessionFactory._access_key_id = access_key_id
+            AwsSessionFactory._session = boto3.session.Session(aws_access_key_id=access_key_id,
+                                                               aws_secret_access_key=secret_access_key,
+                                                               aws_session_token=session_token,
+                                                               region_name=os.getenv('REGION'))
+            if identity != AwsSessionFactory._session_identity:
+                # cached describe responses belong to the previous account
+                AwsResponseCache.clear()
+            AwsSessionFactory._session_identity = identity
+            AwsSessionFactory._credentials_expiration = expiration
+            AwsSessionFactory._credentials_refresher = refresher
+            AwsSessionFactory._clients.clear()
 
-            current_time = time.time()
+    @staticmethod
+    def session() -> boto3.session.Session:
+        with AwsSessionFactory._lock:
+            return AwsSessionFactory._session or AwsSessionFactory.base_session()
+
+    @staticmethod
+    def base_session() -> boto3.session.Session:
+        """Session from the default credential chain, i.e. the process' own credentials."""
+        with AwsSessionFactory._lock:
+            if AwsSessionFactory._base_session is None:
+                AwsSessionFactory._base_session = boto3.session.Session(region_name=os.getenv('REGION'))
+            return AwsSessionFactory._base_session
 
-            if service_name in AwsSessionFactory._cache and \
-                    current_time < AwsSessionFactory._cache_expiry.get(service_name, 0):
-                return AwsSessionFactory._cache[service_name]
+    @staticmethod
+    def create_client(service_name, session=None):
+        with AwsSessionFactory._lock:
+            if session is None:
+                if AwsSessionFactory.is_token_about_to_expire():
+                    AwsSessionFactory.refresh_token()
+                session = AwsSessionFactory.session()
+            region = os.getenv('REGION')
+            key = (id(session), service_name, region)
+            client = AwsSessionFactory._clients.get(key)
+            if client is not None:
+                return client
 
             try:
-                client = boto3.client(service_name,
-                                      aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                                      aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                                      aws_session_token=os.getenv('AWS_SESSION_TOKEN'),
-                                      region_name=os.getenv('REGION'))
+                client = session.client(service_name, region_name=region, config=AwsSessionFactory.client_config())
+                if AwsResponseCache.is_enabled():
+                    AwsResponseCache.register(client)
 
-                AwsSessionFactory._cache[service_name] = client
-                AwsSessionFactory._cache_expiry[service_name] = current_time + AwsSessionFactory.CACHE_DURATION
+                AwsSessionFactory._clients[key] = client
 
                 return client
 
@@ -45,73 +104,56 @@ class AwsSessionFactory:
 
     @staticmethod
     def refresh_token():
+        refresher = AwsSessionFactory._credentials_refresher
+        if refresher is None:
+            return
         try:
-            sts_client = boto3.client('sts',
-                                      aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                                      aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                                      region_name=os.getenv('REGION'))
-
-            response = sts_client.get_session_token()
-            os.environ['AWS_ACCESS_KEY_ID'] = response['Credentials']['AccessKeyId']
-            os.environ['AWS_SECRET_ACCESS_KEY'] = response['Credentials']['SecretAccessKey']
-            os.environ['AWS_SESSION_TOKEN'] = response['Credentials']['SessionToken']
-
-            # Invalidate the existing cache
-            AwsSessionFactory._cache.clear()
-            AwsSessionFactory._cache_expiry.clear()
-
+            refresher()
         except ClientError as e:
             logger.error(f"Failed to refresh token: {str(e)}")
             raise
 
     @staticmethod
     def is_token_about_to_expire():
-        expiration = os.getenv('AWS_TOKEN_EXPIRATION')
+        expiration = AwsSessionFactory._credentials_expiration
         if not expiration:
             return False
+        if hasattr(expiration, 'timestamp'):
+            expiration = expiration.timestamp()
         return time.time() > float(expiration) - AwsSessionFactory.TOKEN_REFRESH_THRESHOLD
 
     @staticmethod
-    @cache
     def auto_scaling():
         return AwsSessionFactory.create_client('autoscaling')
 
     @staticmethod
-    @cache
     def secret_manager():
         return AwsSessionFactory.create_client('secretsmanager')
 
     @staticmethod
-    @cache
     def sts():
-        return AwsSessionFactory.create_client('sts')
+        return AwsSessionFactory.create_client('sts', AwsSessionFactory.base_session())
 
     @staticmethod
-    @cache
     def ec2():
         return AwsSessionFactory.create_client('ec2')
 
     @staticmethod
-    @cache
     def elb():
         return AwsSessionFactory.create_client('elb')
 
     @staticmethod
-    @cache
     def iam():
         return AwsSessionFactory.create_client('iam')
 
     @staticmethod
-    @cache
     def ebs():
         return AwsSessionFactory.create_client('ebs')
 
     @staticmethod
-    @cache
     def s3():
         return AwsSessionFactory.create_client('s3')
 
     @staticmethod
-    @cache
     def elbv2():
         return AwsSessionFactory.create_client('elbv2')
@@ -1,8 +1,8 @@
 import os
+from contextlib import closing
 import subprocess
 import time
 from typing import Any
-from functools import reduce
 from storage_workflows.chronosphere.chronosphere_api_gateway import ChronosphereApiGateway
 from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
 from storage_workflows.crdb.aws.auto_scaling_group import AutoScalingGroup
@@ -15,6 +15,8 @@ from storage_workflows.crdb.models.jobs.restore_job import RestorelJob
 from storage_workflows.crdb.models.jobs.row_level_ttl_job import RowLevelTtlJob
 from storage_workflows.crdb.models.jobs.schema_change_job import SchemaChangelJob
 from storage_workflows.crdb.models.node import Node
+from storage_workflows.crdb.models.node_set import NodeSet
+from storage_workflows.crdb.models.node_store_snapshot import NodeStoreSnapshot
 from storage_workflows.logging.logger import Logger
 
 
@@ -44,7 +46,7 @@ class Cluster:
     @property
     def cluster_settings(self) -> list[ClusterSetting]:
         logger.info("retrieving cluster_settings")
-        return ClusterSetting.find_all_cluster_settings(self.cluster_name)
+        return ClusterSetting.find_all_cluster_settings(self.cluster_name, follower_read=True)
     
     def is_avg_cpu_exceed_threshold(self, threshold:float, offest_mins:int) -> bool:
         query = 'min_over_time(avg(sys_cpu_combined_percent_normalized{{job="crdb", cluster="{}_{}", region="{}"}})[{}m:10s]) > bool {}'.format(self.cluster_name, 
@@ -56,8 +58,6 @@ class Cluster:
     
     def update_cluster_setting(self, variable:str, value:Any):
         logger.info("updating cluster setting {}".format(variable))
-        connection = CrdbConnection.get_crdb_connection(self.cluster_name)
-        connection.connect()
         cluster_setting = ClusterSetting.find_cluster_setting(self.cluster_name, variable)
         logger.info("current value: {}".format(cluster_setting.value))
         logger.info("new value: {}".format(value))
@@ -66,60 +66,69 @@ class Cluster:
 
     def get_cluster_setting(self, variable:str) -> ClusterSetting:
         logger.info("retrieving cluster setting {}".format(variable))
-        cluster_setting = ClusterSetting.find_cluster_setting(self.cluster_name, variable)
+        cluster_setting = ClusterSetting.find_cluster_setting(self.cluster_name, variable, follower_read=True)
         logger.info("current value: {}".format(cluster_setting.value))
         return cluster_setting
     
     def backup_job_is_running(self) -> bool:
         logger.info("checking for running backups")
-        running_backup_jobs = list(filter(lambda job: job.status == 'running',
-                                          BackupJob.find_all_backup_jobs(self.cluster_name)))
-        contains_running_backup_job = any(running_backup_jobs)
+        # stop reading jobs as soon as one matches
+        with closing(BackupJob.iter_backup_jobs(self.cluster_name)) as jobs:
+            contains_running_backup_job = any(job.status == 'running' for job in jobs)
         if contains_running_backup_job:
             logger.warning("Running backup job(s) found!")
         return contains_running_backup_job
     
     def restore_job_is_running(self) -> bool:
         logger.info("checking for restore running restore job")
-        running_restore_jobs = list(filter(lambda job: job.status == 'running',
-                                           RestorelJob.find_all_restore_jobs(self.cluster_name)))
-        contains_running_restore_job = any(running_restore_jobs)
+        with closing(RestorelJob.iter_restore_jobs(self.cluster_name)) as jobs:
+            contains_running_restore_job = any(job.status == 'running' for job in jobs)
         if contains_running_restore_job:
             logger.warning("Running restore job(s) found!")
         return contains_running_restore_job
     
     def schema_change_job_is_running(self) -> bool:
         logger.info("checking for running schema change job")
-        running_schema_change_jobs = list(filter(lambda job: job.status == 'running',
-                                                 SchemaChangelJob.find_all_schema_change_jobs(self.cluster_name)))
-        contains_schema_change_job = any(running_schema_change_jobs)
+        with closing(SchemaChangelJob.iter_schema_change_jobs(self.cluster_name)) as jobs:
+            contains_schema_change_job = any(job.status == 'running' for job in jobs)
         if contains_schema_change_job:
             logger.warning("Running schema change job found!")
         return contains_schema_change_job
     
     def row_level_ttl_job_is_running(self) -> bool:
         logger.info("checking for running ttl job")
-        running_row_level_ttl_jobs = list(filter(lambda job: job.status == 'running',
-                                                 RowLevelTtlJob.find_all_row_level_ttl_jobs(self.cluster_name)))
-        contains_row_level_ttl_job = any(running_row_level_ttl_jobs)
+        with closing(RowLevelTtlJob.iter_row_level_ttl_jobs(self.cluster_name)) as jobs:
+            contains_row_level_ttl_job = any(job.status == 'running' for job in jobs)
         if contains_row_level_ttl_job:
             logger.warning("Running row level ttl job(s) found!")
         return contains_row_level_ttl_job
     
     def paused_changefeed_jobs_exist(self) -> bool:
         logger.info("checking for paused changefeed jobs")
-        paused_changefeed_jobs = list(filter(lambda job: job.status == 'paused',
-                                             ChangefeedJob.find_all_changefeed_jobs(self.cluster_name)))
-        contains_paused_changefeed_jobs = any(paused_changefeed_jobs)
+        with closing(ChangefeedJob.iter_changefeed_jobs(self.cluster_name)) as jobs:
+            contains_paused_changefeed_jobs = any(job.status == 'paused' for job in jobs)
         if contains_paused_changefeed_jobs:
             logger.warning("Paused changefeed job(s) found!")
         return contains_paused_changefeed_jobs
     
+    def range_health(self) -> dict:
+        """
+        Under-replicated, over-replicated and unavailable range counts per node id and in total,
+        from a single request for the store statuses of all nodes.
+        """
+        counters = ('underreplicated_ranges', 'overreplicated_ranges', 'unavailable_ranges')
+        nodes = {node_id: {counter: getattr(snapshot, counter) for counter in counters}
+                 for node_id, snapshot in NodeStoreSnapshot.fetch_all().items()}
+        total = {counter: sum(node_counts[counter] for node_counts in nodes.values()) for counter in counters}
+        return {'nodes': nodes, 'total': total}
+
     def unhealthy_ranges_exist(self) -> bool:
         logger.info("checking for unhealthy ranges")
-        nodes = self.nodes
-        unhealthy_ranges_list = map(lambda node: node.overreplicated_ranges+node.unavailable_ranges+node.underreplicated_ranges, nodes)
-        total_unhealthy_ranges = reduce(lambda range_count_1, range_count_2: range_count_1+range_count_2, unhealthy_ranges_list)
+        range_health = self.range_health()
+        total_unhealthy_ranges = sum(range_health['total'].values())
+        if total_unhealthy_ranges > 0:
+            logger.info("unhealthy ranges per node: {}".format(
+                {node_id: counts for node_id, counts in range_health['nodes'].items() if any(counts.values())}))
         return total_unhealthy_ranges > 0
     
     def instances_not_in_service_exist(self) -> bool:
@@ -177,27 +186,37 @@ class Cluster:
         instance_ids = []
         for instance in asg_instances:
             instance_ids.append(instance.instance_id)
-        nodes = list(map(lambda instance_id: Ec2Instance.find_ec2_instance(instance_id).crdb_node, instance_ids))
-        return nodes
+        ec2_instances = Ec2Instance.find_ec2_instances(instance_ids)
+        return NodeSet.fetch().for_ip_addresses(
+            [ec2_instances[instance_id].private_ip_address for instance_id in instance_ids])
 
     def wait_for_hydration(self, timeout_mins:int):
         def is_node_hydrated(old_applied_initial_snapshots, new_applied_initial_snapshots):
             return (new_applied_initial_snapshots - old_applied_initial_snapshots)/60 < 0.75
         def refresh_snapshots_dict(nodes:list[Node], applied_initial_snapshots_dict:dict):
             for node in nodes:
-                applied_initial_snapshots_dict[node.id] = node.applied_initial_snapshots
+                # nodes that didn't answer keep the count of their last answer
+                if node.id not in failed_node_ids:
+                    applied_initial_snapshots_dict[node.id] = node.applied_initial_snapshots
         asg = AutoScalingGroup.find_auto_scaling_group_by_cluster_name(self.cluster_name)
         metadata_db_operations = MetadataDBOperations()
         old_instance_ids = metadata_db_operations.get_old_instance_ids(self.cluster_name, os.getenv('DEPLOYMENT_ENV'))
         new_instances = list(filter(lambda instance: instance.instance_id not in old_instance_ids, asg.instances))
-        new_nodes = list(map(lambda instance: Ec2Instance.find_ec2_instance(instance.instance_id).crdb_node, new_instances))
+        ec2_instances = Ec2Instance.find_ec2_instances([instance.instance_id for instance in new_instances])
+        new_nodes = NodeSet.fetch().for_ip_addresses(
+            [ec2_instances[instance.instance_id].private_ip_address for instance in new_instances])
         applied_initial_snapshots_dict = {}
         for node in new_nodes:
             applied_initial_snapshots_dict[node.id] = 0
         logger.info("Checking nodes for hydration with {} mins timeout.".format(timeout_mins))
         is_snapshots_change_rate_below_threshold_for_last_check = False
         for minute in range(timeout_mins):
-            nodes_pending_hydration = list(filter(lambda node: not is_node_hydrated(applied_initial_snapshots_dict[node.id], node.applied_initial_snapshots), new_nodes))
+            # one store metrics fetch per node per check, all nodes at once; reads below use the node snapshots
+            failed_node_ids = set(NodeStoreSnapshot.refresh_all([node.store_snapshot for node in new_nodes]))
+            if failed_node_ids:
+                logger.warning("No store metrics from nodes {}, counting them as not hydrated.".format(
+                    sorted(failed_node_ids)))
+            nodes_pending_hydration = list(filter(lambda node: node.id in failed_node_ids or not is_node_hydrated(applied_initial_snapshots_dict[node.id], node.applied_initial_snapshots), new_nodes))
             if not nodes_pending_hydration:
                 if is_snapshots_change_rate_below_threshold_for_last_check:
                     logger.info("Hydration complete.")
@@ -217,12 +236,13 @@ class Cluster:
     def wait_for_connections_drain_on_old_nodes(self, timeout_mins:int):
         metadata_db_operations = MetadataDBOperations()
         old_instance_ids = metadata_db_operations.get_old_instance_ids(self.cluster_name, os.getenv('DEPLOYMENT_ENV'))
-        old_nodes = list(map(lambda instance_id: Ec2Instance.find_ec2_instance(instance_id).crdb_node, old_instance_ids))
+        ec2_instances = Ec2Instance.find_ec2_instances(old_instance_ids)
+        old_nodes = NodeSet.fetch().subset_for_ip_addresses(
+            [ec2_instances[instance_id].private_ip_address for instance_id in old_instance_ids])
         logger.info("Waiting for connections drain...")
         for count in range(timeout_mins):
             logger.info("Checking for connections...")
-            for node in old_nodes:
-                node.reload()
+            old_nodes.reload()
             nodes_not_drained = list(filter(lambda node: node.sql_conns > 1, old_nodes))
             if nodes_not_drained:
                 ids = list(map(lambda node: node.id, nodes_not_drained))
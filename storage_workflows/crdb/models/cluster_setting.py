@@ -1,24 +1,24 @@
 from __future__ import annotations
-from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
+import re
+from storage_workflows.crdb.connect.crdb_connection_manager import CrdbConnectionManager
 
 class ClusterSetting:
+    SHOW_CLUSTER_SETTING_SQL = "SELECT * FROM [SHOW CLUSTER SETTINGS] where variable = %s;"
+    # setting names are identifiers and can't be bound, so only allow the characters CRDB uses in them
+    SETTING_NAME_PATTERN = re.compile(r'^[a-z0-9_.]+$')
 
     @staticmethod
-    def find_all_cluster_settings(cluster_name: str) -> list[ClusterSetting]:
+    def find_all_cluster_settings(cluster_name: str, follower_read: bool = False) -> list[ClusterSetting]:
         SHOW_ALL_CLUSTER_SETTINGS_SQL = "SHOW CLUSTER SETTINGS"
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        response = connection.execute_sql(SHOW_ALL_CLUSTER_SETTINGS_SQL)
-        connection.close()
+        with CrdbConnectionManager.connection(cluster_name, follower_read=follower_read) as connection:
+            response = connection.execute_sql(SHOW_ALL_CLUSTER_SETTINGS_SQL, auto_commit=True)
         return list(map(lambda row: ClusterSetting(row, cluster_name), response))
     
     @staticmethod
-    def find_cluster_setting(cluster_name: str, setting_name: str) -> ClusterSetting:
-        SHOW_CLUSTER_SETTING_SQL = "SELECT * FROM [SHOW CLUSTER SETTINGS] where variable='{}';".format(setting_name)
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        response = connection.execute_sql(SHOW_CLUSTER_SETTING_SQL)
-        connection.close()
+    def find_cluster_setting(cluster_name: str, setting_name: str, follower_read: bool = False) -> ClusterSetting:
+        with CrdbConnectionManager.connection(cluster_name, follower_read=follower_read) as connection:
+            response = connection.execute_sql(ClusterSetting.SHOW_CLUSTER_SETTING_SQL, params=(setting_name,),
+                                              auto_commit=True)
         return ClusterSetting(response[0], cluster_name)
     
     def __init__(self, response, cluster_name: str):
@@ -50,19 +50,18 @@ class ClusterSetting:
         return self._response[3]
     
     def refresh(self):
-        SHOW_CLUSTER_SETTING_SQL = "SELECT * FROM [SHOW CLUSTER SETTINGS] where variable='{}';".format(self.variable)
-        connection = CrdbConnection.get_crdb_connection(self.cluster_name)
-        connection.connect()
-        response = connection.execute_sql(SHOW_CLUSTER_SETTING_SQL)
-        connection.close()
+        with CrdbConnectionManager.connection(self.cluster_name) as connection:
+            response = connection.execute_sql(self.SHOW_CLUSTER_SETTING_SQL, params=(self.variable,),
+                                              auto_commit=True)
         self._response = response[0]
 
     def set_value(self, value):
-        SET_CLUSTER_SETTING_SQL = "SET CLUSTER SETTING {} = '{}';".format(self.variable, value)
-        connection = CrdbConnection.get_crdb_connection(self.cluster_name)
-        connection.connect()
-        connection.execute_sql(SET_CLUSTER_SETTING_SQL, auto_commit=True, need_fetchall=False)
-        connection.close()
+        if not self.SETTING_NAME_PATTERN.match(self.variable):
+            raise ValueError("Invalid cluster setting name: {}".format(self.variable))
+        SET_CLUSTER_SETTING_SQL = "SET CLUSTER SETTING {} = %s;".format(self.variable)
+        with CrdbConnectionManager.connection(self.cluster_name) as connection:
+            connection.execute_sql(SET_CLUSTER_SETTING_SQL, params=(str(value),), auto_commit=True,
+                                   need_fetchall=False)
         self.refresh()
         
     def compare_value_with(self, other_value: str) -> int:
@@ -1,17 +1,19 @@
 from __future__ import annotations
-from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
+from contextlib import closing
 from storage_workflows.crdb.models.jobs.base_job import BaseJob
 
 class BackupJob(BaseJob):
 
+    @staticmethod
+    def iter_backup_jobs(cluster_name):
+        with closing(BaseJob.iter_jobs_by_type(cluster_name, 'BACKUP')) as jobs:
+            for job in jobs:
+                yield BackupJob(job, cluster_name)
+
     @staticmethod
     def find_all_backup_jobs(cluster_name) -> list[BackupJob]:
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        response = connection.execute_sql(BaseJob.FIND_ALL_JOBS_BY_TYPE_SQL.format('BACKUP'),
-                                          need_connection_close=False, need_commit=False, auto_commit=True)
-        connection.close()
-        return list(map(lambda job: BackupJob(job, cluster_name), response))
+        with closing(BackupJob.iter_backup_jobs(cluster_name)) as jobs:
+            return list(jobs)
 
     def __init__(self, response, cluster_name):
         super().__init__(response[0], response[1], response[2], cluster_name)
@@ -1,16 +1,29 @@
-from functools import cached_property
-from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
+from contextlib import closing
+from storage_workflows.crdb.connect.crdb_connection_manager import CrdbConnectionManager
 
 
 class BaseJob:
+    # streamed with follower_read=True, which applies AS OF SYSTEM TIME to the whole transaction
     FIND_ALL_JOBS_BY_TYPE_SQL = ("SELECT job_id, job_type, status "
-                                 "from crdb_internal.jobs AS OF SYSTEM TIME FOLLOWER_READ_TIMESTAMP() "
-                                 "WHERE job_type = '{}' AND ((job_type IS NULL) OR ((job_type NOT IN ('AUTO CREATE STATS', "
+                                 "from crdb_internal.jobs "
+                                 "WHERE job_type = %s AND ((job_type IS NULL) OR ((job_type NOT IN ('AUTO CREATE STATS', "
                                  "'AUTO SCHEMA TELEMETRY', 'AUTO SPAN CONFIG RECONCILIATION', 'AUTO SQL STATS COMPACTION')) "
                                  "AND ((finished IS NULL) OR (finished > NOW() - INTERVAL '12h' ))));")
-    PAUSE_JOB_BY_ID_SQL = "PAUSE JOB {};"
-    RESUME_JOB_BY_ID_SQL = "RESUME JOB {};"
-    GET_JOB_BY_ID_SQL = "SELECT job_id, job_type, status FROM crdb_internal.jobs AS OF SYSTEM TIME FOLLOWER_READ_TIMESTAMP() WHERE job_id='{}';"
+    PAUSE_JOB_BY_ID_SQL = "PAUSE JOB %s;"
+    RESUME_JOB_BY_ID_SQL = "RESUME JOB %s;"
+    # polled right after PAUSE/RESUME, so it reads the current status instead of a follower read
+    GET_JOB_BY_ID_SQL = "SELECT job_id, job_type, status FROM crdb_internal.jobs WHERE job_id = %s;"
+
+    @staticmethod
+    def iter_jobs_by_type(cluster_name, job_type, statement_timeout: float = None):
+        """
+        Yields the job rows of one type as they are streamed. The pooled connection stays checked out until
+        the generator is exhausted or closed, so callers stopping early should close it (contextlib.closing).
+        """
+        with CrdbConnectionManager.connection(cluster_name) as connection:
+            with closing(connection.stream_sql(BaseJob.FIND_ALL_JOBS_BY_TYPE_SQL, params=(job_type,),
+                                               follower_read=True, statement_timeout=statement_timeout)) as jobs:
+                yield from jobs
 
     def __init__(self, job_id, job_type, status, cluster_name):
         self._job_id = job_id
@@ -33,9 +46,3 @@ class BaseJob:
     @property
     def status(self):
         return self._status
-
-    @cached_property
-    def connection(self):
-        connection = CrdbConnection.get_crdb_connection(self.cluster_name)
-        connection.connect()
-        return connection
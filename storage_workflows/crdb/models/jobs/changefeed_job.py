@@ -1,5 +1,6 @@
 from __future__ import annotations
-from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
+from contextlib import closing
+from storage_workflows.crdb.connect.crdb_connection_manager import CrdbConnectionManager
 from storage_workflows.crdb.models.jobs.base_job import BaseJob
 from storage_workflows.logging.logger import Logger
 from storage_workflows.crdb.metadata_db.metadata_db_operations import MetadataDBOperations
@@ -14,13 +15,13 @@ logger = Logger()
 
 class ChangefeedJob(BaseJob):
 
-    REMOVE_COORDINATOR_BY_JOB_ID_SQL = "UPDATE system.jobs SET claim_session_id = NULL WHERE id = '{}';"
-    GET_COORDINATOR_BY_JOB_ID_SQL = "SELECT coordinator_id from crdb_internal.jobs WHERE job_id = '{}';"
+    REMOVE_COORDINATOR_BY_JOB_ID_SQL = "UPDATE system.jobs SET claim_session_id = NULL WHERE id = %s;"
+    GET_COORDINATOR_BY_JOB_ID_SQL = "SELECT coordinator_id from crdb_internal.jobs WHERE job_id = %s;"
     GET_CHANGEFEED_METADATA = ("SELECT status, running_status, error, (((high_water_timestamp/1e9)::INT)-NOW()::INT) AS "
-                               "latency, CASE WHEN description like '%initial_scan = ''only''%' then TRUE ELSE FALSE "
+                               "latency, CASE WHEN description like '%%initial_scan = ''only''%%' then TRUE ELSE FALSE "
                                "END AS is_initial_scan_only, (finished::INT-now()::INT) as finished_ago_seconds, "
                                "description, high_water_timestamp FROM crdb_internal.jobs AS OF SYSTEM TIME "
-                               "FOLLOWER_READ_TIMESTAMP() WHERE job_type = 'CHANGEFEED' AND job_id = '{}';")
+                               "FOLLOWER_READ_TIMESTAMP() WHERE job_type = 'CHANGEFEED' AND job_id = %s;")
     PAUSE_REQUESTED = "pause-requested"
     RUNNING = "running"
     FAILED = "failed"
@@ -29,23 +30,26 @@ class ChangefeedJob(BaseJob):
     UNEXPECTED_STATUSES = [FAILED, CANCELED]
 
     @staticmethod
-    def find_all_changefeed_jobs(cluster_name) -> list[ChangefeedJob]:
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        response = connection.execute_sql(BaseJob.FIND_ALL_JOBS_BY_TYPE_SQL.format('CHANGEFEED'),
-                                          need_connection_close=False, need_commit=False, auto_commit=True)
-        connection.close()
-        logger.info(f"Returning {len(response)} job(s) from find_all_changefeed_jobs method.")
-        return list(map(lambda job: ChangefeedJob(job, cluster_name), response))
+    def iter_changefeed_jobs(cluster_name, statement_timeout: float = None):
+        with closing(BaseJob.iter_jobs_by_type(cluster_name, 'CHANGEFEED', statement_timeout)) as jobs:
+            for job in jobs:
+                yield ChangefeedJob(job, cluster_name)
+
+    @staticmethod
+    def find_all_changefeed_jobs(cluster_name, statement_timeout: float = None) -> list[ChangefeedJob]:
+        with closing(ChangefeedJob.iter_changefeed_jobs(cluster_name, statement_timeout)) as jobs:
+            changefeed_jobs = list(jobs)
+        logger.info(f"Returning {len(changefeed_jobs)} job(s) from find_all_changefeed_jobs method.")
+        return changefeed_jobs
 
     # todo: https://doordash.atlassian.net/browse/STORAGE-7195
     @staticmethod
     def get_latest_job_status(job_id, cluster_name):
-        connection = CrdbConnection.get_crdb_connection(cluster_name)
-        connection.connect()
-        response = connection.execute_sql(BaseJob.GET_JOB_BY_ID_SQL.format(job_id),
-                                          need_connection_close=False, need_commit=False, auto_commit=True)
-        connection.close()
+        with CrdbConnectionManager.connection(cluster_name) as connection:
+            # polled by wait_for_job_to_pause/resume, so it is prepared once per session
+            response = connection.execute_sql(BaseJob.GET_JOB_BY_ID_SQL, params=(job_id,),
+                                              need_connection_close=False, need_commit=False, auto_commit=True,
+                                              prepare=True)
         # Logging each item in the response
         for index, item in enumerate(response):
             logger.info("Item at index {}: {}".format(index, item))
@@ -123,25 +127,37 @@ class ChangefeedJob(BaseJob):
 
     @property
     def changefeed_metadata(self):
-       changefeed_metadata_response = self.connection.execute_sql(self.GET_CHANGEFEED_METADATA.format(self.id),
-                                   need_commit=False, need_fetchone=True, need_connection_close=False, auto_commit=True)
-       return ChangefeedJob.ChangefeedJobInternalStatus(changefeed_metadata_response)
-    
+        return self.get_changefeed_metadata()
+
+    def get_changefeed_metadata(self, statement_timeout: float = None):
+        with CrdbConnectionManager.connection(self.cluster_name) as connection:
+            changefeed_metadata_response = connection.execute_sql(self.GET_CHANGEFEED_METADATA, params=(self.id,),
+                                                                  need_commit=False, need_fetchone=True,
+                                                                  need_connection_close=False, auto_commit=True,
+                                                                  statement_timeout=statement_timeout)
+        return ChangefeedJob.ChangefeedJobInternalStatus(changefeed_metadata_response)
+
     def pause(self):
-        self.connection.execute_sql(self.PAUSE_JOB_BY_ID_SQL.format(self.id),
-                                    need_commit=True, need_connection_close=False, auto_commit=True)
+        with CrdbConnectionManager.connection(self.cluster_name) as connection:
+            connection.execute_sql(self.PAUSE_JOB_BY_ID_SQL, params=(self.id,),
+                                   need_commit=True, need_connection_close=False, auto_commit=True)
 
     def resume(self):
-        self.connection.execute_sql(self.RESUME_JOB_BY_ID_SQL.format(self.id),
-                                    need_commit=True, need_connection_close=False, auto_commit=True)
+        with CrdbConnectionManager.connection(self.cluster_name) as connection:
+            connection.execute_sql(self.RESUME_JOB_BY_ID_SQL, params=(self.id,),
+                                   need_commit=True, need_connection_close=False, auto_commit=True)
 
     def remove_coordinator_node(self):
-        self.connection.execute_sql(self.REMOVE_COORDINATOR_BY_JOB_ID_SQL.format(self.id),
-                                    need_commit=True, need_connection_close=False, auto_commit=True)
+        with CrdbConnectionManager.connection(self.cluster_name) as connection:
+            connection.execute_sql(self.REMOVE_COORDINATOR_BY_JOB_ID_SQL, params=(self.id,),
+                                   need_commit=True, need_connection_close=False, auto_commit=True)
 
     def get_coordinator_node(self):
-        return self.connection.execute_sql(self.GET_COORDINATOR_BY_JOB_ID_SQL.format(self.id),
-                                    need_commit=False, need_fetchone=True, need_connection_close=False, auto_commit=True)[0]
+        with CrdbConnectionManager.connection(self.cluster_name) as connection:
+            # polled while moving the coordinator off old nodes
+            return connection.execute_sql(self.GET_COORDINATOR_BY_JOB_ID_SQL, params=(self.id,),
+                                          need_commit=False, need_fetchone=True, need_connection_close=False,
+                                          auto_commit=True, prepare=True)[0]
 
     def wait_for_job_to_pause(self, timeout=300, interval=2):
         start_time = time.time()
@@ -1,10 +1,11 @@
 import os
 import subprocess
 import datetime
-from functools import cached_property, reduce
+from functools import cached_property
 from storage_workflows.crdb.api_gateway.crdb_api_gateway import CrdbApiGateway
 from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
 from storage_workflows.crdb.connect.ssh import SSH
+from storage_workflows.crdb.models.node_store_snapshot import NodeStoreSnapshot
 from storage_workflows.logging.logger import Logger
 
 logger = Logger()
@@ -15,7 +16,7 @@ class Node:
 
     @staticmethod
     def get_nodes():
-        session = CrdbApiGateway.login()
+        session = CrdbApiGateway.session_token()
         return list(map(lambda node: Node(node), CrdbApiGateway.list_nodes(session)['nodes']))
 
     @staticmethod
@@ -54,6 +55,7 @@ class Node:
 
     def __init__(self, api_response):
         self.api_response = api_response
+        self._store_snapshot = None
 
     @cached_property
     def instance_id(self):
@@ -91,35 +93,38 @@ class Node:
     def sql_conns(self):
         return int(self.api_response['metrics']['sql.conns'])
 
+    @property
+    def store_snapshot(self) -> NodeStoreSnapshot:
+        """
+        Store metrics of the node, fetched on first read and kept until refresh_store_snapshot() or reload(),
+        so the properties below read from one fetch.
+        """
+        if self._store_snapshot is None:
+            self._store_snapshot = NodeStoreSnapshot(self.id)
+        return self._store_snapshot
+
+    def refresh_store_snapshot(self) -> NodeStoreSnapshot:
+        return self.store_snapshot.refresh()
+
     @property
     def replicas(self):
-        stores = CrdbApiGateway.get_node_details_from_endpoint(CrdbApiGateway.login(), self.id)['storeStatuses']
-        replicas_list = map(lambda store: int(store['metrics']['replicas']), stores)
-        return reduce(lambda replica_count_1, replica_count_2: replica_count_1 + replica_count_2, replicas_list)
+        return self.store_snapshot.replicas
 
     @property
     def overreplicated_ranges(self):
-        stores = CrdbApiGateway.get_node_details_from_endpoint(CrdbApiGateway.login(), self.id)['storeStatuses']
-        ranges_list = map(lambda store: int(store['metrics']['ranges.overreplicated']), stores)
-        return reduce(lambda range_count_1, range_count_2: range_count_1 + range_count_2, ranges_list)
+        return self.store_snapshot.overreplicated_ranges
 
     @property
     def unavailable_ranges(self):
-        stores = CrdbApiGateway.get_node_details_from_endpoint(CrdbApiGateway.login(), self.id)['storeStatuses']
-        ranges_list = map(lambda store: int(store['metrics']['ranges.unavailable']), stores)
-        return reduce(lambda range_count_1, range_count_2: range_count_1 + range_count_2, ranges_list)
+        return self.store_snapshot.unavailable_ranges
 
     @property
     def underreplicated_ranges(self):
-        stores = CrdbApiGateway.get_node_details_from_endpoint(CrdbApiGateway.login(), self.id)['storeStatuses']
-        ranges_list = map(lambda store: int(store['metrics']['ranges.underreplicated']), stores)
-        return reduce(lambda range_count_1, range_count_2: range_count_1 + range_count_2, ranges_list)
+        return self.store_snapshot.underreplicated_ranges
 
     @property
     def applied_initial_snapshots(self):
-        stores = CrdbApiGateway.get_node_details_from_endpoint(CrdbApiGateway.login(), self.id)['storeStatuses']
-        snapshots_list = map(lambda store: int(store['metrics']['range.snapshots.applied-initial']), stores)
-        return reduce(lambda range_count_1, range_count_2: range_count_1 + range_count_2, snapshots_list)
+        return self.store_snapshot.applied_initial_snapshots
 
     @cached_property
     def ssh_client(self):
@@ -127,6 +132,7 @@ class Node:
 
     def reload(self):
         self.api_response = list(filter(lambda node: node.id == self.id, Node.get_nodes()))[0].api_response
+        self._store_snapshot = None
 
     def drain(self):
         certs_dir = os.getenv('CRDB_CERTS_DIR_PATH_PREFIX') + "/" + self.cluster_name + "/"
@@ -0,0 +1,68 @@
+from __future__ import annotations
+from storage_workflows.crdb.models.node import Node
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
+
+
+class NodeSet:
+    """
+    Nodes of the cluster from a single node listing, indexed by node id and by IP address.
+    reload() refreshes every member with one more listing instead of one per node.
+
+    Usage:
+        old_nodes = NodeSet.fetch().subset_for_ip_addresses(old_instance_ips)
+        old_nodes.reload()
+    """
+
+    @staticmethod
+    def fetch() -> NodeSet:
+        return NodeSet(Node.get_nodes())
+
+    def __init__(self, nodes: list[Node]):
+        self._nodes = list(nodes)
+        self._index()
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    @property
+    def nodes(self) -> list[Node]:
+        return list(self._nodes)
+
+    def by_id(self, node_id) -> Node | None:
+        return self._nodes_by_id.get(node_id)
+
+    def by_ip_address(self, ip_address: str) -> Node | None:
+        return self._nodes_by_ip_address.get(ip_address)
+
+    def for_ip_addresses(self, ip_addresses) -> list[Node]:
+        """Nodes listening on the ip addresses, in the same order. Raises IndexError for an unknown address."""
+        nodes = []
+        for ip_address in ip_addresses:
+            node = self.by_ip_address(ip_address)
+            if node is None:
+                raise IndexError("No crdb node found with ip address {}.".format(ip_address))
+            nodes.append(node)
+        return nodes
+
+    def subset_for_ip_addresses(self, ip_addresses) -> NodeSet:
+        return NodeSet(self.for_ip_addresses(ip_addresses))
+
+    def reload(self):
+        """Refreshes the api response of every member from one node listing."""
+        latest_nodes_by_id = {node.id: node for node in Node.get_nodes()}
+        for node in self._nodes:
+            latest_node = latest_nodes_by_id.get(node.id)
+            if latest_node is None:
+                logger.warning("Node {} is no longer listed, keeping its last known state.".format(node.id))
+                continue
+            node.api_response = latest_node.api_response
+        self._index()
+
+    def _index(self):
+        self._nodes_by_id = {node.id: node for node in self._nodes}
+        self._nodes_by_ip_address = {node.ip_address: node for node in self._nodes}
@@ -0,0 +1,89 @@
+from storage_workflows.crdb.api_gateway.crdb_api_gateway import CrdbApiGateway
+
+
+class NodeStoreSnapshot:
+    """
+    Store metrics of one node, summed over its stores from a single /_status/nodes/{id} fetch.
+    The fetch happens on first read and again on every refresh().
+    """
+
+    # attribute -> store metric summed into it
+    METRICS = {
+        'replicas': 'replicas',
+        'overreplicated_ranges': 'ranges.overreplicated',
+        'unavailable_ranges': 'ranges.unavailable',
+        'underreplicated_ranges': 'ranges.underreplicated',
+        'applied_initial_snapshots': 'range.snapshots.applied-initial',
+    }
+
+    @staticmethod
+    def fetch_all() -> dict:
+        """Returns node id -> snapshot for every node of the cluster, from a single /_status/nodes request."""
+        node_details = CrdbApiGateway.get_all_node_details(CrdbApiGateway.session_token())
+        if not node_details:
+            raise Exception("Failed to retrieve node details of the cluster.")
+        snapshots = {}
+        for node in node_details.get('nodes', []):
+            snapshot = NodeStoreSnapshot(node['desc']['nodeId'])
+            snapshot._load(node.get('storeStatuses', []))
+            snapshots[snapshot.node_id] = snapshot
+        return snapshots
+
+    @staticmethod
+    def refresh_all(snapshots: list) -> list:
+        """
+        Refreshes the snapshots with concurrent per-node requests. Snapshots of nodes that didn't answer keep
+        their previous totals; their node ids are returned.
+        """
+        snapshots = {snapshot.node_id: snapshot for snapshot in snapshots}
+        node_details, failed_node_ids = CrdbApiGateway.collect_node_details(CrdbApiGateway.session_token(),
+                                                                            list(snapshots))
+        for node_id, details in node_details.items():
+            snapshots[node_id]._load(details.get('storeStatuses', []))
+        return failed_node_ids
+
+    def __init__(self, node_id):
+        self._node_id = node_id
+        self._totals = None
+
+    @property
+    def node_id(self):
+        return self._node_id
+
+    def refresh(self):
+        stores = CrdbApiGateway.get_node_details_from_endpoint(CrdbApiGateway.session_token(),
+                                                               self._node_id)['storeStatuses']
+        self._load(stores)
+        return self
+
+    def _load(self, stores):
+        totals = dict.fromkeys(NodeStoreSnapshot.METRICS, 0)
+        for store in stores:
+            for attribute, metric in NodeStoreSnapshot.METRICS.items():
+                totals[attribute] += int(store['metrics'][metric])
+        self._totals = totals
+
+    @property
+    def replicas(self):
+        return self._total('replicas')
+
+    @property
+    def overreplicated_ranges(self):
+        return self._total('overreplicated_ranges')
+
+    @property
+    def unavailable_ranges(self):
+        return self._total('unavailable_ranges')
+
+    @property
+    def underreplicated_ranges(self):
+        return self._total('underreplicated_ranges')
+
+    @property
+    def applied_initial_snapshots(self):
+        return self._total('applied_initial_snapshots')
+
+    def _total(self, attribute):
+        if self._totals is None:
+            self.refresh()
+        return self._totals[attribute]
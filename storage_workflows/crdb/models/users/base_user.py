@@ -1,5 +1,8 @@
 from functools import cached_property
-from storage_workflows.crdb.connect.crdb_connection import CrdbConnection
+from storage_workflows.crdb.connect.crdb_connection_manager import CrdbConnectionManager
+from storage_workflows.logging.logger import Logger
+
+logger = Logger()
 
 class BaseUser:
 
@@ -36,8 +39,16 @@ class BaseUser:
         return self._user_creation_sql_statements
 
     def create_user(self):
-        connection = CrdbConnection.get_crdb_connection(self.cluster_name)
-        connection.connect()
-        for statement in self.user_creation_sql_statements:
-            connection.execute_sql(statement, need_connection_close=False, need_commit=False, auto_commit=True)
-        connection.close()
+        # borrow a connection scoped to the user's database since the statements switch to it with USE
+        with CrdbConnectionManager.connection(self.cluster_name, self.db_name) as connection:
+            try:
+                results = connection.execute_batch(self.user_creation_sql_statements)
+            finally:
+                # USE changed the database of the pooled session
+                connection.reset_database()
+        # execute_batch stops at the first failing statement, which is the last result
+        if results and not results[-1].succeeded:
+            # statements may carry passwords, so only their position is logged
+            logger.error("Statement {} of {} failed while creating user {}: {}".format(
+                len(results), len(self.user_creation_sql_statements), self.user_name, results[-1].error))
+            raise results[-1].error
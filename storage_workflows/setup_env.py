@@ -1,5 +1,6 @@
 import os
 from storage_workflows.crdb.aws.sts_role import StsRole
+from storage_workflows.crdb.factory.aws_session_factory import AwsSessionFactory
 
 
 def setup_env(deployment_env, region, cluster_name=""):
@@ -13,9 +14,11 @@ def setup_env(deployment_env, region, cluster_name=""):
     os.environ['CLUSTER_NAME'] = cluster_name
     os.environ['REGION'] = region
     os.environ['DEPLOYMENT_ENV'] = deployment_env
-    role = StsRole.assume_role()
-    os.environ['AWS_ACCESS_KEY_ID'] = role.access_key_id
-    os.environ['AWS_SECRET_ACCESS_KEY'] = role.secret_access_key
-    os.environ['AWS_SESSION_TOKEN'] = role.session_token
+    assume_role()
 
 
+def assume_role():
+    role = StsRole.assume_role()
+    # the role credentials live in the AWS session, os.environ keeps the process' own credentials
+    AwsSessionFactory.set_credentials(role.access_key_id, role.secret_access_key, role.session_token,
+                                      expiration=role.expiration, identity=role.arn, refresher=assume_role)
@@ -0,0 +1,40 @@
+from storage_workflows.crdb.api_gateway.auto_scaling_group_gateway import AutoScalingGroupGateway
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+
+class TestAutoScalingGroupGateway(TestCase):
+
+    @staticmethod
+    def _activity(activity_id, status_code):
+        return {'ActivityId': activity_id, 'Description': 'Detaching ' + activity_id, 'StatusCode': status_code}
+
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.time.sleep')
+    def test_wait_for_activity_completion_polls_pending_activities_together(self, sleep):
+        client = MagicMock()
+        client.describe_scaling_activities.side_effect = [
+            {'Activities': [self._activity('a-1', 'Successful'), self._activity('a-2', 'InProgress')]},
+            {'Activities': [dict(self._activity('a-2', 'Failed'), StatusMessage='Instance not found')]}]
+
+        result = AutoScalingGroupGateway.wait_for_activity_completion(
+            [self._activity('a-1', 'InProgress'), self._activity('a-2', 'InProgress'),
+             self._activity('a-3', 'Successful')], client)
+
+        self.assertEqual(client.describe_scaling_activities.call_args_list[0].kwargs, {'ActivityIds': ['a-1', 'a-2']})
+        self.assertEqual(client.describe_scaling_activities.call_args_list[1].kwargs, {'ActivityIds': ['a-2']})
+        self.assertEqual({activity_id: activity['StatusCode'] for activity_id, activity in result.items()},
+                         {'a-1': 'Successful', 'a-2': 'Failed', 'a-3': 'Successful'})
+        self.assertTrue(all(call.args[0] <= AutoScalingGroupGateway.ACTIVITY_MAX_POLL_INTERVAL_SECONDS
+                            for call in sleep.call_args_list))
+
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.time.sleep')
+    def test_wait_for_activity_completion_times_out(self, sleep):
+        client = MagicMock()
+        client.describe_scaling_activities.return_value = {'Activities': [self._activity('a-1', 'InProgress')]}
+
+        with patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.time.monotonic',
+                   side_effect=[0, 1, 100]):
+            with self.assertRaises(TimeoutError):
+                AutoScalingGroupGateway.wait_for_activity_completion([self._activity('a-1', 'InProgress')], client,
+                                                                     timeout_seconds=10)
+        client.describe_scaling_activities.assert_called_once()
@@ -0,0 +1,56 @@
+from storage_workflows.crdb.api_gateway.crdb_api_gateway import CrdbApiGateway
+from storage_workflows.crdb.api_gateway.crdb_api_session_manager import CrdbApiSessionManager
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+
+class TestCrdbApiGateway(TestCase):
+
+    @staticmethod
+    def _response(status_code, payload):
+        response = MagicMock(status_code=status_code, text=str(payload))
+        response.json.return_value = payload
+        return response
+
+    def setUp(self):
+        patcher = patch.dict('os.environ', {'CLUSTER_NAME': 'ao_test', 'DEPLOYMENT_ENV': 'prod',
+                                            'ROOT_PASSWORD': 'secret'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.http_session = MagicMock()
+        patcher = patch.object(CrdbApiSessionManager, 'http_session', return_value=self.http_session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(CrdbApiSessionManager.invalidate)
+
+    def test_session_token_logs_in_once_per_cluster(self):
+        self.http_session.post.return_value = self._response(200, {'session': 'token-1'})
+
+        self.assertEqual(CrdbApiGateway.session_token(), 'token-1')
+        self.assertEqual(CrdbApiGateway.session_token(), 'token-1')
+        self.http_session.post.assert_called_once()
+
+    def test_unauthorized_response_logs_in_again(self):
+        self.http_session.post.side_effect = [self._response(200, {'session': 'token-1'}),
+                                              self._response(200, {'session': 'token-2'})]
+        self.http_session.get.side_effect = [self._response(401, ''),
+                                             self._response(200, {'storeStatuses': []})]
+
+        details = CrdbApiGateway.get_node_details_from_endpoint(CrdbApiGateway.session_token(), '1')
+
+        self.assertEqual(details, {'storeStatuses': []})
+        self.assertEqual(self.http_session.get.call_args.kwargs['cookies'].get('session'), 'token-2')
+        self.assertEqual(CrdbApiGateway.session_token(), 'token-2')
+
+    def test_collect_node_details_reports_nodes_without_response(self):
+        def get(url, **kwargs):
+            if url.endswith('/2'):
+                raise ConnectionError('connection reset')
+            return self._response(200, {'desc': {'nodeId': int(url.rsplit('/', 1)[1])}})
+        self.http_session.get.side_effect = get
+
+        responses, failed_node_ids = CrdbApiGateway.collect_node_details('token', [1, 2, 3], retries=0)
+
+        self.assertEqual(sorted(responses), [1, 3])
+        self.assertEqual(failed_node_ids, [2])
+        self.assertEqual(self.http_session.get.call_args.kwargs['timeout'], CrdbApiGateway.REQUEST_TIMEOUT_SECONDS)
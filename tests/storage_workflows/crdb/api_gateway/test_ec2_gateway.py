@@ -0,0 +1,67 @@
+from botocore.exceptions import ClientError
+from storage_workflows.crdb.api_gateway.ec2_gateway import Ec2Gateway
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestEc2Gateway(TestCase):
+
+    def setUp(self):
+        self.pages = [{'Reservations': [{'Instances': [{'InstanceId': 'i-1'}, {'InstanceId': 'i-2'}]}]},
+                      {'Reservations': [{'Instances': [{'InstanceId': 'i-3'}]}]}]
+        self.fetched_pages = []
+
+        def paginate(**kwargs):
+            for page in self.pages:
+                self.fetched_pages.append(page)
+                yield page
+
+        patcher = patch('storage_workflows.crdb.factory.aws_session_factory.AwsSessionFactory.ec2')
+        ec2 = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ec2_client = ec2.return_value
+        self.paginator = self.ec2_client.get_paginator.return_value
+        self.paginator.paginate.side_effect = paginate
+
+    def test_describe_ec2_instances_returns_every_instance_of_every_reservation(self):
+        instances = Ec2Gateway.describe_ec2_instances([])
+        self.assertEqual([instance['InstanceId'] for instance in instances], ['i-1', 'i-2', 'i-3'])
+        self.assertEqual(self.paginator.paginate.call_args.kwargs['PaginationConfig'],
+                         {'PageSize': Ec2Gateway.PAGINATOR_MAX_RESULT_PER_PAGE})
+
+    def test_find_first_ec2_instance_stops_at_the_matching_page(self):
+        instance = Ec2Gateway.find_first_ec2_instance([], lambda instance: instance['InstanceId'] == 'i-2')
+        self.assertEqual(instance['InstanceId'], 'i-2')
+        self.assertEqual(len(self.fetched_pages), 1)
+
+    def test_find_first_ec2_instance_returns_none_without_match(self):
+        self.assertIsNone(Ec2Gateway.find_first_ec2_instance([], lambda instance: instance['InstanceId'] == 'i-4'))
+
+    def test_describe_ec2_instances_by_ids_queries_in_chunks(self):
+        instance_ids = ['i-{}'.format(index) for index in range(Ec2Gateway.DESCRIBE_MAX_INSTANCE_IDS_PER_CALL + 1)]
+        instances = Ec2Gateway.describe_ec2_instances_by_ids(instance_ids + ['i-1'])
+        chunk_sizes = [len(call.kwargs['InstanceIds']) for call in self.paginator.paginate.call_args_list]
+        self.assertEqual(chunk_sizes, [Ec2Gateway.DESCRIBE_MAX_INSTANCE_IDS_PER_CALL, 1])
+        self.assertNotIn('PaginationConfig', self.paginator.paginate.call_args.kwargs)
+        self.assertEqual(instances['i-2'], {'InstanceId': 'i-2'})
+
+    def test_describe_ec2_instances_by_ids_filters_when_an_id_is_gone(self):
+        def paginate(**kwargs):
+            if 'InstanceIds' in kwargs:
+                raise ClientError({'Error': {'Code': 'InvalidInstanceID.NotFound'}}, 'DescribeInstances')
+            return iter(self.pages)
+
+        self.paginator.paginate.side_effect = paginate
+        instance_ids = ['i-{}'.format(index) for index in range(1, Ec2Gateway.FILTER_MAX_VALUES + 2)]
+        instances = Ec2Gateway.describe_ec2_instances_by_ids(instance_ids)
+        self.assertEqual(sorted(instances), ['i-1', 'i-2', 'i-3'])
+        filter_sizes = [len(call.kwargs['Filters'][0]['Values']) for call in self.paginator.paginate.call_args_list
+                        if 'Filters' in call.kwargs]
+        self.assertEqual(filter_sizes, [Ec2Gateway.FILTER_MAX_VALUES, 1])
+
+    def test_wait_for_instances_terminated_waits_for_all_ids_together(self):
+        Ec2Gateway.wait_for_instances_terminated(['i-1', 'i-2', 'i-3'])
+        self.ec2_client.get_waiter.assert_called_once_with('instance_terminated')
+        waiter = self.ec2_client.get_waiter.return_value
+        waiter.wait.assert_called_once()
+        self.assertEqual(waiter.wait.call_args.kwargs['InstanceIds'], ['i-1', 'i-2', 'i-3'])
@@ -0,0 +1,27 @@
+from botocore.exceptions import ClientError
+from storage_workflows.crdb.api_gateway.secret_manager_gateway import SecretManagerGateway
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestSecretManagerGateway(TestCase):
+
+    @patch('storage_workflows.crdb.factory.aws_session_factory.AwsSessionFactory.secret_manager')
+    def test_batch_find_secrets_falls_back_when_batch_get_is_denied(self, secret_manager):
+        client = secret_manager.return_value
+        client.batch_get_secret_value.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDeniedException', 'Message': 'denied'}}, 'BatchGetSecretValue')
+        client.get_secret_value.side_effect = lambda SecretId: {'ARN': SecretId, 'SecretString': SecretId + '_value'}
+
+        secret_values = SecretManagerGateway.batch_find_secrets(['ca_arn', 'public_arn'])
+
+        self.assertEqual(secret_values['public_arn']['SecretString'], 'public_arn_value')
+        self.assertEqual(client.get_secret_value.call_count, 2)
+
+    @patch('storage_workflows.crdb.factory.aws_session_factory.AwsSessionFactory.secret_manager')
+    def test_batch_find_secrets_raises_other_errors(self, secret_manager):
+        secret_manager.return_value.batch_get_secret_value.side_effect = ClientError(
+            {'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}}, 'BatchGetSecretValue')
+
+        with self.assertRaises(ClientError):
+            SecretManagerGateway.batch_find_secrets(['ca_arn'])
@@ -0,0 +1,30 @@
+from storage_workflows.crdb.aws.auto_scaling_group import AutoScalingGroup
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestAutoScalingGroup(TestCase):
+
+    @staticmethod
+    def _asg(desired_capacity, *instances):
+        return {'AutoScalingGroupName': 'asg', 'DesiredCapacity': desired_capacity,
+                'Instances': [{'InstanceId': instance_id, 'LifecycleState': state} for instance_id, state in instances]}
+
+    @patch('storage_workflows.crdb.aws.auto_scaling_group.InstanceReadinessTracker')
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.AutoScalingGroupGateway.update_auto_scaling_group_capacity')
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.AutoScalingGroupGateway.describe_auto_scaling_groups_by_name')
+    def test_add_ec2_instances_expects_instances_beyond_those_counting_toward_capacity(
+            self, describe_asg, update_capacity, tracker):
+        describe_asg.return_value = [self._asg(3, ('i-1', 'InService'), ('i-2', 'Standby'), ('i-3', 'Standby'))]
+        asg = AutoScalingGroup(self._asg(3))
+        asg.add_ec2_instances(4, autoscale=True, deployment_env='staging')
+        update_capacity.assert_called_once_with('asg', 4)
+        self.assertEqual(tracker.call_args.args, ('asg', {'i-1', 'i-2', 'i-3'}, 3))
+
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.AutoScalingGroupGateway.update_auto_scaling_group_capacity')
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.AutoScalingGroupGateway.describe_auto_scaling_groups_by_name')
+    def test_add_ec2_instances_returns_no_instances_when_none_are_launched(self, describe_asg, update_capacity):
+        describe_asg.return_value = [self._asg(2, ('i-1', 'InService'), ('i-2', 'Pending'))]
+        asg = AutoScalingGroup(self._asg(2))
+        self.assertEqual(asg.add_ec2_instances(2, autoscale=True, deployment_env='staging'), [])
+        update_capacity.assert_not_called()
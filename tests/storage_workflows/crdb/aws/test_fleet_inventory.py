@@ -0,0 +1,49 @@
+from storage_workflows.crdb.aws.fleet_inventory import FleetInventory
+from unittest import TestCase
+from unittest.mock import patch, DEFAULT
+
+
+class TestFleetInventory(TestCase):
+
+    @staticmethod
+    def _tags(cluster_name):
+        return [{'Key': 'crdb_cluster_name', 'Value': cluster_name + '_prod'}]
+
+    @patch('storage_workflows.crdb.api_gateway.elastic_load_balancer_gateway.ElasticLoadBalancerGateway.iter_load_balancers')
+    @patch('storage_workflows.crdb.api_gateway.ebs_gateway.EBSGateway.get_ebs_volumes_for_instances')
+    @patch('storage_workflows.crdb.api_gateway.ec2_gateway.Ec2Gateway.iter_ec2_instances')
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.AutoScalingGroupGateway.iter_auto_scaling_groups')
+    def test_build_indexes_resources_by_cluster_name(self, iter_auto_scaling_groups, iter_ec2_instances,
+                                                      get_ebs_volumes_for_instances, iter_load_balancers):
+        iter_auto_scaling_groups.return_value = iter([
+            {'AutoScalingGroupName': 'ao_test_prod-asg', 'Tags': self._tags('ao_test')},
+            {'AutoScalingGroupName': 'url_shortener_prod-asg', 'Tags': self._tags('url_shortener')}])
+        iter_ec2_instances.return_value = iter([
+            {'InstanceId': 'i-1', 'State': {'Name': 'running'}, 'Tags': self._tags('ao_test')},
+            {'InstanceId': 'i-2', 'State': {'Name': 'terminated'}, 'Tags': self._tags('ao_test')}])
+        get_ebs_volumes_for_instances.return_value = {'i-1': ['volume']}
+        iter_load_balancers.return_value = iter([{'LoadBalancerName': 'ao-test-crdb-etl'},
+                                                 {'LoadBalancerName': 'unrelated'}])
+
+        inventory = FleetInventory.build('prod')
+
+        self.assertEqual(inventory.cluster_names, ['ao_test', 'url_shortener'])
+        self.assertEqual(inventory.auto_scaling_group('ao_test').name, 'ao_test_prod-asg')
+        self.assertEqual([instance.instance_id for instance in inventory.ec2_instances('ao_test')], ['i-1', 'i-2'])
+        self.assertEqual(inventory.ec2_instances('url_shortener'), [])
+        get_ebs_volumes_for_instances.assert_called_once_with(['i-1'])
+        self.assertEqual(inventory.ebs_volumes('i-1'), ['volume'])
+        self.assertEqual(inventory.etl_load_balancer('ao_test').load_balancer_name, 'ao-test-crdb-etl')
+        self.assertIsNone(inventory.etl_load_balancer('url_shortener'))
+
+    @patch('storage_workflows.crdb.aws.fleet_inventory.time.time')
+    def test_inventory_stops_covering_forgotten_clusters_and_after_ttl(self, time):
+        time.return_value = 1000
+        inventory = FleetInventory('prod')
+        inventory._auto_scaling_groups = {'ao_test': 'asg', 'url_shortener': 'asg'}
+        self.assertTrue(inventory.covers('ao_test'))
+        inventory.forget('ao_test')
+        self.assertFalse(inventory.covers('ao_test'))
+        self.assertTrue(inventory.covers('url_shortener'))
+        time.return_value = 1000 + FleetInventory.TTL_SECONDS
+        self.assertFalse(inventory.covers('url_shortener'))
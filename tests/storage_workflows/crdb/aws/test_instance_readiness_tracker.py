@@ -0,0 +1,48 @@
+from storage_workflows.crdb.aws.instance_readiness_tracker import InstanceReadinessTracker
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestInstanceReadinessTracker(TestCase):
+
+    @staticmethod
+    def _asg(*instances):
+        return [{'Instances': [{'InstanceId': instance_id, 'LifecycleState': state} for instance_id, state in instances]}]
+
+    @staticmethod
+    def _status(instance_id, status):
+        return {'InstanceId': instance_id, 'InstanceStatus': {'Status': status}, 'SystemStatus': {'Status': status}}
+
+    @patch('storage_workflows.crdb.aws.instance_readiness_tracker.time.sleep')
+    @patch('storage_workflows.crdb.api_gateway.ec2_gateway.Ec2Gateway.describe_instance_status_by_ids')
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.AutoScalingGroupGateway.describe_auto_scaling_groups_by_name')
+    def test_yields_each_instance_once_it_is_ready(self, describe_asg, describe_instance_status_by_ids, sleep):
+        describe_asg.side_effect = [
+            self._asg(('i-old', 'InService'), ('i-1', 'InService'), ('i-2', 'Pending')),
+            self._asg(('i-old', 'InService'), ('i-1', 'InService'), ('i-2', 'InService')),
+            self._asg(('i-old', 'InService'), ('i-1', 'InService'), ('i-2', 'InService'))]
+        describe_instance_status_by_ids.side_effect = [
+            {'i-1': self._status('i-1', 'ok')},
+            {'i-2': self._status('i-2', 'initializing')},
+            {'i-2': self._status('i-2', 'ok')}]
+        tracker = InstanceReadinessTracker('asg', ['i-old'], expected_count=2)
+        ready_instance_ids = tracker.iter_ready_instance_ids()
+
+        self.assertEqual(next(ready_instance_ids), 'i-1')
+        self.assertEqual(describe_asg.call_count, 1)
+        self.assertEqual(list(ready_instance_ids), ['i-2'])
+        self.assertEqual(tracker.ready_instance_ids, ['i-1', 'i-2'])
+        self.assertEqual(describe_instance_status_by_ids.call_args.args[0], ['i-2'])
+
+    @patch('storage_workflows.crdb.aws.instance_readiness_tracker.time.sleep')
+    @patch('storage_workflows.crdb.api_gateway.ec2_gateway.Ec2Gateway.describe_instance_status_by_ids')
+    @patch('storage_workflows.crdb.api_gateway.auto_scaling_group_gateway.AutoScalingGroupGateway.describe_auto_scaling_groups_by_name')
+    def test_times_out_with_partial_progress(self, describe_asg, describe_instance_status_by_ids, sleep):
+        describe_asg.return_value = self._asg(('i-1', 'InService'), ('i-2', 'Pending'))
+        describe_instance_status_by_ids.return_value = {'i-1': self._status('i-1', 'ok')}
+        tracker = InstanceReadinessTracker('asg', [], expected_count=2, timeout_seconds=10)
+
+        with patch('storage_workflows.crdb.aws.instance_readiness_tracker.time.monotonic', side_effect=[0, 100]):
+            with self.assertRaises(TimeoutError):
+                list(tracker.iter_ready_instance_ids())
+        self.assertEqual(tracker.ready_instance_ids, ['i-1'])
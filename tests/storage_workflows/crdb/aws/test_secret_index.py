@@ -0,0 +1,36 @@
+from storage_workflows.crdb.aws.secret_index import SecretIndex
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestSecretIndex(TestCase):
+
+    @staticmethod
+    def _secret(arn, cluster_name_tag, cred_type, client=None):
+        tags = [{'Key': 'crdb_cluster_name', 'Value': cluster_name_tag}, {'Key': 'cred-type', 'Value': cred_type}]
+        if client:
+            tags.append({'Key': 'client', 'Value': client})
+        return {'ARN': arn, 'Tags': tags}
+
+    def setUp(self):
+        self.addCleanup(SecretIndex.clear)
+
+    @patch('storage_workflows.crdb.api_gateway.secret_manager_gateway.SecretManagerGateway.iter_secrets')
+    def test_find_is_served_from_one_listing(self, iter_secrets):
+        iter_secrets.return_value = iter([
+            self._secret('arn-ca', 'ao_test-crdb', 'ca-cert'),
+            self._secret('arn-root', 'ao_test-crdb', 'client-public-cert', 'root'),
+            self._secret('arn-reader', 'ao_test-crdb', 'client-public-cert', 'reader')])
+
+        SecretIndex.prefetch('prod')
+
+        self.assertEqual(SecretIndex.find('ao_test-crdb', 'ca-cert')['ARN'], 'arn-ca')
+        self.assertEqual(SecretIndex.find('ao_test-crdb', 'client-public-cert', 'reader')['ARN'], 'arn-reader')
+        self.assertIsNone(SecretIndex.find('ao_test-crdb', 'client-public-cert', 'writer'))
+        self.assertIsNone(SecretIndex.find('url-shortener-crdb', 'ca-cert'))
+        iter_secrets.assert_called_once()
+
+    @patch('storage_workflows.crdb.api_gateway.secret_manager_gateway.SecretManagerGateway.iter_secrets')
+    def test_find_returns_none_without_prefetch(self, iter_secrets):
+        self.assertIsNone(SecretIndex.find('ao_test-crdb', 'ca-cert'))
+        iter_secrets.assert_not_called()
@@ -0,0 +1,55 @@
+import tempfile
+from datetime import datetime, timedelta, timezone
+from storage_workflows.crdb.aws.sts_credential_cache import StsCredentialCache
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+
+class TestStsCredentialCache(TestCase):
+
+    ROLE_ARN = 'arn:aws:iam::123456789012:role/crdb-workflows'
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        patcher = patch.object(StsCredentialCache, 'CACHE_DIR_PATH', self.cache_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.cache_dir.cleanup)
+
+    @staticmethod
+    def _assume_role_response(access_key_id, expires_in):
+        return {'Credentials': {'AccessKeyId': access_key_id,
+                                'SecretAccessKey': 'secret',
+                                'SessionToken': 'token',
+                                'Expiration': datetime.now(timezone.utc) + expires_in},
+                'AssumedRoleUser': {'Arn': 'arn:aws:sts::123456789012:assumed-role/crdb-workflows/prod'}}
+
+    def test_get_reuses_fresh_credentials(self):
+        assume_role = MagicMock(return_value=self._assume_role_response('AKIA1', timedelta(hours=1)))
+
+        first = StsCredentialCache.get(self.ROLE_ARN, assume_role)
+        second = StsCredentialCache.get(self.ROLE_ARN, assume_role)
+
+        assume_role.assert_called_once()
+        self.assertEqual(second['Credentials']['AccessKeyId'], 'AKIA1')
+        self.assertEqual(second['Credentials']['Expiration'], first['Credentials']['Expiration'])
+
+    def test_get_refreshes_credentials_about_to_expire(self):
+        assume_role = MagicMock(side_effect=[self._assume_role_response('AKIA1', timedelta(minutes=5)),
+                                             self._assume_role_response('AKIA2', timedelta(hours=1))])
+
+        StsCredentialCache.get(self.ROLE_ARN, assume_role)
+        response = StsCredentialCache.get(self.ROLE_ARN, assume_role)
+
+        self.assertEqual(assume_role.call_count, 2)
+        self.assertEqual(response['Credentials']['AccessKeyId'], 'AKIA2')
+
+    def test_get_caches_each_role_separately(self):
+        assume_role = MagicMock(side_effect=[self._assume_role_response('AKIA1', timedelta(hours=1)),
+                                             self._assume_role_response('AKIA2', timedelta(hours=1))])
+
+        StsCredentialCache.get(self.ROLE_ARN, assume_role)
+        response = StsCredentialCache.get(self.ROLE_ARN + '-staging', assume_role)
+
+        self.assertEqual(response['Credentials']['AccessKeyId'], 'AKIA2')
+        self.assertEqual(StsCredentialCache.get(self.ROLE_ARN, assume_role)['Credentials']['AccessKeyId'], 'AKIA1')
@@ -0,0 +1,41 @@
+import asyncio
+from storage_workflows.crdb.connect.async_crdb_connection import AsyncCrdbConnection
+from unittest import TestCase
+from unittest.mock import patch, MagicMock, AsyncMock
+
+
+class TestAsyncCrdbConnection(TestCase):
+
+    def test_gather_limits_concurrency_and_keeps_order(self):
+        running = 0
+        max_running = 0
+
+        async def task(value):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if value == 3:
+                raise ValueError("failed")
+            return value
+
+        results = asyncio.run(AsyncCrdbConnection.gather([task(value) for value in range(6)], concurrency=2))
+        self.assertEqual(max_running, 2)
+        self.assertEqual(results[:3], [0, 1, 2])
+        self.assertIsInstance(results[3], ValueError)
+
+    @patch('storage_workflows.crdb.connect.async_crdb_connection.AsyncCrdbConnection.get_crdb_connection')
+    def test_run_on_clusters_returns_result_per_cluster(self, get_crdb_connection):
+        def build_connection(cluster_name, db_name):
+            connection = MagicMock()
+            connection.connect = AsyncMock()
+            if cluster_name == 'broken_cluster':
+                connection.connect.side_effect = TimeoutError()
+            connection.execute_sql = AsyncMock(return_value=[(cluster_name,)])
+            return connection
+
+        get_crdb_connection.side_effect = AsyncMock(side_effect=build_connection)
+        results = AsyncCrdbConnection.run_on_clusters(['cluster_a', 'broken_cluster'], "SELECT 1;")
+        self.assertEqual(results['cluster_a'], [('cluster_a',)])
+        self.assertIsInstance(results['broken_cluster'], TimeoutError)
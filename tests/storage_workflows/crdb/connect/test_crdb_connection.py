@@ -0,0 +1,166 @@
+import os
+import threading
+import psycopg2
+import psycopg2.sql
+from storage_workflows.crdb.connect.crdb_connection import CrdbConnection, to_positional_placeholders
+from storage_workflows.crdb.connect.statement_timeout_exception import StatementTimeoutException
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+
+class TestCrdbConnection(TestCase):
+
+    def setUp(self):
+        os.environ['CRDB_CERTS_DIR_PATH_PREFIX'] = '/tmp/crdb/certs'
+        self.crdb_connection = CrdbConnection('test_cluster', 'defaultdb')
+        self.crdb_connection._connection = MagicMock()
+        self.cursor = self.crdb_connection._connection.cursor.return_value
+
+    def test_to_positional_placeholders(self):
+        self.assertEqual(to_positional_placeholders("SELECT * FROM t WHERE a = %s AND b LIKE '%%x%%' AND c = %s;"),
+                         "SELECT * FROM t WHERE a = $1 AND b LIKE '%x%' AND c = $2;")
+
+    def test_execute_sql_binds_params(self):
+        self.crdb_connection.execute_sql("SELECT * FROM t WHERE a = %s;", params=(1,), auto_commit=True)
+        self.cursor.execute.assert_called_once_with("SELECT * FROM t WHERE a = %s;", (1,))
+
+    def test_execute_sql_cancels_statement_after_timeout(self):
+        connection = self.crdb_connection._connection
+        cancelled = threading.Event()
+        connection.cancel.side_effect = cancelled.set
+
+        def execute(sql, params):
+            cancelled.wait(5)
+            raise psycopg2.extensions.QueryCanceledError("query execution canceled")
+
+        self.cursor.execute.side_effect = execute
+        with self.assertRaises(StatementTimeoutException):
+            self.crdb_connection.execute_sql("SELECT pg_sleep(60);", auto_commit=True, statement_timeout=0.01)
+        connection.cancel.assert_called_once()
+
+    def test_execute_sql_keeps_errors_raised_before_timeout(self):
+        self.cursor.execute.side_effect = psycopg2.ProgrammingError("syntax error")
+        with self.assertRaises(psycopg2.ProgrammingError) as context:
+            self.crdb_connection.execute_sql("SELEC 1;", auto_commit=True, statement_timeout=5)
+        self.assertNotIsInstance(context.exception, StatementTimeoutException)
+        self.crdb_connection._connection.cancel.assert_not_called()
+
+    def test_execute_sql_prepares_statement_once(self):
+        sql = "SELECT * FROM t WHERE a = %s;"
+        self.crdb_connection.execute_sql(sql, params=(1,), prepare=True, auto_commit=True)
+        self.crdb_connection.execute_sql(sql, params=(2,), prepare=True, auto_commit=True)
+        executed = [call.args for call in self.cursor.execute.call_args_list]
+        self.assertEqual(executed, [("PREPARE crdb_wf_stmt_1 AS SELECT * FROM t WHERE a = $1;",),
+                                    ("EXECUTE crdb_wf_stmt_1 (%s);", (1,)),
+                                    ("EXECUTE crdb_wf_stmt_1 (%s);", (2,))])
+
+    def test_execute_sql_prepares_composed_statement_as_text(self):
+        sql = psycopg2.sql.SQL("SELECT * FROM {} WHERE a = %s;").format(psycopg2.sql.Identifier('t'))
+        with patch.object(psycopg2.sql.Composed, 'as_string', return_value='SELECT * FROM "t" WHERE a = %s;'):
+            self.crdb_connection.execute_sql(sql, params=(1,), prepare=True, auto_commit=True)
+        self.cursor.execute.assert_any_call('PREPARE crdb_wf_stmt_1 AS SELECT * FROM "t" WHERE a = $1;')
+
+    @patch.dict(os.environ, {'CRDB_STAGING_HOST_SUFFIX': '.test', 'CRDB_CA_CERT_FILE_NAME': 'ca.crt',
+                             'CRDB_PUBLIC_CERT_FILE_NAME': 'client.root.crt',
+                             'CRDB_PRIVATE_KEY_FILE_NAME': 'client.root.key'})
+    @patch('storage_workflows.crdb.connect.crdb_connection.psycopg2.connect')
+    def test_reconnect_forgets_prepared_statements(self, connect):
+        sql = "SELECT * FROM t WHERE a = %s;"
+        self.crdb_connection.execute_sql(sql, params=(1,), prepare=True, auto_commit=True)
+        self.crdb_connection.connect()
+        cursor = connect.return_value.cursor.return_value
+        self.crdb_connection.execute_sql(sql, params=(1,), prepare=True, auto_commit=True)
+        cursor.execute.assert_any_call("PREPARE crdb_wf_stmt_1 AS SELECT * FROM t WHERE a = $1;")
+
+    def test_stream_sql_reads_in_batches_and_rolls_back(self):
+        connection = self.crdb_connection._connection
+        connection.closed = 0
+        named_cursor = connection.cursor.return_value.__enter__.return_value
+        named_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        rows = list(self.crdb_connection.stream_sql("SELECT id FROM t WHERE a = %s;", params=(1,), batch_size=2))
+        self.assertEqual(rows, [(1,), (2,), (3,)])
+        named_cursor.fetchmany.assert_called_with(2)
+        self.assertFalse(connection.autocommit)
+        connection.rollback.assert_called_once()
+
+    def test_stream_sql_rolls_back_when_caller_stops_early(self):
+        connection = self.crdb_connection._connection
+        connection.closed = 0
+        named_cursor = connection.cursor.return_value.__enter__.return_value
+        named_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        rows = self.crdb_connection.stream_sql("SELECT id FROM t;", batch_size=2, follower_read=True)
+        self.assertEqual(next(rows), (1,))
+        rows.close()
+        named_cursor.execute.assert_any_call("SET TRANSACTION AS OF SYSTEM TIME follower_read_timestamp();")
+        connection.rollback.assert_called_once()
+
+    def test_stream_sql_cancels_batch_fetch_after_timeout(self):
+        connection = self.crdb_connection._connection
+        connection.closed = 0
+        cancelled = threading.Event()
+        connection.cancel.side_effect = cancelled.set
+        named_cursor = connection.cursor.return_value.__enter__.return_value
+
+        def fetchmany(batch_size):
+            cancelled.wait(5)
+            raise psycopg2.extensions.QueryCanceledError("query execution canceled")
+
+        named_cursor.fetchmany.side_effect = fetchmany
+        with self.assertRaises(StatementTimeoutException):
+            list(self.crdb_connection.stream_sql("SELECT id FROM t;", statement_timeout=0.01))
+        connection.cancel.assert_called_once()
+        connection.rollback.assert_called_once()
+
+    def test_execute_batch_sends_one_round_trip(self):
+        results = self.crdb_connection.execute_batch(["CREATE ROLE a;", "GRANT CONNECT ON DATABASE d TO a;"])
+        self.cursor.__enter__.return_value.execute.assert_called_once_with(
+            "CREATE ROLE a;\nGRANT CONNECT ON DATABASE d TO a;")
+        self.assertTrue(all(result.succeeded for result in results))
+
+    def test_execute_batch_attributes_errors_per_statement(self):
+        error = psycopg2.ProgrammingError("role a does not exist")
+        self.cursor.__enter__.return_value.execute.side_effect = [error, None, error]
+        results = self.crdb_connection.execute_batch(["CREATE ROLE a;", "GRANT CONNECT ON DATABASE d TO a;"])
+        self.assertEqual([result.succeeded for result in results], [True, False])
+        self.assertIs(results[1].error, error)
+
+    def test_execute_batch_stops_at_first_failing_statement(self):
+        error = psycopg2.ProgrammingError("role a does not exist")
+        execute = self.cursor.__enter__.return_value.execute
+        execute.side_effect = [error, error]
+        results = self.crdb_connection.execute_batch(["GRANT x TO a;", "CREATE ROLE a;", "GRANT y TO a;"])
+        self.assertEqual(len(results), 1)
+        self.assertIs(results[0].error, error)
+        self.assertEqual(execute.call_count, 2)
+
+    def test_reset_database_closes_session_it_cannot_reset(self):
+        connection = self.crdb_connection._connection
+        connection.closed = 0
+        self.cursor.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("connection lost")
+        self.crdb_connection.reset_database()
+        connection.close.assert_called_once()
+
+    @patch.dict(os.environ, {'CRDB_STAGING_HOST_SUFFIX': '.test', 'CRDB_CA_CERT_FILE_NAME': 'ca.crt',
+                             'CRDB_PUBLIC_CERT_FILE_NAME': 'client.root.crt',
+                             'CRDB_PRIVATE_KEY_FILE_NAME': 'client.root.key'})
+    @patch('storage_workflows.crdb.connect.crdb_connection.psycopg2.connect')
+    def test_follower_read_session_is_set_on_connect(self, connect):
+        crdb_connection = CrdbConnection('test_cluster', 'defaultdb', follower_read=True)
+        crdb_connection.connect()
+        cursor = connect.return_value.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with(CrdbConnection.FOLLOWER_READ_SESSION_SQL)
+
+    @patch.dict(os.environ, {'CRDB_STAGING_HOST_SUFFIX': '.test', 'CRDB_CA_CERT_FILE_NAME': 'ca.crt',
+                             'CRDB_PUBLIC_CERT_FILE_NAME': 'client.root.crt',
+                             'CRDB_PRIVATE_KEY_FILE_NAME': 'client.root.key',
+                             'CRDB_CONNECTION_ROUTING': 'direct'})
+    @patch('storage_workflows.crdb.connect.crdb_node_router.CrdbNodeRouter.get_node_addresses')
+    @patch('storage_workflows.crdb.connect.crdb_connection.psycopg2.connect')
+    def test_direct_routing_fails_over_to_next_node(self, connect, get_node_addresses):
+        get_node_addresses.return_value = [('10.0.0.1', 26257), ('10.0.0.2', 26257)]
+        node_connection = MagicMock()
+        connect.side_effect = [psycopg2.OperationalError('timeout'), node_connection]
+        self.crdb_connection.connect()
+        self.assertIs(self.crdb_connection.connection, node_connection)
+        self.assertEqual(connect.call_args.kwargs['hostaddr'], '10.0.0.2')
+        self.assertEqual(connect.call_args.kwargs['host'], 'test-cluster.test')
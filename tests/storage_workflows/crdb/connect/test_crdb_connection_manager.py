@@ -0,0 +1,88 @@
+from psycopg2 import extensions
+from storage_workflows.crdb.connect.crdb_connection_manager import CrdbConnectionManager
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+
+class TestCrdbConnectionManager(TestCase):
+
+    def setUp(self):
+        CrdbConnectionManager._idle_connections.clear()
+        CrdbConnectionManager._open_connection_counts.clear()
+
+    def tearDown(self):
+        CrdbConnectionManager.close_all()
+        CrdbConnectionManager._open_connection_counts.clear()
+
+    @staticmethod
+    def _mock_crdb_connection(cluster_name, db_name="defaultdb", follower_read=False):
+        crdb_connection = MagicMock()
+        crdb_connection.cluster_name = cluster_name
+        crdb_connection.db_name = db_name
+        crdb_connection.follower_read = follower_read
+        crdb_connection.connection.closed = 0
+        crdb_connection.connection.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_IDLE
+        return crdb_connection
+
+    @patch('storage_workflows.crdb.connect.crdb_connection.CrdbConnection.get_crdb_connection')
+    def test_connection_is_reused(self, get_crdb_connection):
+        get_crdb_connection.side_effect = self._mock_crdb_connection
+        with CrdbConnectionManager.connection('test_cluster') as first_connection:
+            pass
+        with CrdbConnectionManager.connection('test_cluster') as second_connection:
+            pass
+        self.assertIs(first_connection, second_connection)
+        get_crdb_connection.assert_called_once_with('test_cluster', 'defaultdb', False)
+        first_connection.connect.assert_called_once()
+
+    @patch('storage_workflows.crdb.connect.crdb_connection.CrdbConnection.get_crdb_connection')
+    def test_connections_are_keyed_by_cluster_and_db(self, get_crdb_connection):
+        get_crdb_connection.side_effect = self._mock_crdb_connection
+        with CrdbConnectionManager.connection('test_cluster') as default_connection:
+            pass
+        with CrdbConnectionManager.connection('test_cluster', 'test_db') as db_connection:
+            pass
+        self.assertIsNot(default_connection, db_connection)
+        self.assertEqual(get_crdb_connection.call_count, 2)
+
+    @patch('storage_workflows.crdb.connect.crdb_connection.CrdbConnection.get_crdb_connection')
+    def test_follower_read_connections_are_pooled_separately(self, get_crdb_connection):
+        get_crdb_connection.side_effect = self._mock_crdb_connection
+        with CrdbConnectionManager.connection('test_cluster') as default_connection:
+            pass
+        with CrdbConnectionManager.connection('test_cluster', follower_read=True) as follower_read_connection:
+            pass
+        self.assertIsNot(default_connection, follower_read_connection)
+        get_crdb_connection.assert_called_with('test_cluster', 'defaultdb', True)
+        self.assertEqual(CrdbConnectionManager._idle_connections[('test_cluster', 'defaultdb', True)][0][0],
+                         follower_read_connection)
+
+    @patch('storage_workflows.crdb.connect.crdb_connection.CrdbConnection.get_crdb_connection')
+    def test_closed_connection_is_replaced(self, get_crdb_connection):
+        get_crdb_connection.side_effect = self._mock_crdb_connection
+        with CrdbConnectionManager.connection('test_cluster') as first_connection:
+            pass
+        first_connection.connection.closed = 1
+        with CrdbConnectionManager.connection('test_cluster') as second_connection:
+            pass
+        self.assertIsNot(first_connection, second_connection)
+        self.assertEqual(CrdbConnectionManager._open_connection_counts[('test_cluster', 'defaultdb', False)], 1)
+
+    @patch('storage_workflows.crdb.connect.crdb_connection.CrdbConnection.get_crdb_connection')
+    def test_open_transaction_is_rolled_back_on_release(self, get_crdb_connection):
+        crdb_connection = self._mock_crdb_connection('test_cluster')
+        crdb_connection.connection.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_INTRANS
+        get_crdb_connection.return_value = crdb_connection
+        with CrdbConnectionManager.connection('test_cluster'):
+            pass
+        crdb_connection.connection.rollback.assert_called_once()
+
+    @patch('storage_workflows.crdb.connect.crdb_connection.CrdbConnection.get_crdb_connection')
+    def test_failed_connect_releases_slot(self, get_crdb_connection):
+        crdb_connection = self._mock_crdb_connection('test_cluster')
+        crdb_connection.connection = None
+        get_crdb_connection.return_value = crdb_connection
+        with self.assertRaises(ValueError):
+            with CrdbConnectionManager.connection('test_cluster'):
+                pass
+        self.assertEqual(CrdbConnectionManager._open_connection_counts[('test_cluster', 'defaultdb', False)], 0)
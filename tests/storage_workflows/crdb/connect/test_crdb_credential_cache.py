@@ -0,0 +1,87 @@
+import os
+import tempfile
+from storage_workflows.crdb.aws.secret_value import SecretValue
+from storage_workflows.crdb.connect.cred_type import CredType
+from storage_workflows.crdb.connect.crdb_credential_cache import CrdbCredentialCache
+from unittest import TestCase
+from unittest.mock import patch, DEFAULT
+
+
+def build_secret(arn, cred_type, version_id, client=None):
+    tags = [{'Key': 'crdb_cluster_name', 'Value': 'test_cluster-crdb'},
+            {'Key': 'cred-type', 'Value': cred_type.value},
+            {'Key': 'environment', 'Value': 'staging'}]
+    if client:
+        tags.append({'Key': 'client', 'Value': client})
+    return {'ARN': arn, 'Tags': tags, 'SecretVersionsToStages': {version_id: ['AWSCURRENT']}}
+
+
+class TestCrdbCredentialCache(TestCase):
+
+    def setUp(self):
+        CrdbCredentialCache._cluster_secret_versions.clear()
+        CrdbCredentialCache._secret_values.clear()
+        self.secret_list = [build_secret('ca_arn', CredType.CA_CERT_CRED_TYPE, 'v1'),
+                            build_secret('other_public_arn', CredType.PUBLIC_CERT_CRED_TYPE, 'v1', 'other'),
+                            build_secret('public_arn', CredType.PUBLIC_CERT_CRED_TYPE, 'v1', 'root'),
+                            build_secret('private_arn', CredType.PRIVATE_KEY_CRED_TYPE, 'v1', 'root')]
+
+    @staticmethod
+    def batch_find_secrets(secret_arns):
+        return {arn: {'ARN': arn, 'SecretString': arn + '_value'} for arn in secret_arns}
+
+    @patch.multiple('storage_workflows.crdb.api_gateway.secret_manager_gateway.SecretManagerGateway',
+                    list_secrets=DEFAULT,
+                    batch_find_secrets=DEFAULT)
+    def test_get_credentials_resolves_cluster_once(self, list_secrets, batch_find_secrets):
+        list_secrets.return_value = self.secret_list
+        batch_find_secrets.side_effect = self.batch_find_secrets
+        credentials = CrdbCredentialCache.get_credentials('test_cluster', 'root')
+        CrdbCredentialCache.get_credentials('test_cluster', 'root')
+        self.assertEqual(credentials[CredType.CA_CERT_CRED_TYPE].secret_string, 'ca_arn_value')
+        self.assertEqual(credentials[CredType.PUBLIC_CERT_CRED_TYPE].secret_string, 'public_arn_value')
+        self.assertEqual(credentials[CredType.PRIVATE_KEY_CRED_TYPE].secret_string, 'private_arn_value')
+        list_secrets.assert_called_once()
+        batch_find_secrets.assert_called_once_with(['ca_arn', 'public_arn', 'private_arn'])
+
+    @patch.multiple('storage_workflows.crdb.api_gateway.secret_manager_gateway.SecretManagerGateway',
+                    list_secrets=DEFAULT,
+                    batch_find_secrets=DEFAULT)
+    def test_only_rotated_secrets_are_fetched_after_ttl(self, list_secrets, batch_find_secrets):
+        list_secrets.return_value = self.secret_list
+        batch_find_secrets.side_effect = self.batch_find_secrets
+        CrdbCredentialCache.get_credentials('test_cluster', 'root')
+        self.secret_list[0] = build_secret('ca_arn', CredType.CA_CERT_CRED_TYPE, 'v2')
+        CrdbCredentialCache.invalidate('test_cluster')
+        CrdbCredentialCache.get_credentials('test_cluster', 'root')
+        self.assertEqual(list_secrets.call_count, 2)
+        batch_find_secrets.assert_called_with(['ca_arn'])
+        self.assertNotIn(('ca_arn', 'v1'), CrdbCredentialCache._secret_values)
+
+    @patch('storage_workflows.crdb.api_gateway.secret_manager_gateway.SecretManagerGateway.list_secrets')
+    def test_missing_secret_raises(self, list_secrets):
+        list_secrets.return_value = self.secret_list[:1]
+        with self.assertRaises(ValueError):
+            CrdbCredentialCache.get_credentials('test_cluster', 'root')
+
+    def test_write_to_file_skips_unchanged_content(self):
+        secret_value = SecretValue({'SecretString': 'cert'})
+        with tempfile.TemporaryDirectory() as dir_path:
+            self.assertTrue(secret_value.write_to_file(dir_path, 'ca.crt'))
+            self.assertFalse(secret_value.write_to_file(dir_path, 'ca.crt'))
+            self.assertTrue(SecretValue({'SecretString': 'new cert'}).write_to_file(dir_path, 'ca.crt'))
+            with open(os.path.join(dir_path, 'ca.crt')) as file:
+                self.assertEqual(file.read(), 'new cert')
+
+    @patch.multiple('storage_workflows.crdb.api_gateway.secret_manager_gateway.SecretManagerGateway',
+                    list_secrets=DEFAULT,
+                    batch_find_secrets=DEFAULT)
+    def test_secrets_without_version_are_cached_by_arn(self, list_secrets, batch_find_secrets):
+        self.secret_list[0] = dict(self.secret_list[0], SecretVersionsToStages={})
+        list_secrets.return_value = self.secret_list
+        batch_find_secrets.side_effect = self.batch_find_secrets
+        CrdbCredentialCache.get_credentials('test_cluster', 'root')
+        CrdbCredentialCache._cluster_secret_versions.clear()
+        credentials = CrdbCredentialCache.get_credentials('test_cluster', 'root')
+        self.assertEqual(credentials[CredType.CA_CERT_CRED_TYPE].secret_string, 'ca_arn_value')
+        batch_find_secrets.assert_called_once()
@@ -0,0 +1,32 @@
+import psycopg2
+from storage_workflows.crdb.connect.crdb_node_router import CrdbNodeRouter
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+
+class TestCrdbNodeRouter(TestCase):
+
+    def setUp(self):
+        CrdbNodeRouter.invalidate()
+
+    @patch('storage_workflows.crdb.connect.crdb_node_router.CrdbNodeRouter.probe')
+    def test_nodes_are_sorted_by_latency_and_unreachable_dropped(self, probe):
+        latencies = {('10.0.0.1', 26257): 0.02, ('10.0.0.2', 26257): None, ('10.0.0.3', 26257): 0.01}
+        probe.side_effect = latencies.get
+        discover = MagicMock(return_value=[('10.0.0.1', '26257'), ('10.0.0.2', '26257'), ('10.0.0.3', '26257')])
+        node_addresses = CrdbNodeRouter.get_node_addresses('test_cluster', discover)
+        self.assertEqual(node_addresses, [('10.0.0.3', 26257), ('10.0.0.1', 26257)])
+        CrdbNodeRouter.get_node_addresses('test_cluster', discover)
+        discover.assert_called_once()
+
+    @patch('storage_workflows.crdb.connect.crdb_node_router.CrdbNodeRouter.probe')
+    def test_failed_node_is_dropped_from_cache(self, probe):
+        probe.return_value = 0.01
+        discover = MagicMock(return_value=[('10.0.0.1', '26257'), ('10.0.0.2', '26257')])
+        CrdbNodeRouter.get_node_addresses('test_cluster', discover)
+        CrdbNodeRouter.mark_node_failed('test_cluster', ('10.0.0.1', 26257))
+        self.assertEqual(CrdbNodeRouter.get_node_addresses('test_cluster', discover), [('10.0.0.2', 26257)])
+
+    def test_discovery_failure_returns_no_nodes(self):
+        discover = MagicMock(side_effect=psycopg2.ProgrammingError('relation "auto_discovery.nodes" does not exist'))
+        self.assertEqual(CrdbNodeRouter.get_node_addresses('test_cluster', discover), [])
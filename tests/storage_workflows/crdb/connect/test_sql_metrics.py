@@ -0,0 +1,36 @@
+import json
+import psycopg2
+from storage_workflows.crdb.connect.sql_metrics import SqlMetrics
+from unittest import TestCase
+
+
+class TestSqlMetrics(TestCase):
+
+    def setUp(self):
+        SqlMetrics.reset()
+
+    def test_fingerprint_normalizes_literals_and_placeholders(self):
+        self.assertEqual(SqlMetrics.fingerprint("SELECT * FROM crdb_internal.jobs\n  WHERE job_id = '123' AND x = 5;"),
+                         SqlMetrics.fingerprint("SELECT * FROM crdb_internal.jobs WHERE job_id = %s AND x = $2;"))
+
+    def test_record_builds_histogram(self):
+        SqlMetrics.record('test_cluster', "SELECT 1;", 0.003, rows=1)
+        SqlMetrics.record('test_cluster', "SELECT 2;", 0.2, rows=1)
+        SqlMetrics.record('test_cluster', "SELECT 3;", 20, error=psycopg2.OperationalError())
+        metrics = json.loads(SqlMetrics.to_json())
+        self.assertEqual(len(metrics), 1)
+        self.assertEqual(metrics[0]['count'], 3)
+        self.assertEqual(metrics[0]['rows'], 2)
+        self.assertEqual(metrics[0]['errors'], {'OperationalError': 1})
+        self.assertEqual(metrics[0]['buckets']['0.005'], 1)
+        self.assertEqual(metrics[0]['buckets']['0.25'], 1)
+        self.assertEqual(metrics[0]['buckets']['+Inf'], 1)
+
+    def test_prometheus_buckets_are_cumulative(self):
+        SqlMetrics.record('test_cluster', "SELECT 1;", 0.003)
+        SqlMetrics.record('test_cluster', "SELECT 1;", 0.2)
+        output = SqlMetrics.to_prometheus()
+        labels = 'cluster="test_cluster",fingerprint="SELECT _;"'
+        self.assertIn('crdb_wf_sql_statement_duration_seconds_bucket{%s,le="0.005"} 1' % labels, output)
+        self.assertIn('crdb_wf_sql_statement_duration_seconds_bucket{%s,le="+Inf"} 2' % labels, output)
+        self.assertIn('crdb_wf_sql_statement_duration_seconds_count{%s} 2' % labels, output)
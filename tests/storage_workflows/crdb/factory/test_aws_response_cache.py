@@ -0,0 +1,67 @@
+import boto3
+from botocore.awsrequest import AWSResponse
+from storage_workflows.crdb.factory.aws_response_cache import AwsResponseCache
+from unittest import TestCase
+
+
+class TestAwsResponseCache(TestCase):
+
+    def setUp(self):
+        AwsResponseCache.clear()
+        self.client = boto3.client('autoscaling', region_name='us-west-2', aws_access_key_id='test',
+                                   aws_secret_access_key='test')
+        AwsResponseCache.register(self.client)
+        self.sent_operations = []
+        # registered after the cache, so it only answers the calls the cache lets through
+        self.client.meta.events.register('before-call', self._send)
+
+    def _send(self, model, **kwargs):
+        self.sent_operations.append(model.name)
+        if model.name == 'DescribeAutoScalingGroups':
+            return AWSResponse(None, 200, {}, None), {'AutoScalingGroups': [{
+                'AutoScalingGroupName': 'test_cluster_staging', 'Instances': [{'InstanceId': 'i-1'}]}]}
+        return AWSResponse(None, 200, {}, None), {}
+
+    def test_repeated_describe_is_served_from_cache(self):
+        first = self.client.describe_auto_scaling_groups(AutoScalingGroupNames=['test_cluster_staging'])
+        first['AutoScalingGroups'].clear()
+        second = self.client.describe_auto_scaling_groups(AutoScalingGroupNames=['test_cluster_staging'])
+        self.assertEqual(second['AutoScalingGroups'][0]['AutoScalingGroupName'], 'test_cluster_staging')
+        self.assertEqual(self.sent_operations, ['DescribeAutoScalingGroups'])
+
+    def test_mutating_call_invalidates_the_resource(self):
+        self.client.describe_auto_scaling_groups(Filters=[{'Name': 'tag-key', 'Values': ['crdb_cluster_name']}])
+        self.client.update_auto_scaling_group(AutoScalingGroupName='test_cluster_staging', DesiredCapacity=4)
+        self.client.describe_auto_scaling_groups(Filters=[{'Name': 'tag-key', 'Values': ['crdb_cluster_name']}])
+        self.assertEqual(self.sent_operations, ['DescribeAutoScalingGroups', 'UpdateAutoScalingGroup',
+                                                'DescribeAutoScalingGroups'])
+
+    def test_mutating_call_on_instance_invalidates_its_group(self):
+        self.client.describe_auto_scaling_groups(AutoScalingGroupNames=['test_cluster_staging'])
+        self.client.terminate_instance_in_auto_scaling_group(InstanceId='i-1', ShouldDecrementDesiredCapacity=True)
+        self.client.describe_auto_scaling_groups(AutoScalingGroupNames=['test_cluster_staging'])
+        self.assertEqual(self.sent_operations.count('DescribeAutoScalingGroups'), 2)
+
+    def test_mutating_call_on_another_resource_keeps_entry(self):
+        self.client.describe_auto_scaling_groups(AutoScalingGroupNames=['test_cluster_staging'])
+        self.client.update_auto_scaling_group(AutoScalingGroupName='other_cluster_staging', DesiredCapacity=4)
+        self.client.describe_auto_scaling_groups(AutoScalingGroupNames=['test_cluster_staging'])
+        self.assertEqual(self.sent_operations, ['DescribeAutoScalingGroups', 'UpdateAutoScalingGroup'])
+
+    def test_read_call_without_resources_keeps_entries(self):
+        secrets_client = boto3.client('secretsmanager', region_name='us-west-2', aws_access_key_id='test',
+                                      aws_secret_access_key='test')
+        AwsResponseCache.register(secrets_client)
+        secrets_client.meta.events.register('before-call', self._send)
+        self.client.describe_auto_scaling_groups(AutoScalingGroupNames=['test_cluster_staging'])
+        secrets_client.batch_get_secret_value(SecretIdList=['arn'])
+        self.client.describe_auto_scaling_groups(AutoScalingGroupNames=['test_cluster_staging'])
+        self.assertEqual(self.sent_operations, ['DescribeAutoScalingGroups', 'BatchGetSecretValue'])
+
+    def test_only_numeric_launch_template_versions_get_the_long_ttl(self):
+        self.assertEqual(AwsResponseCache._ttl_seconds('DescribeLaunchTemplateVersions', {'Versions': ['3', '4']}),
+                         AwsResponseCache.NUMERIC_LAUNCH_TEMPLATE_VERSIONS_TTL_SECONDS)
+        self.assertEqual(AwsResponseCache._ttl_seconds('DescribeLaunchTemplateVersions', {'Versions': ['$Latest']}),
+                         AwsResponseCache.DEFAULT_TTL_SECONDS)
+        self.assertEqual(AwsResponseCache._ttl_seconds('DescribeLaunchTemplateVersions', {}),
+                         AwsResponseCache.DEFAULT_TTL_SECONDS)
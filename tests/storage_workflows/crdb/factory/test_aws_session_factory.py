@@ -0,0 +1,42 @@
+import os
+import time
+from storage_workflows.crdb.factory.aws_session_factory import AwsSessionFactory
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+
+@patch.dict(os.environ, {'REGION': 'us-west-2', 'AWS_ACCESS_KEY_ID': 'base', 'AWS_SECRET_ACCESS_KEY': 'base'})
+class TestAwsSessionFactory(TestCase):
+
+    def setUp(self):
+        AwsSessionFactory._clients.clear()
+        AwsSessionFactory._base_session = None
+        AwsSessionFactory._session = None
+        AwsSessionFactory._session_identity = None
+        AwsSessionFactory._access_key_id = None
+        AwsSessionFactory._credentials_expiration = None
+        AwsSessionFactory._credentials_refresher = None
+
+    def tearDown(self):
+        self.setUp()
+
+    def test_clients_are_shared_and_configured(self):
+        client = AwsSessionFactory.ec2()
+        self.assertIs(AwsSessionFactory.ec2(), client)
+        self.assertEqual(client.meta.config.max_pool_connections, AwsSessionFactory.MAX_POOL_CONNECTIONS)
+        self.assertTrue(client.meta.config.tcp_keepalive)
+        self.assertEqual(client.meta.config.retries['mode'], 'adaptive')
+
+    def test_role_credentials_stay_out_of_environment(self):
+        AwsSessionFactory.set_credentials('role', 'secret', 'token', identity='arn:role')
+        credentials = AwsSessionFactory.ec2()._request_signer._credentials
+        self.assertEqual(credentials.access_key, 'role')
+        self.assertEqual(os.environ['AWS_ACCESS_KEY_ID'], 'base')
+        self.assertEqual(AwsSessionFactory.sts()._request_signer._credentials.access_key, 'base')
+
+    def test_expiring_credentials_are_refreshed(self):
+        refresher = MagicMock(side_effect=lambda: AwsSessionFactory.set_credentials('new', 'secret', 'token'))
+        AwsSessionFactory.set_credentials('old', 'secret', 'token', expiration=time.time() + 60, refresher=refresher)
+        client = AwsSessionFactory.ec2()
+        refresher.assert_called_once()
+        self.assertEqual(client._request_signer._credentials.access_key, 'new')
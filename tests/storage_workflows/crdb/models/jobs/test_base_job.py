@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from storage_workflows.crdb.models.jobs.base_job import BaseJob
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+
+class TestBaseJob(TestCase):
+
+    def setUp(self):
+        self.read_rows = []
+        self.checked_out = []
+
+        def stream_sql(sql, params=None, follower_read=False, statement_timeout=None):
+            for row in [(1, 'BACKUP', 'running'), (2, 'BACKUP', 'paused'), (3, 'BACKUP', 'running')]:
+                self.read_rows.append(row)
+                yield row
+
+        connection = MagicMock()
+        connection.stream_sql.side_effect = stream_sql
+
+        @contextmanager
+        def pooled_connection(cluster_name):
+            self.checked_out.append(True)
+            try:
+                yield connection
+            finally:
+                self.checked_out.pop()
+
+        patcher = patch('storage_workflows.crdb.connect.crdb_connection_manager.CrdbConnectionManager.connection',
+                        side_effect=pooled_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_iter_jobs_by_type_streams_and_releases_connection_on_close(self):
+        jobs = BaseJob.iter_jobs_by_type('test_cluster', 'BACKUP')
+        self.assertEqual(next(jobs), (1, 'BACKUP', 'running'))
+        self.assertEqual(self.read_rows, [(1, 'BACKUP', 'running')])
+        self.assertEqual(self.checked_out, [True])
+        jobs.close()
+        self.assertEqual(self.checked_out, [])
+
+    def test_iter_jobs_by_type_releases_connection_once_exhausted(self):
+        self.assertEqual(len(list(BaseJob.iter_jobs_by_type('test_cluster', 'BACKUP'))), 3)
+        self.assertEqual(self.checked_out, [])
@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+from storage_workflows.crdb.models.jobs.changefeed_job import ChangefeedJob
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+
+class TestChangefeedJob(TestCase):
+
+    def test_job_status_poll_is_prepared_without_follower_read(self):
+        connection = MagicMock()
+        connection.execute_sql.return_value = [(1, 'CHANGEFEED', 'paused')]
+
+        @contextmanager
+        def pooled_connection(cluster_name):
+            yield connection
+
+        with patch('storage_workflows.crdb.connect.crdb_connection_manager.CrdbConnectionManager.connection',
+                   side_effect=pooled_connection):
+            self.assertEqual(ChangefeedJob.get_latest_job_status(1, 'test_cluster'), 'paused')
+        sql = connection.execute_sql.call_args.args[0]
+        self.assertNotIn('AS OF SYSTEM TIME', sql.upper())
+        self.assertTrue(connection.execute_sql.call_args.kwargs['prepare'])
@@ -0,0 +1,33 @@
+from storage_workflows.crdb.models.cluster import Cluster
+from storage_workflows.crdb.models.node import Node
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+
+class TestCluster(TestCase):
+
+    @patch('storage_workflows.crdb.models.cluster.time.sleep')
+    @patch('storage_workflows.crdb.models.node_store_snapshot.NodeStoreSnapshot.refresh_all')
+    @patch('storage_workflows.crdb.models.node_set.NodeSet.fetch')
+    @patch('storage_workflows.crdb.aws.ec2_instance.Ec2Instance.find_ec2_instances')
+    @patch('storage_workflows.crdb.models.cluster.MetadataDBOperations')
+    @patch('storage_workflows.crdb.aws.auto_scaling_group.AutoScalingGroup.find_auto_scaling_group_by_cluster_name')
+    def test_wait_for_hydration_counts_nodes_without_metrics_as_pending(self, find_asg, metadata_db_operations,
+                                                                        find_ec2_instances, fetch, refresh_all, sleep):
+        find_asg.return_value.instances = [MagicMock(instance_id='i-1'), MagicMock(instance_id='i-2')]
+        metadata_db_operations.return_value.get_old_instance_ids.return_value = []
+        find_ec2_instances.return_value = {'i-1': MagicMock(private_ip_address='10.0.0.1'),
+                                           'i-2': MagicMock(private_ip_address='10.0.0.2')}
+        fetch.return_value.for_ip_addresses.return_value = [Node({'node_id': 1}), Node({'node_id': 2})]
+
+        def refresh_snapshots(snapshots):
+            for snapshot in snapshots:
+                if snapshot.node_id == 1:
+                    snapshot._load([])
+            return [2]
+
+        refresh_all.side_effect = refresh_snapshots
+        with self.assertLogs(level='INFO') as logs:
+            Cluster().wait_for_hydration(3)
+        self.assertEqual(refresh_all.call_count, 3)
+        self.assertFalse(any('Hydration complete.' in line for line in logs.output))
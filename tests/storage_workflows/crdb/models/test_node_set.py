@@ -0,0 +1,37 @@
+from storage_workflows.crdb.models.node import Node
+from storage_workflows.crdb.models.node_set import NodeSet
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestNodeSet(TestCase):
+
+    @staticmethod
+    def _node(node_id, ip_address, sql_conns=0):
+        return Node({'node_id': node_id, 'address': {'address_field': ip_address + ':26257'},
+                     'metrics': {'sql.conns': sql_conns}})
+
+    @patch('storage_workflows.crdb.models.node.Node.get_nodes')
+    def test_nodes_are_indexed_by_id_and_ip_address(self, get_nodes):
+        get_nodes.return_value = [self._node(1, '10.0.0.1'), self._node(2, '10.0.0.2')]
+
+        node_set = NodeSet.fetch()
+
+        self.assertEqual(node_set.by_id(2).ip_address, '10.0.0.2')
+        self.assertEqual([node.id for node in node_set.for_ip_addresses(['10.0.0.2', '10.0.0.1'])], [2, 1])
+        self.assertIsNone(node_set.by_ip_address('10.0.0.3'))
+        with self.assertRaises(IndexError):
+            node_set.for_ip_addresses(['10.0.0.3'])
+        get_nodes.assert_called_once()
+
+    @patch('storage_workflows.crdb.models.node.Node.get_nodes')
+    def test_reload_refreshes_every_member_with_one_listing(self, get_nodes):
+        get_nodes.side_effect = [[self._node(1, '10.0.0.1', 5), self._node(2, '10.0.0.2', 3)],
+                                 [self._node(1, '10.0.0.1', 1), self._node(2, '10.0.0.2', 0)]]
+        old_nodes = NodeSet.fetch().subset_for_ip_addresses(['10.0.0.1', '10.0.0.2'])
+        members = old_nodes.nodes
+
+        old_nodes.reload()
+
+        self.assertEqual([node.sql_conns for node in members], [1, 0])
+        self.assertEqual(get_nodes.call_count, 2)
@@ -0,0 +1,55 @@
+from storage_workflows.crdb.models.node import Node
+from storage_workflows.crdb.models.node_store_snapshot import NodeStoreSnapshot
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestNodeStoreSnapshot(TestCase):
+
+    @staticmethod
+    def _store(replicas, overreplicated, unavailable, underreplicated, applied_initial):
+        return {'metrics': {'replicas': str(replicas),
+                            'ranges.overreplicated': str(overreplicated),
+                            'ranges.unavailable': str(unavailable),
+                            'ranges.underreplicated': str(underreplicated),
+                            'range.snapshots.applied-initial': str(applied_initial)}}
+
+    @patch('storage_workflows.crdb.api_gateway.crdb_api_gateway.CrdbApiGateway.session_token', return_value='token')
+    @patch('storage_workflows.crdb.api_gateway.crdb_api_gateway.CrdbApiGateway.get_node_details_from_endpoint')
+    def test_totals_come_from_one_fetch_until_refresh(self, get_node_details_from_endpoint, session_token):
+        get_node_details_from_endpoint.side_effect = [
+            {'storeStatuses': [self._store(10, 1, 0, 2, 5), self._store(20, 0, 1, 3, 7)]},
+            {'storeStatuses': [self._store(11, 0, 0, 0, 9)]}]
+        snapshot = NodeStoreSnapshot(1)
+
+        self.assertEqual((snapshot.replicas, snapshot.overreplicated_ranges, snapshot.unavailable_ranges,
+                          snapshot.underreplicated_ranges, snapshot.applied_initial_snapshots), (30, 1, 1, 5, 12))
+        get_node_details_from_endpoint.assert_called_once_with('token', 1)
+
+        snapshot.refresh()
+        self.assertEqual(snapshot.applied_initial_snapshots, 9)
+        self.assertEqual(get_node_details_from_endpoint.call_count, 2)
+
+    @patch('storage_workflows.crdb.api_gateway.crdb_api_gateway.CrdbApiGateway.session_token', return_value='token')
+    @patch('storage_workflows.crdb.api_gateway.crdb_api_gateway.CrdbApiGateway.get_all_node_details')
+    def test_fetch_all_builds_every_snapshot_from_one_request(self, get_all_node_details, session_token):
+        get_all_node_details.return_value = {'nodes': [
+            {'desc': {'nodeId': 1}, 'storeStatuses': [self._store(10, 1, 0, 2, 5)]},
+            {'desc': {'nodeId': 2}, 'storeStatuses': [self._store(20, 0, 3, 0, 7)]}]}
+
+        snapshots = NodeStoreSnapshot.fetch_all()
+
+        self.assertEqual(snapshots[1].underreplicated_ranges, 2)
+        self.assertEqual(snapshots[2].unavailable_ranges, 3)
+        get_all_node_details.assert_called_once_with('token')
+
+    @patch('storage_workflows.crdb.api_gateway.crdb_api_gateway.CrdbApiGateway.session_token', return_value='token')
+    @patch('storage_workflows.crdb.api_gateway.crdb_api_gateway.CrdbApiGateway.get_node_details_from_endpoint')
+    def test_node_properties_read_one_snapshot_until_refreshed(self, get_node_details_from_endpoint, session_token):
+        get_node_details_from_endpoint.side_effect = [{'storeStatuses': [self._store(10, 0, 0, 2, 5)]},
+                                                      {'storeStatuses': [self._store(10, 0, 0, 0, 5)]}]
+        node = Node({'node_id': 1})
+        self.assertEqual((node.underreplicated_ranges, node.replicas), (2, 10))
+        get_node_details_from_endpoint.assert_called_once()
+        node.refresh_store_snapshot()
+        self.assertEqual(node.underreplicated_ranges, 0)